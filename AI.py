@@ -10,33 +10,285 @@
 时间:
     2021/4/14 23:47
 """
+import json
+import random
+import time
+import zlib
+from array import array
+from bisect import insort
+
+from BoardTable import get_board_table
+from Cache import MemoryBudget
+from Cache import PointCache
+from Cache import PositionCache
+from Cache import ProofTable
+from Cache import TranspositionTable
+from Candidate import CandidateIndex
 from Constant import ChessType
 from Constant import ChessScore
 from Constant import PlayerEnum
-from Settings import *
+from Profile import get_profile
+from Settings import AI_CANDIDATE_RADIUS
+from Settings import AI_CANDIDATE_SHAPE
+from Settings import AI_CLOSE_MOVE_NUM
+from Settings import AI_CLOSE_SCORE_GAP
+from Settings import AI_DIFFICULTY
+from Settings import AI_POLICY_PATH
+from Settings import AI_USE_FAST_SHAPE
+from Settings import AI_QUIESCENCE_DEPTH
+from Settings import AI_RANDOM_SEED
+from Settings import AI_REDUCTION_MOVE_INDEX
+from Settings import AI_SHARED_TABLE
+from Settings import AI_SOLVER_BUDGET_SHARE
+from Settings import AI_SOLVER_THREAT_NUM
+from Settings import CHESS_MAX_NUM
+from Settings import CHESS_TYPE_NUM
+from Settings import TELEMETRY_SLOW_SECONDS
+from Telemetry import TurnSampler
+from Telemetry import get_telemetry
+from Weights import load_weights
+
+# 无玩家编号的整数值，用于加速比较。
+NO_PLAYER = int(PlayerEnum.NO_PLAYER)
+# 证明数与反证数的无穷大。
+PROOF_INF = 10 ** 8
+# 搜索版本号，搜索代码的改动或新增的搜索设置会改变同一局面的搜索结果时\n
+# 加 1（新增的设置还需加入 search_key），使磁盘上的分析缓存失效。
+SEARCH_VERSION = 2
+
+
+def load_shape_module(_batch=False):
+    """加载棋形计算模块方法。
+
+    编译后的 FastShape 可用时优先使用，否则使用纯 Python 实现的 Shape。\n
+    NumpyShape 只在一次计算整个棋盘的批量场景中比 Shape 快，\n
+    _batch 为 True 且 FastShape 不可用时使用它，未安装 NumPy 时仍使用 Shape。
+
+    Args:
+        _batch: 是否用于批量计算整个棋盘
+
+    Returns:
+        棋形计算模块。
+    """
+    if AI_USE_FAST_SHAPE:
+        try:
+            import FastShape
+            return FastShape
+        except ImportError:
+            pass
+    if _batch:
+        try:
+            import NumpyShape
+            return NumpyShape
+        except ImportError:
+            pass
+    import Shape
+    return Shape
+
+
+class SearchBuffer(object):
+    """搜索缓冲区类。
+
+    预先分配搜索时所需的临时数组，在每个搜索节点中重复使用，\n
+    避免搜索过程中反复创建列表。
+    """
+    __slots__ = ('board_count', 'point_count', 'zero_count', 'visited',
+                 'zero_visited')
+
+    def __init__(self, _size):
+        """初始化搜索缓冲区方法。
+
+        Args:
+            _size: 棋盘每行每列格子数量
+        """
+        area = _size * _size
+        # 棋局与单点评分时双方的棋形数量。
+        self.zero_count = array('i', [0]) * CHESS_TYPE_NUM
+        self.board_count = [array('i', self.zero_count) for _ in range(2)]
+        self.point_count = [array('i', self.zero_count) for _ in range(2)]
+        # 四个方向上已统计过棋形的棋子，每个方向占用一段连续空间。
+        self.zero_visited = bytes(4 * area)
+        self.visited = bytearray(self.zero_visited)
+
+    def reset_board_count(self):
+        """清空棋局评分所用缓冲区方法。"""
+        self.visited[:] = self.zero_visited
+        for count in self.board_count:
+            count[:] = self.zero_count
+
+    def reset_point_count(self):
+        """清空单点评分所用缓冲区方法。"""
+        for count in self.point_count:
+            count[:] = self.zero_count
+
+    @property
+    def nbytes(self):
+        """占用内存属性。
+
+        Returns:
+            各缓冲区占用的字节数。
+        """
+        count_nbytes = self.zero_count.itemsize * len(self.zero_count)
+        return 5 * count_nbytes + 2 * len(self.visited)
 
 
 class AI:
     """AI 类。"""
 
-    def __init__(self, _player):
+    def __init__(self, _player, _size=CHESS_MAX_NUM, _profile=None,
+                 _seed=AI_RANDOM_SEED, _shared_table=AI_SHARED_TABLE,
+                 _weights=None, _policy=None):
         """AI 对象初始化函数。
 
         Args:
             _player: (真实玩家编号，AI 玩家编号)
+            _size: 棋盘每行每列格子数量
+            _profile: 难度配置，默认为 AI_DIFFICULTY 难度的配置
+            _seed: 选择落子所用的随机数种子，为 None 时随机生成
+            _shared_table: 共享置换表的共享内存名称，为 None 时不使用置换表
+            _weights: 棋局评分参数，默认读取 AI_WEIGHTS_PATH
+            _policy: 走法模型，默认读取 AI_POLICY_PATH，未设置时不使用
         """
-        # 搜索时所需要遍历的米字方向。
-        self.__search_direction = [(0, 1), (1, 0), (1, -1), (1, 1)]
+        # 难度配置。
+        if _profile is None:
+            _profile = get_profile(AI_DIFFICULTY)
+        self.__profile = _profile
+
+        # 当前尺寸棋盘的预计算表。
+        self.__size = _size
+        self.__table = get_board_table(_size)
+        self.__shape = load_shape_module()  # 棋形计算模块。
+        if _weights is None:
+            _weights = load_weights()
+        self.__weights = _weights   # 棋局评分参数。
+        if _policy is None and AI_POLICY_PATH is not None:
+            # 走法模型依赖 NumPy，只在使用时导入。
+            from Policy import load_policy
+            _policy = load_policy(AI_POLICY_PATH)
+        self.__policy = _policy     # 对平稳落子排序的走法模型。
+
+        # 在内存预算中先登记大小固定的表，剩余内存全部用于棋局评分缓存。
+        self.__memory = MemoryBudget(_profile.memory_budget)
+        tables = {}
+        for name, table, nbytes in AI.__create_fixed_tables(_size, _profile,
+                                                            _policy):
+            self.__memory.reserve(name, table, nbytes)
+            tables[name] = table
+
+        # 一维棋盘，最后一格为棋盘外的哨兵格，以及有序的已落子点下标。
+        self.__chess = tables['board'].obj
+        self.__stones = []
+        self.__hash = 0     # 当前棋局的 Zobrist 哈希值。
+        self.__synced = False   # 是否已与外部棋盘整体同步过一次。
 
         # 棋盘上当前可选落子点。
-        self.__can_move = [[0] * CHESS_MAX_NUM for _ in range(CHESS_MAX_NUM)]
-        self.__radius = 1  # 可选落子点半径。
+        self.__can_move = tables['candidates']
+
+        # 搜索时重复使用的缓冲区与单点评分缓存。
+        self.__buffer = tables['buffer']
+        self.__point_cache = tables['point_cache']
+        self.__threat = False       # 上一次棋局评分中是否有未解决的威胁。
+        self.__proof_table = tables['proof_table']
+        self.__position_cache = PositionCache(
+            PositionCache.get_capacity(self.__memory.free))
+        self.__memory.reserve('position_cache', self.__position_cache)
+
+        # 棋形表由同一进程中的所有 AI 共用，共享置换表由同一台机器上的\n
+        # 所有进程共用，两者大小固定，不计入单个 AI 的内存预算。
+        for name, table in self.__shape.get_shared_tables().items():
+            self.__memory.reserve_shared(name, table)
+        self.__transposition = None
+        self.__table_salt = 0   # 与置换表的键异或，区分搜索参数不同的 AI。
+        if _shared_table is not None:
+            self.__transposition = TranspositionTable(_name=_shared_table)
+            self.__memory.reserve_shared('shared_table', self.__transposition)
+            # 搜索参数不同的进程对同一局面的分值不同，以搜索参数摘要作为\n
+            # 键的高 32 位，使它们不会用到对方的结果。
+            self.__table_salt = int(self.search_key, 16) << 32
+
+        self.__quiescence_node = 0  # 本次决策中静态搜索剩余节点数。
+        self.__solver_node = 0      # 本次决策中证明数搜索剩余节点数。
+        self.__node_num = 0         # 本次决策中搜索的节点数。
+        self.__reached_depth = 0    # 本次决策中完成的搜索深度。
+        self.__root_move_num = 0    # 最后一次完整搜索中根节点搜索完的落子数。
+        self.__telemetry = get_telemetry()  # 决策遥测，未启用时为 None。
+
+        # 当前搜索深度与每层搜索宽度。
+        self.__adaptive_width = _profile.adaptive_width
+        self.__depth = 0
+        self.__move_num = []
+        self.__set_depth(_profile.depth)
+
+        # 本次决策的截止时间、节点数上限、是否检查预算，以及预算是否已用尽。
+        self.__deadline = None
+        self.__node_limit = None
+        self.__bounded = True
+        self.__stopped = False
+
+        # 在分值接近的落子中随机选择所用的随机数生成器。
+        if _seed is None:
+            _seed = random.randrange(2 ** 32)
+        self.__seed = _seed
+        self.__random = random.Random(_seed)
 
         # 初始化玩家和 AI 编号。
         people_player, ai_player = _player
         self.__people_player = people_player
         self.__ai_player = ai_player
 
+    @staticmethod
+    def get_min_memory(_size, _profile=None, _policy=None):
+        """获取 AI 可以运行的最小内存预算方法。
+
+        即初始化时登记的大小固定的各表占用的字节数之和，\n
+        预算为该值时棋局评分缓存为空，搜索仍可正常进行。
+
+        Args:
+            _size: 棋盘每行每列格子数量
+            _profile: 难度配置，默认为 AI_DIFFICULTY 难度的配置
+            _policy: 走法模型，默认读取 AI_POLICY_PATH，未设置时不使用
+
+        Returns:
+            最小内存预算的字节数。
+        """
+        if _profile is None:
+            _profile = get_profile(AI_DIFFICULTY)
+        if _policy is None and AI_POLICY_PATH is not None:
+            from Policy import load_policy
+            _policy = load_policy(AI_POLICY_PATH)
+        return sum(nbytes for _, _, nbytes in
+                   AI.__create_fixed_tables(_size, _profile, _policy))
+
+    @staticmethod
+    def __create_fixed_tables(_size, _profile, _policy):
+        """创建在内存预算中登记的大小固定的各表方法。
+
+        初始化与 get_min_memory 都由此获取各表，两者计算的表总是相同。
+
+        Args:
+            _size: 棋盘每行每列格子数量
+            _profile: 难度配置
+            _policy: 走法模型，未使用时为 None
+
+        Returns:
+            按登记顺序排列的 [(表名称, 表, 最多占用的字节数)] 列表。
+        """
+        table = get_board_table(_size)
+        board = memoryview(bytearray([NO_PLAYER]) * (table.area + 1))
+        can_move = CandidateIndex(table)
+        buffer = SearchBuffer(_size)
+        point_cache = PointCache(table)
+        # 证明数搜索每个节点最多占用一项，表项数与其节点数上限相同。
+        proof_table = ProofTable(_profile.solver_node_num)
+        tables = [('board', board, board.nbytes),
+                  ('candidates', can_move, can_move.max_nbytes),
+                  ('buffer', buffer, buffer.nbytes),
+                  ('point_cache', point_cache, point_cache.nbytes),
+                  ('proof_table', proof_table, proof_table.nbytes)]
+        if _policy is not None:
+            tables.append(('policy', _policy, _policy.nbytes))
+        return tables
+
     def game_over(self, _board, _pos, _player):
         """判断游戏是否结束方法。
         
@@ -50,44 +302,311 @@ class AI:
         Returns:
             游戏是否结束。
         """
-        count = [0] * CHESS_TYPE_NUM
-        for offset in self.__search_direction:
-            self.__get_one_chess_shape(_board, _pos, _player,
-                                       offset, count)
+        mine, opponent = int(_player[0]), int(_player[1])
+        x, y = _pos
+        index = x * self.__size + y
+        area = self.__table.area
+        self.__buffer.reset_point_count()
+        count = self.__buffer.point_count[0]
+        for line in self.__table.lines[index * 4:index * 4 + 4]:
+            chess_list = tuple(
+                opponent if i == area else
+                _board[i // self.__size][i % self.__size] for i in line)
+            self.__shape.get_one_chess_shape(chess_list, (mine, opponent),
+                                             count)
         return count[ChessType.LIVE_FIVE] > 0
 
-    def make_decision(self, _board, _pos):
+    @property
+    def point_cache(self):
+        """单点评分缓存属性。
+
+        Returns:
+            单点评分缓存，可从中读取命中与未命中次数。
+        """
+        return self.__point_cache
+
+    @property
+    def position_cache(self):
+        """棋局评分缓存属性。
+
+        Returns:
+            棋局评分缓存，可从中读取容量、已使用项数与命中次数。
+        """
+        return self.__position_cache
+
+    @property
+    def memory(self):
+        """内存预算属性。
+
+        Returns:
+            该 AI 对象的内存预算，可从中读取上限与各表当前占用的字节数。
+        """
+        return self.__memory
+
+    @property
+    def node_num(self):
+        """搜索节点数属性。
+
+        Returns:
+            上一次决策中搜索的节点数，包括静态搜索的节点。
+        """
+        return self.__node_num
+
+    @property
+    def reached_depth(self):
+        """完成的搜索深度属性。
+
+        Returns:
+            本次决策中完成的搜索深度，由证明数搜索直接求解时为 0。
+        """
+        return self.__reached_depth
+
+    @property
+    def root_move_num(self):
+        """根节点搜索的落子数属性。
+
+        Returns:
+            本次决策最后一次完整搜索中根节点搜索完的落子数，\n
+            由证明数搜索直接求解时为 0。
+        """
+        return self.__root_move_num
+
+    @property
+    def profile(self):
+        """难度配置属性。
+
+        Returns:
+            该 AI 对象的难度配置。
+        """
+        return self.__profile
+
+    @property
+    def weights(self):
+        """棋局评分参数属性。
+
+        Returns:
+            该 AI 对象的棋局评分参数。
+        """
+        return self.__weights
+
+    @property
+    def policy(self):
+        """走法模型属性。
+
+        Returns:
+            该 AI 对象的走法模型，未使用时为 None。
+        """
+        return self.__policy
+
+    @property
+    def search_key(self):
+        """搜索参数摘要属性。
+
+        由搜索版本号、难度配置、不在难度配置中的搜索设置、棋局评分参数\n
+        与走法模型计算，摘要相同的 AI 对同一局面的 analyse 结果相同。
+
+        Returns:
+            8 位十六进制字符串，用于区分不同搜索参数的缓存。
+        """
+        policy_key = None if self.__policy is None else self.__policy.key
+        settings = [SEARCH_VERSION, self.__profile.key, self.__weights.key,
+                    policy_key, AI_CANDIDATE_RADIUS, int(AI_CANDIDATE_SHAPE),
+                    AI_CLOSE_SCORE_GAP, AI_CLOSE_MOVE_NUM,
+                    AI_REDUCTION_MOVE_INDEX, AI_QUIESCENCE_DEPTH,
+                    AI_SOLVER_THREAT_NUM, AI_SOLVER_BUDGET_SHARE]
+        return '{:08x}'.format(zlib.crc32(json.dumps(settings).encode()))
+
+    @property
+    def seed(self):
+        """随机数种子属性。
+
+        Returns:
+            选择落子所用的随机数种子，相同种子与相同棋局下 AI 的落子相同。
+        """
+        return self.__seed
+
+    def make_decision(self, _board, _pos, _changes=None):
         """AI 落子方法。
 
-        根据玩家落子位置，决定本次落子位置。
+        根据玩家落子位置，决定本次落子位置。\n
+        调用者给出 _changes 时，同步棋盘只比较 _pos 与其中的点，\n
+        悔棋、重做 N 步的开销与 N 成正比，不需要重新创建 AI 对象；\n
+        否则扫描整个棋盘找出有变化的点。
 
         Args:
             _board: 棋盘数组
             _pos: 玩家落子的坐标
+            _changes: 上一次决策后棋盘上其他可能有变化的点的坐标列表，\n
+                如悔棋、重做涉及的点，为 None 时扫描整个棋盘
 
         Returns:
             (x, y)——决定落子的坐标。
         """
-        self.__update_can_move(_board, _pos, True)  # 更新可选落子点。
+        sampler = None
+        if TELEMETRY_SLOW_SECONDS is not None:
+            sampler = TurnSampler(TELEMETRY_SLOW_SECONDS)
+        start = time.perf_counter()
+        player = int(self.__ai_player), int(self.__people_player)
+        if _changes is not None:
+            _changes = list(_changes) + [_pos]
+        _, best_move, moves = self.__search(_board, player,
+                                            self.__profile.random_margin,
+                                            _changes)
+        seconds = time.perf_counter() - start
+        if self.__telemetry is not None:
+            self.__telemetry.record(seconds, self.__reached_depth,
+                                    self.__node_num, self.__root_move_num,
+                                    len(self.__stones))
+        if sampler is not None and sampler.stop() > 0:
+            sampler.dump(_board, player[0], {
+                'seconds': seconds, 'depth': self.__reached_depth,
+                'nodes': self.__node_num})
+        if len(moves) > 1:
+            # 在分值接近的落子中随机选择，使每局棋不完全相同。
+            best_move = self.__random.choice(moves)
+
+        # 记录本次落子，下一次同步棋盘时该点不再有变化。
+        self.__set_chess(best_move, player[0])
+        self.__update_can_move(best_move, True)  # 更新可选落子点。
 
-        # 搜索最佳落子点。
-        player = self.__ai_player, self.__people_player
-        _, best_move = self.__min_max_search(_board, player, ChessScore.MIN,
-                                             ChessScore.MAX, 0)
+        return best_move
 
-        self.__update_can_move(_board, best_move, True)  # 更新可选落子点。
+    def analyse(self, _board, _player):
+        """分析棋局方法。
 
-        return best_move
+        搜索某一方的最佳落子点，但不在 AI 内部的棋盘上落子，也不随机选择。
+
+        Args:
+            _board: 棋盘数组
+            _player: (落子方玩家编号, 对手玩家编号)
+
+        Returns:
+            (score, (x, y))——落子方视角的分值与最佳落子点，\n
+            已分出胜负时落子点为 None，空棋盘时为天元。
+        """
+        score, best_move, _ = self.__search(_board, _player, 0)
+        return score, best_move
+
+    def __search(self, _board, _player, _margin, _changes=None):
+        """同步棋盘并搜索根节点方法。
+
+        Args:
+            _board: 棋盘数组
+            _player: (落子方玩家编号, 对手玩家编号)
+            _margin: 与最佳落子分值相差不超过该值的落子视为分值接近
+            _changes: 可能有变化的点的坐标列表，为 None 时扫描整个棋盘
+
+        Returns:
+            (score, (x, y), 分值接近的落子点列表)。
+        """
+        self.__sync_board(_board, _changes)
+        self.__node_num = 0
+        self.__reached_depth = 0
+        self.__root_move_num = 0
+        center = self.__size // 2, self.__size // 2
+        if len(self.__stones) == 0:
+            return 0, center, [center]
+
+        profile = self.__profile
+        start = time.perf_counter()
+        player = int(_player[0]), int(_player[1])
+        if abs(self.__evaluate_board(player)) < ChessScore.LIVE_FIVE:
+            # 威胁较多时先尝试证明必胜，证明成功则不再进行博弈树搜索。\n
+            # 证明数搜索只使用预算中 AI_SOLVER_BUDGET_SHARE 的部分。
+            self.__start_budget(start, AI_SOLVER_BUDGET_SHARE)
+            move = self.__solve(player)
+            if move is not None:
+                return ChessScore.MAX, move, [move]
+        # 博弈树搜索的节点数预算不含证明数搜索所用节点。
+        self.__start_budget(start, 1)
+        if not profile.has_budget:
+            self.__set_depth(profile.depth)
+            self.__reached_depth = profile.depth
+            return self.__search_root(player, _margin)
+
+        # 有预算限制时以 2 层为步长迭代加深，保持搜索深度的奇偶性不变，\n
+        # 预算用尽时使用最后一次完整搜索的结果。第一轮迭代不检查预算，\n
+        # 保证至少有一次完整搜索的结果。
+        result = None
+        for depth in range(2 - profile.depth % 2, profile.depth + 1, 2):
+            self.__set_depth(depth)
+            self.__bounded = result is not None
+            current = self.__search_root(player, _margin)
+            if self.__stopped:
+                break
+            result = current
+            self.__reached_depth = depth
+        return result
+
+    def __search_root(self, _player, _margin):
+        """搜索根节点方法。
+
+        与 __min_max_search 相同，但每个落子搜索时的 α 值为当前最高分减去\n
+        _margin，因此分值与最佳落子相差不超过 _margin 的落子能得到准确分值，\n
+        随机选择只发生在搜索结束后，不影响搜索中的剪枝。
+
+        Args:
+            _player: (己方玩家编号, 敌方玩家编号)
+            _margin: 与最佳落子分值相差不超过该值的落子视为分值接近
+
+        Returns:
+            (score, (x, y), 分值接近的落子点列表)。
+        """
+        self.__quiescence_node = self.__profile.quiescence_node_num
+        self.__node_num += 1
+        score = self.__evaluate_board(_player)
+        if abs(score) >= ChessScore.LIVE_FIVE:
+            return score, None, []
+
+        best, best_move = ChessScore.MIN, None
+        results = []
+        move_num = 0
+        mine, opponent = _player
+        for _, pos in self.__get_can_move(_player, 0):
+            self.__set_chess(pos, mine)
+            self.__update_can_move(pos, True)
 
-    def __min_max_search(self, _board, _player, _alpha, _beta, _depth):
+            alpha = max(best - _margin, ChessScore.MIN)
+            score, _ = self.__min_max_search(_player[::-1], -ChessScore.MAX,
+                                             -alpha, 1)
+            score *= -1
+            self.__set_chess(pos, NO_PLAYER)
+            self.__update_can_move(pos, False)
+
+            if self.__stopped:
+                # 预算用尽时该落子未搜索完，分值无效。
+                if best_move is None:
+                    best_move = pos
+                break
+            move_num += 1
+
+            # 分值不超过 α 值时只是上界，不是准确分值。
+            if score > alpha or alpha == ChessScore.MIN:
+                results.append((score, pos))
+            # 所有落子都必败时，仍需给出一个落子点。
+            if score > best or best_move is None:
+                best, best_move = score, pos
+                if best >= ChessScore.MAX:
+                    break
+
+        moves = [pos for score, pos in results if score >= best - _margin]
+        if not self.__stopped:
+            # 未搜索完的一轮迭代的结果不会被使用。
+            self.__root_move_num = move_num
+        return best, best_move, moves
+
+    def __min_max_search(self, _player, _alpha, _beta, _depth):
         """获取最佳落子点方法。
 
         搜索主体为极小极大搜索，所涉及到的剪枝算法有：\n
         1). α,β-剪枝；\n
-        2). 启发式搜索。
+        2). 启发式搜索；\n
+        3). 后续落子减少深度：排序靠后的平稳落子先以少一层的深度、\n
+        零窗口搜索，结果可能更好时再以完整深度重新搜索；\n
+        4). 置换表：使用共享置换表时，剩余深度足够的结果直接返回，\n
+        否则先搜索表中记录的最佳落子。
 
         Args:
-            _board: 棋盘数组
             _player: (己方玩家编号, 敌方玩家编号)
             _alpha: 剪枝算法所用 α 值
             _beta: 剪枝算法所用 β 值
@@ -96,512 +615,581 @@ class AI:
         Returns:
             (score, (x, y))——当前最大分值，该分值的 x，y 坐标。
         """
-        score = self.__evaluate_board(_board, _player)
-        if _depth >= AI_SEARCH_DEPTH or abs(score) >= ChessScore.LIVE_FIVE:
+        if self.__out_of_budget():
+            return 0, None
+        self.__node_num += 1
+        score = self.__evaluate_board(_player)
+        if abs(score) >= ChessScore.LIVE_FIVE:
+            return score, None
+        if _depth >= self.__depth:
+            # 到达搜索深度时如仍有未解决的冲四、活三，则继续进行静态搜索。
+            if self.__has_threat():
+                score = self.__quiescence_search(_player, _alpha, _beta, 0,
+                                                 score)
             return score, None
 
+        # 查询置换表。
+        mine, opponent = _player
+        table = self.__transposition
+        key = self.__hash ^ mine ^ self.__table_salt
+        remaining = self.__depth - _depth
+        table_move = -1
+        if table is not None:
+            entry = table.lookup(key)
+            if entry is not None:
+                score, depth, flag, table_move = entry
+                if depth >= remaining and (
+                        flag == TranspositionTable.EXACT or
+                        flag == TranspositionTable.LOWER and
+                        score >= _beta or
+                        flag == TranspositionTable.UPPER and
+                        score <= _alpha):
+                    return score, None
+
         # 枚举每一个未落子的候选点进行遍历搜索。
-        can_moves = self.__get_can_move(_board, _player)
+        can_moves = self.__get_can_move(_player, _depth)
+        if table_move >= 0:
+            # 置换表中的最佳落子最先搜索。
+            pos = self.__table.coords[table_move]
+            for i, (_, move) in enumerate(can_moves):
+                if move == pos:
+                    can_moves.insert(0, can_moves.pop(i))
+                    break
 
         best_move = None
-        mine, opponent = _player
-        for _, pos in can_moves:
-            x, y = pos
-            _board[x][y] = mine
-            self.__update_can_move(_board, pos, True)
-
-            score, _ = self.__min_max_search(_board, _player[::-1], -_beta,
-                                             -_alpha, _depth + 1)
-            score *= -1
-            _board[x][y] = PlayerEnum.NO_PLAYER
-            self.__update_can_move(_board, pos, False)
+        for i, (move_score, pos) in enumerate(can_moves):
+            self.__set_chess(pos, mine)
+            self.__update_can_move(pos, True)
+
+            if (self.__adaptive_width and i >= AI_REDUCTION_MOVE_INDEX and
+                    _depth + 2 < self.__depth and
+                    move_score < ChessScore.SLEEP_FOUR):
+                score, _ = self.__min_max_search(_player[::-1], -_alpha - 1,
+                                                 -_alpha, _depth + 2)
+                score *= -1
+            else:
+                score = _beta
+            if score > _alpha:
+                score, _ = self.__min_max_search(_player[::-1], -_beta,
+                                                 -_alpha, _depth + 1)
+                score *= -1
+            self.__set_chess(pos, NO_PLAYER)
+            self.__update_can_move(pos, False)
+            if self.__stopped:
+                break
 
             if score > _alpha:
                 _alpha = score
-                best_move = x, y
+                best_move = pos
                 if _alpha >= _beta:
                     break
 
+        if table is not None and not self.__stopped:
+            if _alpha >= _beta:
+                flag = TranspositionTable.LOWER
+            elif best_move is None:
+                flag = TranspositionTable.UPPER
+            else:
+                flag = TranspositionTable.EXACT
+            move = -1
+            if best_move is not None:
+                move = best_move[0] * self.__size + best_move[1]
+            table.store(key, _alpha, remaining, flag, move)
         return _alpha, best_move
 
-    def __get_can_move(self, _board, _player):
-        """获取可落子点。
+    def __solve(self, _player):
+        """证明数搜索求解方法。
 
-        获取可落子点与该点的分值，仅返回分值较高的数个点。
+        落子方可成四的点不少于 AI_SOLVER_THREAT_NUM 时，\n
+        以深度优先证明数搜索尝试证明落子方可以连续冲四取胜。
 
         Args:
-            _board: 棋盘数组
-            _player: (己方玩家编号，敌方玩家编号)
+            _player: (落子方玩家编号, 敌方玩家编号)
 
         Returns:
-            可落子点数组。
+            证明必胜时的第一步落子点，未能证明时为 None。
         """
-        fives = []
-        m_fours, o_fours = [], []
-        m_sfours, o_sfours = [], []
-        can_moves = []
-        for x in range(CHESS_MAX_NUM):
-            for y in range(CHESS_MAX_NUM):
-                m_s, o_s = self.__evaluate_point(_board, (x, y), _player)
-                if self.__can_move[x][y] > 0:
-                    if max(m_s, o_s) >= ChessScore.LIVE_FIVE:
-                        fives.append((max(m_s, o_s), (x, y)))
-                    elif m_s >= ChessScore.LIVE_FOUR:
-                        m_fours.append((m_s, (x, y)))
-                    elif o_s >= ChessScore.LIVE_FOUR:
-                        o_fours.append((o_s, (x, y)))
-                    elif m_s >= ChessScore.SLEEP_FOUR:
-                        m_sfours.append((m_s, (x, y)))
-                    elif o_s >= ChessScore.SLEEP_FOUR:
-                        o_sfours.append((o_s, (x, y)))
-                    else:
-                        can_moves.append((max(m_s, o_s), (x, y)))
-
-        if len(fives) > 0:
-            return fives
-        if len(m_fours) > 0:
-            return m_fours
-        if len(o_fours) > 0:
-            return o_fours + m_sfours
+        if self.__profile.solver_node_num <= 0:
+            return None
+        mine = _player[0]
+        area = self.__table.area
+        levels = self.__point_cache.levels
+        indices = list(self.__can_move)
+        self.__evaluate_points(indices)
+        four_num = sum(levels[mine * area + index] >= ChessType.SLEEP_FOUR
+                       for index in indices)
+        if four_num < AI_SOLVER_THREAT_NUM:
+            return None
+
+        # 每次求解前清空证明数表，使结果只与当前局面有关。
+        self.__solver_node = self.__profile.solver_node_num
+        self.__proof_table.clear()
+        proof, _, move = self.__proof_search(_player, True, PROOF_INF,
+                                             PROOF_INF)
+        return move if proof == 0 else None
+
+    def __proof_search(self, _player, _attack, _proof, _disproof):
+        """深度优先证明数搜索方法。
+
+        证明数与反证数均以落子方为准：证明数为 0 时落子方必胜，\n
+        反证数为 0 时落子方必败。进攻方每一步都必须成四，\n
+        因此防守方只能挡住进攻方的成五点，每个节点的分支都很少。\n
+        进攻方无法继续冲四时视为失败，即反证只说明没有连续冲四的胜法。
 
-        can_moves.sort(reverse=True)
-        return can_moves[:AI_LIMITED_MOVE_NUM]
+        Args:
+            _player: (落子方玩家编号, 敌方玩家编号)
+            _attack: 落子方是否为进攻方
+            _proof: 证明数阈值
+            _disproof: 反证数阈值
 
-    def __evaluate_board(self, _board, _player):
-        """计算当前棋局分值方法。
+        Returns:
+            (证明数, 反证数, 反证数最小的落子点)，落子方可直接成五时\n
+            落子点为成五点，其余已分出胜负的情况落子点为 None。
+        """
+        mine, opponent = _player
+        key = self.__hash ^ mine
+        moves, won = self.__get_proof_moves(_player, _attack)
+        if won is not None:
+            proof, disproof = (0, PROOF_INF) if won else (PROOF_INF, 0)
+            self.__proof_table.store(key, proof, disproof)
+            move = self.__table.coords[moves[0]] if len(moves) > 0 else None
+            return proof, disproof, move
+        self.__solver_node -= 1
+        self.__node_num += 1
+
+        # 子节点的证明数与反证数以子节点的落子方为准，未搜索过时均为 1。
+        table = self.__proof_table
+        area = self.__table.area
+        zobrist = self.__table.zobrist
+        values = []
+        for index in moves:
+            child = self.__hash ^ zobrist[mine * area + index] ^ opponent
+            values.append(table.lookup(child) or (1, 1))
+
+        while True:
+            # 子节点必败即落子方必胜：落子方的证明数为子节点反证数的最小值，
+            # 反证数为子节点证明数之和。
+            best = min(range(len(values)), key=lambda i: values[i][1])
+            proof = values[best][1]
+            disproof = min(sum(value[0] for value in values), PROOF_INF)
+            if (proof >= _proof or disproof >= _disproof or
+                    self.__solver_node <= 0 or self.__out_of_budget()):
+                break
+            second = min((value[1] for i, value in enumerate(values)
+                          if i != best), default=PROOF_INF)
+            child_proof = values[best][0]
+            pos = self.__table.coords[moves[best]]
+            self.__set_chess(pos, mine)
+            self.__update_can_move(pos, True)
+            values[best] = self.__proof_search(
+                _player[::-1], not _attack,
+                min(_disproof - disproof + child_proof, PROOF_INF),
+                min(_proof, second + 1))[:2]
+            self.__set_chess(pos, NO_PLAYER)
+            self.__update_can_move(pos, False)
+
+        table.store(key, proof, disproof)
+        return proof, disproof, self.__table.coords[moves[best]]
+
+    def __get_proof_moves(self, _player, _attack):
+        """获取证明数搜索中某节点的落子方法。
 
         Args:
-            _player: (己方玩家编号, 敌方玩家编号)
+            _player: (落子方玩家编号, 敌方玩家编号)
+            _attack: 落子方是否为进攻方
 
         Returns:
-            棋局分值。
+            (落子点一维下标列表, 胜负)：胜负为 None 时需继续搜索，\n
+            为 True 时落子方获胜，落子方可直接成五时落子点列表为成五点，\n
+            为 False 时落子方失败。
         """
         mine, opponent = _player
-        visited = [[[False] * CHESS_MAX_NUM
-                    for _ in range(CHESS_MAX_NUM)]
-                   for _ in range(len(self.__search_direction))]
-        count = [[0] * CHESS_TYPE_NUM for _ in range(2)]
-
-        for x in range(CHESS_MAX_NUM):
-            for y in range(CHESS_MAX_NUM):
-                if _board[x][y] == PlayerEnum.NO_PLAYER: continue
-                pos = x, y
-                for i in range(len(self.__search_direction)):
-                    if visited[i][x][y]: continue
-                    offset = self.__search_direction[i]
-                    if _board[x][y] == mine:
-                        self.__get_one_chess_shape(
-                            _board, pos, _player, offset, count[mine],
-                            visited[i])
-                    elif _board[x][y] == opponent:
-                        self.__get_one_chess_shape(
-                            _board, pos, _player[::-1], offset, count[opponent],
-                            visited[i])
-        m_s, o_s = self.__get_board_score([count[mine], count[opponent]])
-        return m_s - o_s
-
-    def __evaluate_point(self, _board, _pos, _player):
-        """计算 _pos 处分值。
+        area = self.__table.area
+        levels = self.__point_cache.levels
+        indices = list(self.__can_move)
+        self.__evaluate_points(indices)
+        blocks, fours = [], []
+        for index in indices:
+            if levels[mine * area + index] == ChessType.LIVE_FIVE:
+                return [index], True
+            if levels[opponent * area + index] == ChessType.LIVE_FIVE:
+                blocks.append(index)
+            elif (_attack and
+                  levels[mine * area + index] >= ChessType.SLEEP_FOUR):
+                fours.append(index)
+
+        if len(blocks) > 1:
+            # 对方有两个成五点，无法全部挡住。
+            return [], False
+        if len(blocks) == 1:
+            # 进攻方挡住对方的成五点时自己也必须成四，才能继续冲四。
+            if (_attack and
+                    levels[mine * area + blocks[0]] < ChessType.SLEEP_FOUR):
+                return [], False
+            return blocks, None
+        if _attack:
+            return fours, None if len(fours) > 0 else False
+        # 防守方没有需要挡住的点，说明进攻方的冲四已被化解。
+        return [], True
+
+    def __quiescence_search(self, _player, _alpha, _beta, _depth, _score):
+        """静态搜索方法。
+
+        在搜索深度之外只搜索强制性的落子：己方成四的落子，\n
+        以及对方可成五时的防守落子，以此解决搜索边界处未解决的冲四。\n
+        搜索深度与节点数均有上限，超出上限时直接返回静态评分。
 
         Args:
-            _board: 棋局数组
-            _pos: 待评分坐标
-            _player: (己方玩家编号，敌方玩家编号)
+            _player: (己方玩家编号, 敌方玩家编号)
+            _alpha: 剪枝算法所用 α 值
+            _beta: 剪枝算法所用 β 值
+            _depth: 静态搜索的当前深度
+            _score: 当前棋局的静态评分
 
         Returns:
-            (己方分数，敌方分数).
+            当前最大分值。
         """
-        count = [[0] * CHESS_TYPE_NUM for _ in range(2)]
-        # 获取该点在两种情况下的棋形。
+        if (_depth >= AI_QUIESCENCE_DEPTH or self.__quiescence_node <= 0 or
+                self.__out_of_budget()):
+            return _score
+        self.__quiescence_node -= 1
+        self.__node_num += 1
+
         mine, opponent = _player
-        for offset in self.__search_direction:
-            self.__get_one_chess_shape(_board, _pos, _player, offset,
-                                       count[mine])
-            self.__get_one_chess_shape(_board, _pos, _player[::-1], offset,
-                                       count[opponent])
-        m_score = self.__get_point_score(count[mine])
-        o_score = self.__get_point_score(count[opponent])
-        return m_score, o_score
-
-    def __update_can_move(self, _board, _pos, _add):
-        """更新可选落子点。
+        area = self.__table.area
+        levels = self.__point_cache.levels
+        coords = self.__table.coords
+        blocks, fours = [], []
+        indices = list(self.__can_move)
+        self.__evaluate_points(indices)
+        for index in indices:
+            if levels[mine * area + index] == ChessType.LIVE_FIVE:
+                # 己方下一步即可成五。
+                return ChessScore.LIVE_FIVE
+            if levels[opponent * area + index] == ChessType.LIVE_FIVE:
+                blocks.append(coords[index])
+            elif levels[mine * area + index] >= ChessType.SLEEP_FOUR:
+                fours.append(coords[index])
+
+        if len(blocks) > 0:
+            # 对方可成五时必须防守，不能以静态评分作为下界。
+            moves = blocks
+            best = ChessScore.MIN
+        else:
+            if _score >= _beta or len(fours) == 0:
+                return _score
+            moves = fours
+            best = _score
+            _alpha = max(_alpha, _score)
+
+        for pos in moves:
+            self.__set_chess(pos, mine)
+            self.__update_can_move(pos, True)
+
+            score = self.__evaluate_board(_player[::-1])
+            if abs(score) < ChessScore.LIVE_FIVE and self.__has_threat():
+                score = self.__quiescence_search(_player[::-1], -_beta,
+                                                 -_alpha, _depth + 1, score)
+            score *= -1
+            self.__set_chess(pos, NO_PLAYER)
+            self.__update_can_move(pos, False)
 
-        根据当前所下位置更新可选落子点。
+            if score > best:
+                best = score
+                if best > _alpha:
+                    _alpha = best
+                    if _alpha >= _beta:
+                        break
+
+        return best
+
+    def __start_budget(self, _start, _share):
+        """开始计算预算方法。
+
+        节点数预算从当前节点数开始计算，时间预算从决策开始时计算。
 
         Args:
-            _board: 棋盘数组
-            _pos: 中间点
-            _add: 为 True 时是落子，否则为取回了一子
+            _start: 决策开始的时间
+            _share: 可使用的预算比例
         """
-        x, y = _pos
-        start_x = max(0, x - self.__radius)
-        start_y = max(0, y - self.__radius)
-        end_x = min(CHESS_MAX_NUM - 1, x + self.__radius)
-        end_y = min(CHESS_MAX_NUM - 1, y + self.__radius)
-
-        self.__can_move[x][y] = 0
-        for i in range(start_x, end_x + 1):
-            for j in range(start_y, end_y + 1):
-                if _add and (i != x or j != y):
-                    # 添加子时，该子周围未落子点计数都加一。
-                    if _board[i][j] == PlayerEnum.NO_PLAYER:
-                        self.__can_move[i][j] += 1
-                elif i != x or j != y:
-                    # 取回子时，该子周围未落子点减一，并计算该子周围有多少个已落子点。
-                    if _board[i][j] == PlayerEnum.NO_PLAYER:
-                        self.__can_move[i][j] -= 1
-                    else:
-                        self.__can_move[x][y] += 1
+        profile = self.__profile
+        self.__stopped = False
+        self.__bounded = True
+        self.__node_limit = None
+        if profile.node_budget is not None:
+            self.__node_limit = (self.__node_num +
+                                 int(profile.node_budget * _share))
+        self.__deadline = None
+        if profile.time_budget is not None:
+            self.__deadline = _start + profile.time_budget * _share
+
+    def __out_of_budget(self):
+        """判断本次决策的预算是否用尽方法。
 
-    @staticmethod
-    def __get__chess_list(_board, _pos, _offset, _player):
-        """获取一行棋子方法。
+        Returns:
+            节点数或时间是否已超出 __start_budget 设定的预算，\n
+            不检查预算时总为 False。
+        """
+        if self.__stopped:
+            return True
+        if not self.__bounded:
+            return False
+        if (self.__node_limit is not None and
+                self.__node_num >= self.__node_limit):
+            self.__stopped = True
+        elif (self.__deadline is not None and
+              time.perf_counter() >= self.__deadline):
+            self.__stopped = True
+        return self.__stopped
+
+    def __has_threat(self):
+        """判断上一次棋局评分中是否有未解决的威胁方法。
 
-        根据偏移方向将棋盘上棋子的落子者放置在一维列表中。\n
-        如果超出边界，则算对方所落的子。
+        Returns:
+            任意一方是否有活四、冲四或活三。
+        """
+        return self.__threat
+
+    def __get_can_move(self, _player, _depth):
+        """获取可落子点。
+
+        获取可落子点与该点的分值，仅返回分值较高的数个点。\n
+        自适应宽度时，分值与最后一个返回点接近的点也会被返回。
 
         Args:
-            _board: 棋盘数组
-            _pos: 该行中间位置的坐标
-            _offset: 偏移方向
-            _player: (己方玩家编号, 敌方玩家编号)
+            _player: (己方玩家编号，敌方玩家编号)
+            _depth: 当前搜索深度
 
         Returns:
-            一行棋子的落子者的列表。
+            可落子点数组。
         """
-        x, y = _pos
-        _, opponent = _player
-        start_x = x + (-5 * _offset[0])
-        start_y = y + (-5 * _offset[1])
-        res = []
-        for i in range(9):
-            start_x += _offset[0]
-            start_y += _offset[1]
-            if (not 0 <= start_x < CHESS_MAX_NUM or
-                    not 0 <= start_y < CHESS_MAX_NUM):
-                res.append(opponent)
+        fives = []
+        m_fours, o_fours = [], []
+        m_sfours, o_sfours = [], []
+        can_moves = []
+        mine, opponent = _player
+        area = self.__table.area
+        coords = self.__table.coords
+        scores = self.__point_cache.scores
+        indices = list(self.__can_move)
+        self.__evaluate_points(indices)
+        for index in indices:
+            pos = coords[index]
+            m_s = scores[mine * area + index]
+            o_s = scores[opponent * area + index]
+            if max(m_s, o_s) >= ChessScore.LIVE_FIVE:
+                fives.append((max(m_s, o_s), pos))
+            elif m_s >= ChessScore.LIVE_FOUR:
+                m_fours.append((m_s, pos))
+            elif o_s >= ChessScore.LIVE_FOUR:
+                o_fours.append((o_s, pos))
+            elif m_s >= ChessScore.SLEEP_FOUR:
+                m_sfours.append((m_s, pos))
+            elif o_s >= ChessScore.SLEEP_FOUR:
+                o_sfours.append((o_s, pos))
             else:
-                res.append(_board[start_x][start_y])
-        return res
+                can_moves.append((max(m_s, o_s), pos))
 
-    @staticmethod
-    def __get_one_chess_shape(_board, _pos, _player, _offset, _count,
-                              _visited=None):
-        """获取一行棋子中的棋形。
+        if len(fives) > 0:
+            return fives
+        if len(m_fours) > 0:
+            return m_fours
+        if len(o_fours) > 0:
+            return o_fours + m_sfours
 
-        根据 _pos 处在 _offset 方向上获取的一行棋子落子者列表，\n
-        判断其中所含有的棋形。
+        move_num = self.__move_num[_depth]
+        if self.__policy is not None and len(can_moves) > 1:
+            # 由走法模型排序并只保留概率较高的落子。
+            logits = self.__policy.get_logits(
+                self.__table, self.__chess,
+                [x * self.__size + y for _, (x, y) in can_moves], mine)
+            return [can_moves[i]
+                    for i in self.__policy.select(logits, move_num)]
+
+        can_moves.sort(reverse=True)
+        if self.__adaptive_width and len(can_moves) > move_num > 0:
+            # 分值接近时难以判断优劣，额外搜索几个点。
+            last_score = can_moves[move_num - 1][0] - AI_CLOSE_SCORE_GAP
+            limit = min(len(can_moves), move_num + AI_CLOSE_MOVE_NUM)
+            while move_num < limit and can_moves[move_num][0] >= last_score:
+                move_num += 1
+        return can_moves[:move_num]
+
+    def __set_depth(self, _depth):
+        """设置搜索深度与每层搜索宽度方法。
+
+        自适应宽度时根节点最宽，之后逐层线性变窄，最深一层最窄。
 
         Args:
-            _board: 棋盘数组
-            _pos: 中心点坐标
-            _player: (己方玩家编号, 对手玩家编号)
-            _offset: 偏移方向
-            _count: 棋形数量数组
-            _visited: 记录已统计过棋形的棋子列表
+            _depth: 搜索深度
+        """
+        profile = self.__profile
+        self.__depth = _depth
+        if not self.__adaptive_width:
+            self.__move_num = [profile.move_num] * _depth
+        elif _depth <= 1:
+            self.__move_num = [profile.root_move_num] * _depth
+        else:
+            root, leaf = profile.root_move_num, profile.leaf_move_num
+            self.__move_num = [root - (root - leaf) * depth // (_depth - 1)
+                               for depth in range(_depth)]
+
+    def __evaluate_board(self, _player):
+        """计算当前棋局分值方法。
 
-        Returns:
-            各种棋形数量的列表。
-        """
-        def set_visited(_left, _right, _pos, _offset, _visited):
-            """更新 visited 数组函数。"""
-            if _visited is None: return
-            x, y = _pos
-            offset_x, offset_y = _offset
-            start_x = x + (-5 + _left) * offset_x
-            start_y = y + (-5 + _left) * offset_y
-            for i in range(_left, _right + 1):
-                start_x += offset_x
-                start_y += offset_y
-                _visited[start_x][start_y] = True
+        仅遍历已落子点，计算量与棋子数量而非棋盘面积相关。\n
+        结果按棋局哈希值缓存，同时记录棋局中是否有未解决的威胁。
 
+        Args:
+            _player: (己方玩家编号, 敌方玩家编号)
+
+        Returns:
+            棋局分值。
+        """
         mine, opponent = _player
-        chess_list = AI.__get__chess_list(_board, _pos, _offset, _player)
+        key = self.__hash ^ mine    # 评分与落子方有关，以最低位区分落子方。
+        cached = self.__position_cache.lookup(key)
+        if cached is not None:
+            score, self.__threat = cached
+            return score
+
+        buffer = self.__buffer
+        buffer.reset_board_count()
+        count = self.__shape.get_board_shape(
+            self.__table, self.__chess, self.__stones, buffer.board_count,
+            buffer.visited)
+        self.__threat = False
+        for player_count in count:
+            if (player_count[ChessType.LIVE_FOUR] > 0 or
+                    player_count[ChessType.SLEEP_FOUR] > 0 or
+                    player_count[ChessType.LIVE_THREE] > 0):
+                self.__threat = True
+        m_s, o_s = self.__weights.get_board_score(
+            (count[mine], count[opponent]))
+        self.__position_cache.store(key, m_s - o_s, self.__threat)
+        return m_s - o_s
 
-        # 统计己方有多少已连起来的棋子。
-        left_index, right_index = 4, 4
-        while right_index < 8:
-            if chess_list[right_index + 1] != mine:
-                break
-            right_index += 1
-        while left_index > 0:
-            if chess_list[left_index - 1] != mine:
-                break
-            left_index -= 1
+    def __evaluate_points(self, _indices):
+        """计算多个点的分值方法。
 
-        # 统计两端有多少空格。
-        left_range, right_range = left_index, right_index
-        while right_range < 8:
-            if chess_list[right_range + 1] == opponent:
-                break
-            right_range += 1
-        while left_range > 0:
-            if chess_list[left_range - 1] == opponent:
-                break
-            left_range -= 1
+        单点评分缓存未命中的点一次性交给棋形计算模块，\n
+        使 NumPy 后端可以用一次数组运算完成整批计算。
 
-        chess_range = right_range - left_range + 1  # 连续的己方棋子 + 空白格数。
-        if chess_range < 5:
-            # 己方棋子 + 空白格数不到 5 格，则无法形成活五棋形。
-            set_visited(left_range, right_range, _pos, _offset, _visited)
+        Args:
+            _indices: 待评分点的一维下标列表
+        """
+        cache = self.__point_cache
+        misses = [index for index in _indices if not cache.lookup(index)]
+        if len(misses) == 0:
             return
+        results = self.__shape.get_points_score(self.__table, self.__chess,
+                                                misses)
+        for index, (scores, levels) in zip(misses, results):
+            cache.store(index, scores, levels)
 
-        set_visited(left_index, right_index, _pos, _offset, _visited)
-
-        mine_range = right_index - left_index + 1  # 连续的己方棋子数。
-        if mine_range >= 5:
-            # 活五棋形。
-            _count[ChessType.LIVE_FIVE] += 1
-
-        if mine_range == 4:
-            # 考虑冲四和活四棋形。
-            left_empty = right_empty = False
-            if chess_list[left_index - 1] == PlayerEnum.NO_PLAYER:
-                left_empty = True
-            if chess_list[right_index + 1] == PlayerEnum.NO_PLAYER:
-                right_empty = True
-            if left_empty and right_empty:
-                # 活四。
-                _count[ChessType.LIVE_FOUR] += 1
-            elif left_empty or right_empty:
-                # 冲四。
-                _count[ChessType.SLEEP_FOUR] += 1
-
-        if mine_range == 3:
-            # 考虑眠三、活三和冲四棋形。
-            left_empty = right_empty = False
-            left_four = right_four = False
-            if chess_list[left_index - 1] == PlayerEnum.NO_PLAYER:
-                if chess_list[left_index - 2] == mine:
-                    set_visited(left_index - 2, left_index - 1, _pos, _offset,
-                                _visited)
-                    # 左侧有缺口的冲四棋形。
-                    _count[ChessType.SLEEP_FOUR] += 1
-                    left_four = True
-                left_empty = True
-
-            if chess_list[right_index + 1] == PlayerEnum.NO_PLAYER:
-                if chess_list[right_index + 2] == mine:
-                    set_visited(right_index + 1, right_index + 2, _pos, _offset,
-                                _visited)
-                    # 右侧有缺口的冲四棋形。
-                    _count[ChessType.SLEEP_FOUR] += 1
-                    right_four = True
-                right_empty = True
-
-            if left_four or right_four:
-                pass
-            elif left_empty and right_empty:
-                if chess_range > 5:
-                    # 活三棋形。
-                    _count[ChessType.LIVE_THREE] += 1
-                else:
-                    # 眠三棋形。
-                    _count[ChessType.SLEEP_THREE] += 1
-            elif left_empty or right_empty:
-                # 眠三棋形。
-                _count[ChessType.SLEEP_THREE] += 1
-
-            if mine_range == 2:
-                # 考虑冲四、眠三、活三、眠二和活二棋形。
-                left_empty = right_empty = False
-                left_three = right_three = False
-                if chess_list[left_index - 1] == PlayerEnum.NO_PLAYER:
-                    if chess_list[left_index - 2] == mine:
-                        set_visited(left_index - 2, left_index - 1, _pos,
-                                    _offset, _visited)
-                        if chess_list[left_index - 3] == PlayerEnum.NO_PLAYER:
-                            if (chess_list[right_index + 1] ==
-                                    PlayerEnum.NO_PLAYER):
-                                # 活三棋形。
-                                _count[ChessType.LIVE_THREE] += 1
-                            else:
-                                # 眠三棋形。
-                                _count[ChessType.SLEEP_THREE] += 1
-                            left_three = True
-                        elif chess_list[left_index - 3] == opponent:
-                            if (chess_list[right_index + 1] ==
-                                    PlayerEnum.NO_PLAYER):
-                                # 眠三棋形。
-                                _count[ChessType.SLEEP_THREE] += 1
-                                left_three = True
-
-                    left_empty = True
-
-                if chess_list[right_index + 1] == PlayerEnum.NO_PLAYER:
-                    if chess_list[right_index + 2] == mine:
-                        if chess_list[right_index + 3] == mine:
-                            set_visited(right_index + 1, right_index + 2, _pos,
-                                        _offset, _visited)
-                            # 冲四棋形。
-                            _count[ChessType.SLEEP_FOUR] += 1
-                            right_three = True
-                        elif (chess_list[right_index + 3] ==
-                              PlayerEnum.NO_PLAYER):
-                            if left_empty:
-                                # 活三棋形。
-                                _count[ChessType.LIVE_THREE] += 1
-                            else:
-                                # 眠三棋形。
-                                _count[ChessType.SLEEP_THREE] += 1
-                            right_three = True
-                        elif left_empty:
-                            # 眠三棋形。
-                            _count[ChessType.SLEEP_THREE] += 1
-                            right_three = True
-
-                    right_empty = True
-
-                if left_three or right_three:
-                    pass
-                elif left_empty and right_empty:
-                    # 活二棋形。
-                    _count[ChessType.LIVE_TWO] += 1
-                elif left_empty or right_empty:
-                    # 眠二棋形。
-                    _count[ChessType.SLEEP_TWO] += 1
-
-            if mine_range == 1:
-                # 考虑眠二和活二棋形。
-                left_empty = False
-                if chess_list[left_index - 1] == PlayerEnum.NO_PLAYER:
-                    if chess_list[left_index - 2] == mine:
-                        if chess_list[left_index - 3] == PlayerEnum.NO_PLAYER:
-                            if chess_list[right_index + 1] == opponent:
-                                # 眠二棋形。
-                                _count[ChessType.SLEEP_TWO] += 1
-                    left_empty = True
-
-                if chess_list[right_index + 1] == PlayerEnum.NO_PLAYER:
-                    if chess_list[right_index + 2] == mine:
-                        if chess_list[right_index + 3] == PlayerEnum.NO_PLAYER:
-                            if left_empty:
-                                # 活二棋形。
-                                _count[ChessType.LIVE_TWO] += 1
-                            else:
-                                # 眠二棋形。
-                                _count[ChessType.SLEEP_TWO] += 1
-                    elif chess_list[right_index + 2] == PlayerEnum.NO_PLAYER:
-                        if (chess_list[right_index + 3] == mine and
-                                chess_list[right_index + 4] ==
-                                PlayerEnum.NO_PLAYER):
-                            # 活二棋形。
-                            _count[ChessType.LIVE_TWO] += 1
-        return _count
+    def __sync_board(self, _board, _changes=None):
+        """同步棋盘方法。
 
-    @staticmethod
-    def __get_point_score(_count):
-        """根据棋形获取某点的分值。
+        给出 _changes 时只比较其中的点，开销与变化的点数成正比；\n
+        否则（以及第一次同步时）扫描整个棋盘，重建一维棋盘、已落子点\n
+        与哈希值，开销与棋盘面积成正比。两种情况下都只有发生变化的点\n
+        会更新可选落子点并使单点评分缓存失效。
 
-        根据 __get_chess_shape 函数中获得的各个棋形数量，\n
-        获取某点的分值。
+        Args:
+            _board: 棋盘数组
+            _changes: 可能有变化的点的坐标列表，可以重复
+        """
+        if _changes is not None and self.__synced:
+            self.__sync_points(_board, _changes)
+            return
+        self.__synced = True
+        area = self.__table.area
+        zobrist = self.__table.zobrist
+        self.__stones = []
+        self.__hash = 0
+        added, removed = [], []
+        for index, (x, y) in enumerate(self.__table.coords):
+            player = int(_board[x][y])
+            if self.__chess[index] != player:
+                self.__point_cache.invalidate(index)
+                if player == NO_PLAYER:
+                    removed.append(index)
+                elif self.__chess[index] == NO_PLAYER:
+                    added.append(index)
+            self.__chess[index] = player
+            if player != NO_PLAYER:
+                self.__stones.append(index)
+                self.__hash ^= zobrist[player * area + index]
+
+        # 棋盘全部更新后再更新可选落子点，先取回棋子再落子。
+        for index in removed:
+            self.__can_move.remove(index)
+        for index in added:
+            self.__can_move.add(index, self.__chess)
+
+    def __sync_points(self, _board, _changes):
+        """只同步若干个点方法。
 
         Args:
-            _count: 各棋形数量
+            _board: 棋盘数组
+            _changes: 可能有变化的点的坐标列表，可以重复
+        """
+        added, removed = [], []
+        for x, y in _changes:
+            index = x * self.__size + y
+            player = int(_board[x][y])
+            chess = self.__chess[index]
+            if chess == player:
+                continue
+            if chess != NO_PLAYER:
+                self.__set_chess((x, y), NO_PLAYER)
+                if player == NO_PLAYER:
+                    removed.append(index)
+            if player != NO_PLAYER:
+                self.__set_chess((x, y), player)
+                if chess == NO_PLAYER:
+                    added.append(index)
+
+        # 与整体同步相同，先取回棋子再落子。
+        for index in removed:
+            self.__can_move.remove(index)
+        for index in added:
+            self.__can_move.add(index, self.__chess)
+
+    def __set_chess(self, _pos, _player):
+        """在一维棋盘上落子或取回棋子方法。
+
+        同时维护已落子点与哈希值。
 
-        Returns:
-            该点分值。
-        """
-        score = 0
-        if _count[ChessType.LIVE_FIVE] > 0:
-            return ChessScore.LIVE_FIVE
-
-        if _count[ChessType.LIVE_FOUR] > 0:
-            return ChessScore.LIVE_FOUR
-
-        if _count[ChessType.SLEEP_FOUR] > 1:
-            score += _count[ChessType.SLEEP_FOUR] * ChessScore.SLEEP_FOUR
-        elif (_count[ChessType.SLEEP_FOUR] > 0 and
-              _count[ChessType.LIVE_THREE] > 0):
-            score += _count[ChessType.SLEEP_FOUR] * ChessScore.SLEEP_FOUR
-        elif _count[ChessType.SLEEP_FOUR] > 0:
-            score += ChessScore.LIVE_THREE
-
-        if _count[ChessType.LIVE_THREE] > 1:
-            score += 5 * ChessScore.LIVE_THREE
-        elif _count[ChessType.LIVE_THREE] > 0:
-            score += ChessScore.LIVE_THREE
-
-        if _count[ChessType.SLEEP_THREE] > 0:
-            score += (_count[ChessType.SLEEP_THREE] *
-                      ChessScore.SLEEP_THREE)
-        if _count[ChessType.LIVE_TWO] > 0:
-            score += _count[ChessType.LIVE_TWO] * ChessScore.LIVE_TWO
-        if _count[ChessType.SLEEP_TWO] > 0:
-            score += _count[ChessType.SLEEP_TWO] * ChessScore.SLEEP_TWO
-
-        return score
+        Args:
+            _pos: 坐标
+            _player: 落子的玩家编号，为 NO_PLAYER 时是取回棋子
+        """
+        x, y = _pos
+        index = x * self.__size + y
+        area = self.__table.area
+        if _player == NO_PLAYER:
+            self.__hash ^= self.__table.zobrist[
+                self.__chess[index] * area + index]
+            self.__stones.remove(index)
+        else:
+            self.__hash ^= self.__table.zobrist[_player * area + index]
+            insort(self.__stones, index)
+        self.__chess[index] = _player
+        self.__point_cache.invalidate(index)
+
+    def __update_can_move(self, _pos, _add):
+        """更新可选落子点。
 
-    @staticmethod
-    def __get_board_score(_player_count):
-        """获取全局棋形评分。
+        根据当前所下位置更新可选落子点。
 
         Args:
-            _player_count: (己方棋形数量, 对方棋形数量)
-
-        Returns:
-            (我方评分，对方评分)。
-        """
-        mine_count, opponent_count = _player_count
-        m_score, o_score = 0, 0
-        # 有活五时，直接返回活五分值。
-        if mine_count[ChessType.LIVE_FIVE] > 0:
-            return ChessScore.LIVE_FIVE, 0
-        if opponent_count[ChessType.LIVE_FIVE] > 0:
-            return 0, ChessScore.LIVE_FIVE
-
-        # 有两个冲四时，可以视作一个活四。
-        if mine_count[ChessType.SLEEP_FOUR] >= 2:
-            mine_count[ChessType.LIVE_FOUR] += 1
-        if opponent_count[ChessType.SLEEP_FOUR] >= 2:
-            opponent_count[ChessType.LIVE_FOUR] += 1
-
-        # 优先考虑己方活四和冲四。
-        if mine_count[ChessType.LIVE_FOUR] > 0:
-            return 9050, 0
-        if mine_count[ChessType.SLEEP_FOUR] > 0:
-            return 9040, 0
-
-        # 其次考虑防守敌方活四。
-        if opponent_count[ChessType.LIVE_FOUR] > 0:
-            return 0, 9030
-        # 如果敌方有冲四又有活三，需要防守。
-        if (opponent_count[ChessType.SLEEP_FOUR] > 0 and
-                opponent_count[ChessType.LIVE_THREE] > 0):
-            return 0, 9020
-
-        # 己方有活三、敌方无冲四时，可以返回活三分值。
-        if (mine_count[ChessType.LIVE_THREE] > 0 and
-                opponent_count[ChessType.SLEEP_FOUR] == 0):
-            return 9010, 0
-
-        # 敌方有活三，己方无眠三、活三时，需要防守活三。
-        if (opponent_count[ChessType.LIVE_THREE] > 1 and
-                mine_count[ChessType.LIVE_THREE] == 0 and
-                mine_count[ChessType.SLEEP_THREE] == 0):
-            return 0, 9000
-
-        # 以下是对非优先棋形的计分。
-        if opponent_count[ChessType.SLEEP_FOUR] > 0:
-            m_score += 40
-
-        if mine_count[ChessType.LIVE_THREE] > 1:
-            m_score += 5000
-        elif mine_count[ChessType.LIVE_THREE] == 1:
-            m_score += 100
-
-        if opponent_count[ChessType.LIVE_THREE] > 1:
-            o_score += 2000
-        elif opponent_count[ChessType.LIVE_THREE] == 1:
-            o_score += 400
-
-        m_score += mine_count[ChessType.SLEEP_THREE] * 10
-        o_score += opponent_count[ChessType.SLEEP_THREE] * 10
-
-        m_score += mine_count[ChessType.LIVE_TWO] * 6
-        o_score += opponent_count[ChessType.SLEEP_TWO] * 6
-
-        m_score += mine_count[ChessType.SLEEP_TWO] * 2
-        o_score += opponent_count[ChessType.SLEEP_TWO] * 2
-
-        return m_score, o_score
+            _pos: 中间点
+            _add: 为 True 时是落子，否则为取回了一子
+        """
+        x, y = _pos
+        index = x * self.__size + y
+        if _add:
+            self.__can_move.add(index, self.__chess)
+        else:
+            self.__can_move.remove(index)
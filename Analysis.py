@@ -0,0 +1,176 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    Analysis.py
+时间:
+    2026/10/19 14:45
+"""
+import json
+import os
+import shelve
+import threading
+import time
+
+from AI import AI
+from BoardTable import get_board_table
+from Constant import ChessScore
+from Constant import PlayerEnum
+from Profile import Profile
+from Settings import ANALYSIS_CACHE_PATH
+from Settings import RECORD_DIR
+
+
+def save_record(_size, _steps, _path=None, _seed=None):
+    """保存棋谱方法。
+
+    Args:
+        _size: 棋盘每行每列格子数量
+        _steps: 落子记录列表，格式为 [((x 坐标, y 坐标), 落子者)]
+        _path: 棋谱文件路径，默认在 RECORD_DIR 下以当前时间命名
+        _seed: AI 的随机数种子，以 `main.py --seed` 指定后可复现该局 AI 的落子
+
+    Returns:
+        棋谱文件路径。
+    """
+    if _path is None:
+        record_dir = os.path.expanduser(RECORD_DIR)
+        os.makedirs(record_dir, exist_ok=True)
+        _path = os.path.join(record_dir, time.strftime('%Y%m%d-%H%M%S.json'))
+    record = {
+        'size': _size,
+        'steps': [[x, y, int(player)] for (x, y), player in _steps],
+    }
+    if _seed is not None:
+        record['seed'] = _seed
+    with open(_path, 'w') as f:
+        json.dump(record, f)
+    return _path
+
+
+def load_record(_path):
+    """读取棋谱方法。
+
+    Args:
+        _path: 棋谱文件路径
+
+    Returns:
+        (棋盘每行每列格子数量, 落子记录列表)。
+    """
+    with open(_path) as f:
+        record = json.load(f)
+    steps = [((x, y), PlayerEnum(player)) for x, y, player in record['steps']]
+    return record['size'], steps
+
+
+class Analyzer(object):
+    """棋局分析类。
+
+    在后台线程中依次分析棋谱中每一步之后的局面，得到轮到落子一方的\n
+    AI 评分与最佳落子点。结果以局面的 Zobrist 哈希值与 AI 的搜索参数摘要\n
+    为键保存在磁盘缓存中，重新打开同一棋谱或有相同开局的棋谱时\n
+    直接读取缓存，修改任何搜索参数后则重新分析。
+    """
+
+    def __init__(self, _size, _steps, _cache_path=ANALYSIS_CACHE_PATH):
+        """初始化棋局分析方法。
+
+        Args:
+            _size: 棋盘每行每列格子数量
+            _steps: 落子记录列表，格式为 [((x 坐标, y 坐标), 落子者)]
+            _cache_path: 磁盘缓存文件路径
+        """
+        self.__size = _size
+        self.__steps = list(_steps)
+        self.__cache_path = os.path.expanduser(_cache_path)
+        # 第 i 项为落下 i 个棋子后局面的分析结果，尚未分析时为 None。
+        self.__results = [None] * (len(self.__steps) + 1)
+        self.__lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+
+    def start(self):
+        """开始后台分析方法。"""
+        self.__thread.start()
+
+    def stop(self):
+        """停止后台分析方法。
+
+        当前局面分析完成后线程才会退出。
+        """
+        self.__stop.set()
+
+    def get_result(self, _num):
+        """获取分析结果方法。
+
+        Args:
+            _num: 局面中的棋子数量
+
+        Returns:
+            (黑方视角的评分, 最佳落子点)，尚未分析完成时为 None，\n
+            已分出胜负的局面最佳落子点为 None。
+        """
+        with self.__lock:
+            return self.__results[_num]
+
+    @property
+    def done_num(self):
+        """已分析完成的局面数属性。
+
+        Returns:
+            已分析完成的局面数。
+        """
+        with self.__lock:
+            return sum(result is not None for result in self.__results)
+
+    def __run(self):
+        """后台分析线程方法。"""
+        size = self.__size
+        table = get_board_table(size)
+        board = [[PlayerEnum.NO_PLAYER] * size for _ in range(size)]
+        # 使用 Settings.py 中的参数且不限制预算，使分析结果可以复现。
+        ai = AI((PlayerEnum.PLAYER_ONE, PlayerEnum.PLAYER_TWO), size,
+                _profile=Profile())
+        position_hash = 0
+        cache_dir = os.path.dirname(self.__cache_path)
+        if cache_dir != '':
+            os.makedirs(cache_dir, exist_ok=True)
+
+        with shelve.open(self.__cache_path) as cache:
+            for num in range(len(self.__results)):
+                if self.__stop.is_set():
+                    return
+                now = PlayerEnum.PLAYER_ONE
+                if num > 0:
+                    (x, y), player = self.__steps[num - 1]
+                    board[x][y] = player
+                    position_hash ^= table.zobrist[
+                        player * table.area + x * size + y]
+                    now = PlayerEnum(1 - player)
+                if num < len(self.__steps):
+                    now = self.__steps[num][1]
+                players = now, PlayerEnum(1 - now)
+
+                # 搜索参数的摘要包括难度配置、评分参数与走法模型，\n
+                # 任何一项变化都不会读到旧的结果。
+                key = '{}:{}:{:016x}:{}'.format(
+                    size, ai.search_key, position_hash, int(now))
+                result = cache.get(key)
+                if result is None:
+                    if num > 0 and ai.game_over(board, (x, y),
+                                                players[::-1]):
+                        # 上一步落子的一方已经获胜。
+                        score, best_move = -ChessScore.LIVE_FIVE, None
+                    else:
+                        score, best_move = ai.analyse(board, players)
+                    # 统一转换为黑方视角的评分。
+                    if now != PlayerEnum.PLAYER_ONE:
+                        score = -score
+                    result = int(score), best_move
+                    cache[key] = result
+                with self.__lock:
+                    self.__results[num] = result
@@ -0,0 +1,110 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    Asset.py
+时间:
+    2026/10/19 11:48
+"""
+import pygame
+
+from Utils import resource_path
+
+# 游戏中所用图片的名称与相对路径。
+IMAGE_PATH = {
+    'background': './resource/image/background.jpg',
+    'ai': './resource/image/ai.jpg',
+    'head': './resource/image/head.ico',
+}
+
+# 首页所需的图片名称，其余图片在第一次使用时加载。
+FIRST_INTERFACE_IMAGES = ('background', 'head')
+
+# 全局共享的资源管理器。
+_asset_manager = None
+
+
+class AssetManager(object):
+    """资源管理类。
+
+    统一加载游戏中的图片，并将其转换为与窗口相同的像素格式，\n
+    缩放后的图片按尺寸缓存，所有界面共享同一份 Surface。
+    """
+
+    def __init__(self):
+        """初始化资源管理器方法。"""
+        self.__images = {}      # 原始尺寸的图片。
+        self.__scaled = {}      # 以 (名称, 尺寸) 为键的缩放后图片。
+
+    def preload(self, _names=None):
+        """预加载图片方法。
+
+        Args:
+            _names: 需要预加载的图片名称列表，默认为全部图片
+        """
+        if _names is None:
+            _names = IMAGE_PATH.keys()
+        for name in _names:
+            self.get_image(name)
+
+    def get_image(self, _name, _size=None):
+        """获取图片方法。
+
+        第一次获取时加载图片；窗口已创建时会转换像素格式，以加快绘制。
+
+        Args:
+            _name: 图片名称，为 IMAGE_PATH 中的键
+            _size: 图片尺寸 (长, 宽)，默认为原始尺寸
+
+        Returns:
+            图片 Surface。
+        """
+        image = self.__images.get(_name)
+        if image is None:
+            image = self.__convert(
+                pygame.image.load(resource_path(IMAGE_PATH[_name])))
+            self.__images[_name] = image
+        if _size is None:
+            return image
+
+        key = _name, tuple(_size)
+        scaled = self.__scaled.get(key)
+        if scaled is None:
+            scaled = self.__convert(pygame.transform.scale(image, key[1]))
+            self.__scaled[key] = scaled
+        return scaled
+
+    @staticmethod
+    def __convert(_image):
+        """转换图片像素格式方法。
+
+        带透明通道的图片使用 convert_alpha，其余图片使用 convert。\n
+        窗口尚未创建时无法转换，直接返回原图。
+
+        Args:
+            _image: 图片 Surface
+
+        Returns:
+            转换后的图片 Surface。
+        """
+        if pygame.display.get_surface() is None:
+            return _image
+        if _image.get_flags() & pygame.SRCALPHA:
+            return _image.convert_alpha()
+        return _image.convert()
+
+
+def get_asset_manager():
+    """获取全局共享的资源管理器方法。
+
+    Returns:
+        AssetManager 对象。
+    """
+    global _asset_manager
+    if _asset_manager is None:
+        _asset_manager = AssetManager()
+    return _asset_manager
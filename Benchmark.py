@@ -0,0 +1,951 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    Benchmark.py
+时间:
+    2026/10/19 12:10
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from array import array
+
+# 测量首帧时间的子进程代码。
+FIRST_FRAME_CODE = '''
+import time
+start = time.perf_counter()
+import pygame
+from Interactive import Interactive
+pygame.display.init()
+pygame.font.init()
+game = Interactive()
+game.play()
+print(time.perf_counter() - start, 'pygame' in __import__('sys').modules)
+'''
+
+# 测量第一次调用 AI 时间的子进程代码。
+FIRST_ENGINE_CALL_CODE = '''
+import time
+start = time.perf_counter()
+from AI import AI
+from Constant import PlayerEnum
+board = [[PlayerEnum.NO_PLAYER] * 15 for _ in range(15)]
+board[7][7] = PlayerEnum.PLAYER_ONE
+ai = AI((PlayerEnum.PLAYER_ONE, PlayerEnum.PLAYER_TWO))
+ai.make_decision(board, (7, 7))
+print(time.perf_counter() - start, 'pygame' in __import__('sys').modules)
+'''
+
+
+# 测量决策期间内存分配与垃圾回收停顿的子进程代码，兼容最初版本的 AI。
+ALLOCATION_CODE = '''
+import gc
+import json
+import resource
+import sys
+import time
+import tracemalloc
+import AI as module
+from AI import AI
+from Constant import PlayerEnum
+depth, size, positions = json.load(sys.stdin)
+pauses = []
+def on_gc(phase, info):
+    if phase == 'start':
+        pauses.append(-time.perf_counter())
+    else:
+        pauses[-1] += time.perf_counter()
+gc.callbacks.append(on_gc)
+tracemalloc.start()
+peaks = []
+for stones, pos in positions:
+    board = [[PlayerEnum.NO_PLAYER] * size for _ in range(size)]
+    for x, y, player in stones:
+        board[x][y] = PlayerEnum(player)
+    players = (PlayerEnum.PLAYER_TWO, PlayerEnum.PLAYER_ONE)
+    try:
+        from Profile import Profile
+        ai = AI(players, size, _profile=Profile(_depth=depth))
+    except ImportError:
+        module.AI_SEARCH_DEPTH = depth
+        ai = AI((PlayerEnum.PLAYER_ONE, PlayerEnum.PLAYER_TWO))
+        for x, y, _ in stones:
+            ai._AI__update_can_move(board, (x, y), True)
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    ai.make_decision(board, tuple(pos))
+    peaks.append(tracemalloc.get_traced_memory()[1] - base)
+tracemalloc.stop()
+gc.callbacks.remove(on_gc)
+print(json.dumps([peaks, pauses,
+                  resource.getrusage(resource.RUSAGE_SELF).ru_maxrss]))
+'''
+
+def run_code(_code, _headless=True):
+    """在新的 Python 进程中运行代码方法。
+
+    Args:
+        _code: 需要运行的代码，最后一行输出 (耗时, 是否加载了 pygame)
+        _headless: 是否使用无窗口的 SDL 驱动
+
+    Returns:
+        (进程总耗时, 代码内耗时, 是否加载了 pygame)。
+    """
+    env = dict(os.environ)
+    if _headless:
+        env['SDL_VIDEODRIVER'] = 'dummy'
+        env['SDL_AUDIODRIVER'] = 'dummy'
+    env['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', _code], env=env,
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            check=True, capture_output=True, text=True).stdout
+    total = time.perf_counter() - start
+    elapsed, pygame_loaded = output.split()[-2:]
+    return total, float(elapsed), pygame_loaded == 'True'
+
+
+def benchmark_startup(_repeat=5, _headless=True):
+    """启动时间基准测试方法。
+
+    分别测量从进程启动到绘制首帧，以及到第一次 AI 决策完成的时间。
+
+    Args:
+        _repeat: 重复次数
+        _headless: 是否使用无窗口的 SDL 驱动
+    """
+    for name, code in (('first frame', FIRST_FRAME_CODE),
+                       ('first engine call', FIRST_ENGINE_CALL_CODE)):
+        results = [run_code(code, _headless) for _ in range(_repeat)]
+        totals = [total for total, _, _ in results]
+        elapsed = [e for _, e, _ in results]
+        print('{:<18} process: min {:.3f}s median {:.3f}s  '
+              'in-code: min {:.3f}s median {:.3f}s  pygame loaded: {}'.format(
+                  name, min(totals), statistics.median(totals),
+                  min(elapsed), statistics.median(elapsed), results[0][2]))
+
+
+def random_boards(_size, _num, _seed=0):
+    """生成随机一维棋盘方法。
+
+    Args:
+        _size: 棋盘每行每列格子数量
+        _num: 棋盘数量
+        _seed: 随机数种子
+
+    Returns:
+        一维棋盘（含哨兵格）的列表。
+    """
+    from Constant import PlayerEnum
+    rand = random.Random(_seed)
+    area = _size * _size
+    boards = []
+    for _ in range(_num):
+        chess = bytearray([PlayerEnum.NO_PLAYER]) * (area + 1)
+        for index in rand.sample(range(area), rand.randint(1, area // 3)):
+            chess[index] = rand.randint(0, 1)
+        boards.append(chess)
+    return boards
+
+
+def compare_shape(_fast, _boards, _size):
+    """比较其他棋形模块与纯 Python 实现方法。
+
+    穷举一行 9 个棋子的全部情况，并在随机棋盘上比较单点与整个棋盘的棋形。
+
+    Args:
+        _fast: 需要检查的棋形模块
+        _boards: 随机一维棋盘列表
+        _size: 棋盘每行每列格子数量
+
+    Returns:
+        不一致的情况数量。
+    """
+    import Shape
+    from BoardTable import get_board_table
+    from Settings import CHESS_TYPE_NUM
+
+    def new_count():
+        return array('i', [0]) * CHESS_TYPE_NUM
+
+    mismatch = 0
+    line = tuple(range(9))
+    for chess_list in itertools.product((0, 1, 2), repeat=9):
+        for player in (0, 1), (1, 0):
+            results = []
+            for module in Shape, _fast:
+                count, visited = new_count(), bytearray(9)
+                module.get_one_chess_shape(chess_list, player, count, line,
+                                           visited)
+                results.append((count, visited))
+            if results[0] != results[1]:
+                mismatch += 1
+                print('window mismatch:', chess_list, player, results)
+
+    table = get_board_table(_size)
+    for chess in _boards:
+        stones = [i for i in range(table.area) if chess[i] != 2]
+        results = []
+        for module in Shape, _fast:
+            counts = new_count(), new_count()
+            visited = bytearray(4 * table.area)
+            module.get_board_shape(table, chess, stones, counts, visited)
+            points = []
+            for index in range(table.area):
+                if chess[index] != 2: continue
+                for player in 0, 1:
+                    count = module.get_point_shape(table, chess, index, player,
+                                                   new_count())
+                    points.append((count, module.get_point_score(count)))
+            empties = [i for i in range(table.area) if chess[i] == 2]
+            points.append(module.get_points_score(table, chess, empties))
+            results.append((counts, visited, points))
+        if results[0] != results[1]:
+            mismatch += 1
+            print('board mismatch:', bytes(chess))
+    return mismatch
+
+
+def time_shape(_module, _boards, _size):
+    """测量棋形模块计算随机棋盘所用时间方法。
+
+    Args:
+        _module: 棋形模块
+        _boards: 随机一维棋盘列表
+        _size: 棋盘每行每列格子数量
+
+    Returns:
+        所用秒数。
+    """
+    from BoardTable import get_board_table
+    from Settings import CHESS_TYPE_NUM
+    table = get_board_table(_size)
+    count = array('i', [0]) * CHESS_TYPE_NUM
+    start = time.perf_counter()
+    for chess in _boards:
+        stones = [i for i in range(table.area) if chess[i] != 2]
+        empties = [i for i in range(table.area) if chess[i] == 2]
+        _module.get_board_shape(table, chess, stones, (count, count),
+                                bytearray(4 * table.area))
+        _module.get_points_score(table, chess, empties)
+    return time.perf_counter() - start
+
+
+def load_shape_modules():
+    """加载可用的加速棋形模块方法。
+
+    Returns:
+        {模块名: 模块} 字典，未编译或缺少依赖的模块不在其中。
+    """
+    modules = {}
+    for name in 'FastShape', 'NumpyShape':
+        try:
+            modules[name] = __import__(name)
+        except ImportError:
+            print('{} is not available, skipped.'.format(name))
+    return modules
+
+
+def benchmark_shape(_num=200, _size=15):
+    """比较并测量加速棋形模块与纯 Python 实现方法。
+
+    FastShape 需先执行 `cythonize -i FastShape.pyx` 编译，\n
+    NumpyShape 需安装 NumPy，安装了 numba 时会被进一步编译。\n
+    任一模块与纯 Python 实现结果不一致时以返回码 1 退出。
+
+    Args:
+        _num: 随机棋盘数量
+        _size: 棋盘每行每列格子数量
+    """
+    import Shape
+    modules = load_shape_modules()
+    if len(modules) == 0:
+        sys.exit('No accelerated shape module is available.')
+    boards = random_boards(_size, _num)
+    python_time = time_shape(Shape, boards, _size)
+    print('Shape: {:.3f}s'.format(python_time))
+    failed = False
+    for name, module in modules.items():
+        mismatch = compare_shape(module, boards, _size)
+        # 先运行一次，排除 numba 编译所用时间。
+        time_shape(module, boards[:1], _size)
+        module_time = time_shape(module, boards, _size)
+        print('{}: {:.3f}s  speedup: {:.1f}x  mismatches: {}'.format(
+            name, module_time, python_time / module_time, mismatch))
+        failed = failed or mismatch > 0
+    if failed:
+        sys.exit(1)
+
+
+def reference_positions(_num=20, _size=15, _seed=0, _pairs=(2, 5)):
+    """生成参考局面方法。
+
+    在棋盘中央随机落下若干个双方交替的棋子，轮到黑方落子。
+
+    Args:
+        _num: 局面数量
+        _size: 棋盘每行每列格子数量
+        _seed: 随机数种子
+        _pairs: 双方各落子数的范围，默认为 2 到 5 个
+
+    Returns:
+        (棋盘数组, 最后一步落子坐标) 的列表。
+    """
+    from Constant import PlayerEnum
+    rand = random.Random(_seed)
+    center = _size // 2
+    radius = 3 if _pairs[1] <= 5 else 4
+    cells = [(x, y) for x in range(center - radius, center + radius + 1)
+             for y in range(center - radius, center + radius + 1)]
+    positions = []
+    for _ in range(_num):
+        board = [[PlayerEnum.NO_PLAYER] * _size for _ in range(_size)]
+        moves = rand.sample(cells, 2 * rand.randint(*_pairs))
+        for i, (x, y) in enumerate(moves):
+            board[x][y] = PlayerEnum(i % 2)
+        positions.append((board, moves[-1]))
+    return positions
+
+
+def search_positions(_positions, _size, _profile, _policy=None):
+    """在参考局面上搜索方法。
+
+    Args:
+        _positions: 参考局面列表
+        _size: 棋盘每行每列格子数量
+        _profile: AI 难度配置
+        _policy: 走法模型，为 None 时不使用
+
+    Returns:
+        (总节点数, 总耗时, 各局面的最佳落子点列表)。
+    """
+    from AI import AI
+    from Constant import PlayerEnum
+    nodes, moves = 0, []
+    start = time.perf_counter()
+    for board, _ in _positions:
+        ai = AI((PlayerEnum.PLAYER_TWO, PlayerEnum.PLAYER_ONE), _size,
+                _profile=_profile, _policy=_policy)
+        # 不随机选择落子，以便比较两种搜索选出的落子点。
+        _, move = ai.analyse(board, (PlayerEnum.PLAYER_ONE,
+                                     PlayerEnum.PLAYER_TWO))
+        moves.append(move)
+        nodes += ai.node_num
+    return nodes, time.perf_counter() - start, moves
+
+
+def benchmark_backend(_num=20, _size=15, _depth=4):
+    """比较搜索所用棋形模块的速度方法。
+
+    分别测量在新进程中导入 Shape 与 FastShape 的时间，以及在同一组\n
+    参考局面上搜索的总耗时，两者的节点数与落子点应完全相同。\n
+    NumpyShape 只用于批量计算整个棋盘，其速度见 shape 子命令。
+
+    Args:
+        _num: 参考局面数量
+        _size: 棋盘每行每列格子数量
+        _depth: 搜索深度
+    """
+    import AI
+    from Profile import Profile
+    positions = reference_positions(_num, _size)
+    use_fast_shape = AI.AI_USE_FAST_SHAPE
+    reference = None
+    for fast in False, True:
+        AI.AI_USE_FAST_SHAPE = fast
+        name = AI.load_shape_module().__name__
+        if fast and name == 'Shape':
+            print('FastShape is not available, skipped.')
+            continue
+        _, import_time, _ = run_code(
+            'import time\nstart = time.perf_counter()\nimport {}\n'
+            'print(time.perf_counter() - start, False)'.format(name))
+        nodes, elapsed, moves = search_positions(
+            positions, _size, Profile(_depth=_depth))
+        if reference is None:
+            reference = elapsed, moves
+        print('{:<10} import: {:6.3f}s  depth {} nodes: {:>7}  '
+              'time: {:6.2f}s  speedup: {:5.2f}x  same moves: {}'.format(
+                  name, import_time, _depth, nodes, elapsed,
+                  reference[0] / elapsed, moves == reference[1]))
+    AI.AI_USE_FAST_SHAPE = use_fast_shape
+
+
+def measure_allocation(_positions, _size, _depth, _directory):
+    """在某个源码目录中测量决策期间的内存分配与垃圾回收停顿方法。
+
+    Args:
+        _positions: 参考局面列表
+        _size: 棋盘每行每列格子数量
+        _depth: 搜索深度
+        _directory: 源码目录
+
+    Returns:
+        (各局面决策期间 tracemalloc 的峰值字节数列表,
+        各次垃圾回收的停顿秒数列表, 进程的最大常驻内存 KiB)。
+    """
+    from Constant import PlayerEnum
+    positions = [([[x, y, int(player)] for x, row in enumerate(board)
+                   for y, player in enumerate(row)
+                   if player != PlayerEnum.NO_PLAYER], pos)
+                 for board, pos in _positions]
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT='1')
+    output = subprocess.run(
+        [sys.executable, '-c', ALLOCATION_CODE], env=env, cwd=_directory,
+        input=json.dumps([_depth, _size, positions]), check=True,
+        capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def benchmark_allocation(_num=20, _size=15, _depth=4, _revision=None):
+    """决策期间内存分配与垃圾回收停顿基准测试方法。
+
+    在同一组参考局面上各调用一次 make_decision，统计 tracemalloc 记录的\n
+    每次决策的分配峰值、gc.callbacks 记录的垃圾回收停顿，以及进程的\n
+    ru_maxrss。指定 _revision 时先用 git archive 导出该版本，\n
+    在其中运行同样的测量作为对照。
+
+    Args:
+        _num: 参考局面数量
+        _size: 棋盘每行每列格子数量
+        _depth: 搜索深度
+        _revision: 作为对照的 git 版本，为 None 时只测量当前源码
+    """
+    positions = reference_positions(_num, _size)
+    directory = os.path.dirname(os.path.abspath(__file__))
+    trees = [('current', directory)]
+    with tempfile.TemporaryDirectory() as temp:
+        if _revision is not None:
+            archive = subprocess.run(['git', 'archive', _revision],
+                                     cwd=directory, check=True,
+                                     capture_output=True).stdout
+            subprocess.run(['tar', '-x', '-C', temp], input=archive,
+                           check=True)
+            trees.insert(0, (_revision, temp))
+        for name, tree in trees:
+            peaks, pauses, rss = measure_allocation(positions, _size,
+                                                    _depth, tree)
+            print('{:<12} peak alloc: median {:7.1f} KiB max {:7.1f} KiB  '
+                  'gc: {:>4} collections {:7.2f} ms total {:5.2f} ms max  '
+                  'maxrss: {:6.1f} MiB'.format(
+                      name, statistics.median(peaks) / 1024,
+                      max(peaks) / 1024, len(pauses), sum(pauses) * 1000,
+                      max(pauses, default=0) * 1000, rss / 1024))
+
+def benchmark_width(_num=20, _size=15, _depths=(4, 6)):
+    """比较固定宽度与自适应宽度搜索方法。
+
+    在同一组参考局面上，统计两种搜索在各深度下的总节点数、耗时，\n
+    以及与同深度固定宽度搜索选出相同落子点的局面数。
+
+    Args:
+        _num: 参考局面数量
+        _size: 棋盘每行每列格子数量
+        _depths: 需要比较的搜索深度
+    """
+    from Profile import Profile
+    positions = reference_positions(_num, _size)
+    for depth in _depths:
+        fixed = search_positions(positions, _size,
+                                 Profile(_depth=depth, _adaptive_width=False))
+        adaptive = search_positions(positions, _size,
+                                    Profile(_depth=depth,
+                                            _adaptive_width=True))
+        for name, (nodes, elapsed, moves) in (('fixed', fixed),
+                                              ('adaptive', adaptive)):
+            same = sum(a == b for a, b in zip(moves, fixed[2]))
+            print('depth {} {:<8} nodes: {:>8}  time: {:7.2f}s  '
+                  'same move as fixed: {}/{}'.format(
+                      depth, name, nodes, elapsed, same, len(positions)))
+
+
+def benchmark_profile(_num=20, _size=15):
+    """比较各难度配置的计算量方法。
+
+    在同一组参考局面上，统计各难度 AI 决策的总节点数与耗时。
+
+    Args:
+        _num: 参考局面数量
+        _size: 棋盘每行每列格子数量
+    """
+    from Constant import DifficultyEnum
+    from Profile import get_profile
+    positions = reference_positions(_num, _size)
+    for difficulty in DifficultyEnum:
+        nodes, elapsed, _ = search_positions(positions, _size,
+                                             get_profile(difficulty))
+        print('{:<6} nodes: {:>8}  time: {:7.2f}s  per move: {:.3f}s'.format(
+            difficulty.name.lower(), nodes, elapsed, elapsed / _num))
+
+
+def benchmark_policy(_model, _num=20, _size=15, _depths=(4, 6), _games=10):
+    """比较使用走法模型前后的搜索方法。
+
+    在同一组参考局面上，统计两种搜索在各深度下的总节点数、耗时，\n
+    以及与同深度不使用模型的搜索选出相同落子点的局面数；\n
+    再以普通难度让两种搜索交替执黑对弈。
+
+    Args:
+        _model: 走法模型文件路径
+        _num: 参考局面数量
+        _size: 棋盘每行每列格子数量
+        _depths: 需要比较的搜索深度
+        _games: 对局数
+    """
+    from AI import AI
+    from Constant import PlayerEnum
+    from Policy import load_policy
+    from Profile import Profile
+    policy = load_policy(_model)
+    positions = reference_positions(_num, _size)
+    for depth in _depths:
+        profile = Profile(_depth=depth)
+        baseline = search_positions(positions, _size, profile)
+        learned = search_positions(positions, _size, profile, policy)
+        for name, (nodes, elapsed, moves) in (('baseline', baseline),
+                                              ('policy', learned)):
+            same = sum(a == b for a, b in zip(moves, baseline[2]))
+            print('depth {} {:<8} nodes: {:>8}  time: {:7.2f}s  '
+                  'same move as baseline: {}/{}'.format(
+                      depth, name, nodes, elapsed, same, len(positions)))
+
+    wins = {'policy': 0, 'baseline': 0, 'draw': 0}
+    for game in range(_games):
+        policy_player = PlayerEnum(game % 2)
+        players = PlayerEnum(1 - policy_player), policy_player
+        engines = [AI(players, _size, _seed=game, _policy=policy),
+                   AI(players[::-1], _size, _seed=game + _games)]
+        if policy_player == PlayerEnum.PLAYER_TWO:
+            engines.reverse()
+        winner, _ = play_game(engines, _size)
+        if winner is None:
+            wins['draw'] += 1
+        else:
+            wins['policy' if winner == policy_player else 'baseline'] += 1
+    print(', '.join('{}: {}'.format(name, num) for name, num in wins.items()))
+
+
+def benchmark_memory(_num=20, _size=15, _budgets=(64, 1024, 4096)):
+    """比较不同内存预算下的搜索耗时方法。
+
+    在同一组参考局面上以普通难度搜索，统计棋局评分缓存的命中率、\n
+    AI 对象登记的内存占用，以及创建 AI 对象时 tracemalloc 统计的实际分配量。
+
+    Args:
+        _num: 参考局面数量
+        _size: 棋盘每行每列格子数量
+        _budgets: 各内存预算的 KiB 数
+    """
+    import tracemalloc
+    from AI import AI
+    from Constant import PlayerEnum
+    from Profile import Profile
+    positions = reference_positions(_num, _size)
+    player = PlayerEnum.PLAYER_TWO, PlayerEnum.PLAYER_ONE
+    AI(player, _size)   # 先创建各 AI 共用的棋盘预计算表。
+    for budget in _budgets:
+        profile = Profile(_memory_budget=budget * 1024)
+        tracemalloc.start()
+        ai = AI(player, _size, _profile=profile)
+        traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        start = time.perf_counter()
+        for board, _ in positions:
+            ai.analyse(board, player[::-1])
+        elapsed = time.perf_counter() - start
+        cache = ai.position_cache
+        lookups = max(cache.hits + cache.misses, 1)
+        print('{:>6} KiB  used: {:>8}  shared: {:>8}  traced: {:>8}  '
+              'entries: {:>7}/{:<7}  hit: {:5.1%}  time: {:.2f}s'.format(
+                  budget, ai.memory.used, ai.memory.shared, traced,
+                  cache.size, cache.capacity, cache.hits / lookups,
+                  elapsed))
+
+
+def benchmark_solver(_num=50, _size=15):
+    """比较证明数搜索开启与关闭时的计算量方法。
+
+    在双方各有 6 到 14 个棋子的参考局面上以普通难度搜索，\n
+    已有五连的局面不计入。
+
+    Args:
+        _num: 参考局面数量
+        _size: 棋盘每行每列格子数量
+    """
+    from AI import AI
+    from Constant import ChessScore
+    from Constant import PlayerEnum
+    from Profile import Profile
+    player = PlayerEnum.PLAYER_TWO, PlayerEnum.PLAYER_ONE
+    judge = AI(player, _size)
+    positions = []
+    for board, _ in reference_positions(2 * _num, _size, _pairs=(6, 14)):
+        stones = [((x, y), board[x][y]) for x in range(_size)
+                  for y in range(_size)
+                  if board[x][y] != PlayerEnum.NO_PLAYER]
+        if not any(judge.game_over(board, pos, (chess, 1 - chess))
+                   for pos, chess in stones):
+            positions.append(board)
+    positions = positions[:_num]
+    for solver_node_num in (0, Profile().solver_node_num):
+        profile = Profile(_solver_node_num=solver_node_num)
+        nodes, wins, start = 0, 0, time.perf_counter()
+        for board in positions:
+            ai = AI(player, _size, _profile=profile)
+            score, _ = ai.analyse(board, player[::-1])
+            nodes += ai.node_num
+            wins += score >= ChessScore.MAX
+        print('solver nodes: {:>5}  positions: {}  won: {:>3}  '
+              'nodes: {:>8}  time: {:.2f}s'.format(
+                  solver_node_num, len(positions), wins, nodes,
+                  time.perf_counter() - start))
+
+
+def play_game(_engines, _size=15, _max_step=120):
+    """让两个 AI 对弈一局方法。
+
+    黑方第一步落在天元。
+
+    Args:
+        _engines: (黑方 AI, 白方 AI)
+        _size: 棋盘每行每列格子数量
+        _max_step: 最大步数，超出时视为和棋
+
+    Returns:
+        (胜者编号, 步数)，和棋时胜者为 None。
+    """
+    from Constant import PlayerEnum
+    board = [[PlayerEnum.NO_PLAYER] * _size for _ in range(_size)]
+    pos = _size // 2, _size // 2
+    board[pos[0]][pos[1]] = PlayerEnum.PLAYER_ONE
+    player = PlayerEnum.PLAYER_TWO
+    for step in range(2, _max_step + 1):
+        engine = _engines[player]
+        pos = engine.make_decision(board, pos, ())
+        board[pos[0]][pos[1]] = player
+        if engine.game_over(board, pos, (player, PlayerEnum(1 - player))):
+            return player, step
+        player = PlayerEnum(1 - player)
+    return None, _max_step
+
+
+def benchmark_engine(_games=4, _size=15, _time_budget=1.0):
+    """蒙特卡洛树搜索与 α,β-剪枝搜索对弈方法。
+
+    α,β-剪枝搜索使用普通难度，双方交替执黑。
+
+    Args:
+        _games: 对局数
+        _size: 棋盘每行每列格子数量
+        _time_budget: 蒙特卡洛树搜索每步的秒数
+    """
+    from AI import AI
+    from Constant import PlayerEnum
+    from MCTS import MCTS
+    from Profile import Profile
+    wins = {'mcts': 0, 'alpha-beta': 0, 'draw': 0}
+    for game in range(_games):
+        mcts_player = PlayerEnum(1 - game % 2)
+        players = PlayerEnum(1 - mcts_player), mcts_player
+        mcts = MCTS(players, _size, _profile=Profile(
+            _time_budget=_time_budget), _seed=game)
+        alpha_beta = AI(players[::-1], _size, _seed=game)
+        engines = ((alpha_beta, mcts) if mcts_player == PlayerEnum.PLAYER_TWO
+                   else (mcts, alpha_beta))
+        start = time.perf_counter()
+        winner, steps = play_game(engines, _size)
+        if winner is None:
+            result = 'draw'
+        else:
+            result = 'mcts' if winner == mcts_player else 'alpha-beta'
+        wins[result] += 1
+        print('game {}: mcts plays {}, {} wins in {} moves ({:.1f}s)'.format(
+            game + 1, 'black' if mcts_player == PlayerEnum.PLAYER_ONE
+            else 'white', result, steps, time.perf_counter() - start))
+    print(', '.join('{}: {}'.format(name, num) for name, num in wins.items()))
+
+
+def search_worker(_args):
+    """共享置换表基准测试的工作进程方法。
+
+    Args:
+        _args: (工作进程编号, 参考局面数量, 棋盘每行每列格子数量,
+            搜索深度, 共享置换表名称)
+
+    Returns:
+        (总节点数, 总耗时)。
+    """
+    from AI import AI
+    from Constant import PlayerEnum
+    from Profile import Profile
+    worker, num, size, depth, table_name = _args
+    positions = reference_positions(num, size)
+    # 各进程以不同顺序搜索同一组局面。
+    random.Random(worker).shuffle(positions)
+    player = PlayerEnum.PLAYER_TWO, PlayerEnum.PLAYER_ONE
+    profile = Profile(_depth=depth)
+    nodes, start = 0, time.perf_counter()
+    for board, _ in positions:
+        ai = AI(player, size, _profile=profile, _shared_table=table_name)
+        ai.analyse(board, player[::-1])
+        nodes += ai.node_num
+    return nodes, time.perf_counter() - start
+
+
+def benchmark_shared(_workers=4, _num=20, _size=15, _depth=6,
+                     _table_size=16):
+    """比较多进程搜索时使用共享置换表的效果方法。
+
+    各工作进程以不同顺序搜索同一组参考局面，统计总节点数与总耗时。
+
+    Args:
+        _workers: 工作进程数
+        _num: 参考局面数量
+        _size: 棋盘每行每列格子数量
+        _depth: 搜索深度
+        _table_size: 共享置换表的 MiB 数
+    """
+    import multiprocessing
+    from Cache import TranspositionTable
+    table = TranspositionTable(
+        _table_size * 1024 * 1024 // TranspositionTable.ENTRY_SIZE,
+        'gobang-benchmark-{}'.format(os.getpid()), True)
+    try:
+        for name in (None, table.name):
+            args = [(worker, _num, _size, _depth, name)
+                    for worker in range(_workers)]
+            start = time.perf_counter()
+            with multiprocessing.Pool(_workers) as pool:
+                results = pool.map(search_worker, args)
+            print('{:<13} nodes: {:>8}  cpu: {:7.2f}s  wall: {:7.2f}s'.format(
+                'shared table' if name else 'no table',
+                sum(nodes for nodes, _ in results),
+                sum(elapsed for _, elapsed in results),
+                time.perf_counter() - start))
+    finally:
+        table.close()
+
+
+def send_command(_engine, _command):
+    """向协议模式的引擎进程发送命令并读取一行回复方法。
+
+    Args:
+        _engine: 引擎进程
+        _command: 命令
+
+    Returns:
+        (回复, 耗时)。
+    """
+    start = time.perf_counter()
+    _engine.stdin.write(_command + '\n')
+    _engine.stdin.flush()
+    return _engine.stdout.readline().strip(), time.perf_counter() - start
+
+
+def benchmark_protocol(_games=2, _size=15, _timeout_turn=1000,
+                       _max_memory=0):
+    """以 Gomocup 协议让两个引擎进程对弈方法。
+
+    检查协议前端能否完成整局对弈，并统计每步最长用时是否超过时间限制。
+
+    Args:
+        _games: 对局数，双方交替先手
+        _size: 棋盘每行每列格子数量
+        _timeout_turn: 每步时间限制（毫秒）
+        _max_memory: 内存限制（字节），0 为不限制
+    """
+    from AI import AI
+    from Constant import PlayerEnum
+    judge = AI((PlayerEnum.PLAYER_ONE, PlayerEnum.PLAYER_TWO), _size)
+    command = [sys.executable,
+               os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'Protocol.py')]
+    for game in range(_games):
+        engines = [subprocess.Popen(command, stdin=subprocess.PIPE,
+                                    stdout=subprocess.PIPE, text=True)
+                   for _ in range(2)]
+        for engine in engines:
+            engine.stdin.write('INFO timeout_turn {}\nINFO max_memory {}\n'
+                               .format(_timeout_turn, _max_memory))
+            reply, _ = send_command(engine, 'START {}'.format(_size))
+            if reply != 'OK':
+                sys.exit('START failed: {}'.format(reply))
+        # 第 game 局由 engines[game % 2] 执黑。
+        black = game % 2
+        board = [[PlayerEnum.NO_PLAYER] * _size for _ in range(_size)]
+        reply, elapsed = send_command(engines[black], 'BEGIN')
+        times, winner, step = [elapsed], None, 1
+        player = PlayerEnum.PLAYER_ONE
+        while True:
+            if reply.startswith('ERROR'):
+                sys.exit('engine error in game {}: {}'.format(game + 1,
+                                                              reply))
+            x, y = (int(value) for value in reply.split(','))
+            if board[x][y] != PlayerEnum.NO_PLAYER:
+                sys.exit('illegal move {} in game {}'.format(reply,
+                                                             game + 1))
+            board[x][y] = player
+            if judge.game_over(board, (x, y),
+                               (player, PlayerEnum(1 - player))):
+                winner = (black if player == PlayerEnum.PLAYER_ONE
+                          else 1 - black)
+                break
+            if step == _size * _size:
+                break
+            player = PlayerEnum(1 - player)
+            engine = engines[black if player == PlayerEnum.PLAYER_ONE
+                             else 1 - black]
+            reply, elapsed = send_command(engine, 'TURN {}'.format(reply))
+            times.append(elapsed)
+            step += 1
+        for engine in engines:
+            engine.stdin.write('END\n')
+            engine.stdin.close()
+            engine.wait()
+        print('game {}: {} in {} moves, slowest move {:.2f}s (limit '
+              '{:.2f}s), mean {:.2f}s'.format(
+                  game + 1, 'draw' if winner is None
+                  else 'engine {} wins'.format(winner + 1), step,
+                  max(times), _timeout_turn / 1000,
+                  statistics.mean(times)))
+
+
+def main():
+    """基准测试入口。"""
+    parser = argparse.ArgumentParser(description='Gobang benchmarks.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    startup = subparsers.add_parser('startup', help='time to first frame '
+                                                    'and first engine call')
+    startup.add_argument('--repeat', type=int, default=5)
+    startup.add_argument('--window', action='store_true',
+                         help='use the real video driver')
+
+    shape = subparsers.add_parser('shape', help='check FastShape and '
+                                                'NumpyShape against Shape '
+                                                'and time them')
+    shape.add_argument('--boards', type=int, default=200)
+    shape.add_argument('--size', type=int, default=15)
+
+    backend = subparsers.add_parser('backend', help='compare search speed '
+                                                    'of Shape and FastShape')
+    backend.add_argument('--positions', type=int, default=20)
+    backend.add_argument('--size', type=int, default=15)
+    backend.add_argument('--depth', type=int, default=4)
+
+    width = subparsers.add_parser('width', help='compare node counts of '
+                                                'fixed and adaptive width')
+    width.add_argument('--positions', type=int, default=20)
+    width.add_argument('--size', type=int, default=15)
+    width.add_argument('--depths', type=int, nargs='+', default=[4, 6])
+
+    profile = subparsers.add_parser('profile', help='compare the cost of '
+                                                    'difficulty profiles')
+    profile.add_argument('--positions', type=int, default=20)
+    profile.add_argument('--size', type=int, default=15)
+
+    policy = subparsers.add_parser('policy', help='compare search with and '
+                                                  'without a move-ordering '
+                                                  'policy')
+    policy.add_argument('--model', required=True,
+                        help='model file written by Policy.py')
+    policy.add_argument('--positions', type=int, default=20)
+    policy.add_argument('--size', type=int, default=15)
+    policy.add_argument('--depths', type=int, nargs='+', default=[4, 6])
+    policy.add_argument('--games', type=int, default=10)
+
+    memory = subparsers.add_parser('memory', help='compare search time '
+                                                  'under memory budgets')
+    memory.add_argument('--positions', type=int, default=20)
+    memory.add_argument('--size', type=int, default=15)
+    memory.add_argument('--budgets', type=int, nargs='+',
+                        default=[64, 1024, 4096], help='budgets in KiB')
+
+    solver = subparsers.add_parser('solver', help='compare search with and '
+                                                  'without the proof-number '
+                                                  'solver')
+    solver.add_argument('--positions', type=int, default=50)
+    solver.add_argument('--size', type=int, default=15)
+
+    engine = subparsers.add_parser('engine', help='play MCTS against the '
+                                                  'alpha-beta search')
+    engine.add_argument('--games', type=int, default=4)
+    engine.add_argument('--size', type=int, default=15)
+    engine.add_argument('--time', type=float, default=1.0,
+                        help='MCTS seconds per move')
+
+    shared = subparsers.add_parser('shared', help='search in several '
+                                                  'processes with and '
+                                                  'without a shared table')
+    shared.add_argument('--workers', type=int, default=4)
+    shared.add_argument('--positions', type=int, default=20)
+    shared.add_argument('--size', type=int, default=15)
+    shared.add_argument('--depth', type=int, default=6)
+    shared.add_argument('--table-size', type=int, default=16,
+                        help='table size in MiB')
+
+    protocol = subparsers.add_parser('protocol', help='play two engine '
+                                                      'processes through '
+                                                      'the Gomocup protocol')
+    protocol.add_argument('--games', type=int, default=2)
+    protocol.add_argument('--size', type=int, default=15)
+    protocol.add_argument('--timeout-turn', type=int, default=1000,
+                          help='milliseconds per move')
+    protocol.add_argument('--max-memory', type=int, default=0,
+                          help='bytes, 0 for no limit')
+
+    allocation = subparsers.add_parser('allocation', help='peak '
+                                                          'allocations and '
+                                                          'gc pauses during '
+                                                          'decisions')
+    allocation.add_argument('--positions', type=int, default=20)
+    allocation.add_argument('--size', type=int, default=15)
+    allocation.add_argument('--depth', type=int, default=4)
+    allocation.add_argument('--revision', default=None,
+                            help='git revision to measure for comparison')
+
+    args = parser.parse_args()
+    if args.command == 'startup':
+        benchmark_startup(args.repeat, not args.window)
+    elif args.command == 'shape':
+        benchmark_shape(args.boards, args.size)
+    elif args.command == 'allocation':
+        benchmark_allocation(args.positions, args.size, args.depth,
+                             args.revision)
+    elif args.command == 'backend':
+        benchmark_backend(args.positions, args.size, args.depth)
+    elif args.command == 'width':
+        benchmark_width(args.positions, args.size, args.depths)
+    elif args.command == 'profile':
+        benchmark_profile(args.positions, args.size)
+    elif args.command == 'policy':
+        benchmark_policy(args.model, args.positions, args.size, args.depths,
+                         args.games)
+    elif args.command == 'memory':
+        benchmark_memory(args.positions, args.size, args.budgets)
+    elif args.command == 'solver':
+        benchmark_solver(args.positions, args.size)
+    elif args.command == 'engine':
+        benchmark_engine(args.games, args.size, args.time)
+    elif args.command == 'protocol':
+        benchmark_protocol(args.games, args.size, args.timeout_turn,
+                           args.max_memory)
+    elif args.command == 'shared':
+        benchmark_shared(args.workers, args.positions, args.size,
+                         args.depth, args.table_size)
+
+
+if __name__ == '__main__':
+    main()
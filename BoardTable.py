@@ -0,0 +1,128 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    BoardTable.py
+时间:
+    2026/10/19 9:12
+"""
+from array import array
+from operator import itemgetter
+from random import Random
+
+from Constant import CandidateShape
+
+# 搜索时所需要遍历的米字方向。
+SEARCH_DIRECTION = ((0, 1), (1, 0), (1, -1), (1, 1))
+
+# 已创建的各尺寸棋盘预计算表。
+_board_tables = {}
+
+
+class BoardTable(object):
+    """棋盘预计算表类。
+
+    保存与棋盘尺寸相关、在搜索中反复使用的数据。\n
+    棋盘上的点以一维下标 x * size + y 表示，下标 area 为棋盘外的哨兵格。
+    """
+    __slots__ = ('size', 'area', 'coords', 'lines', 'line_array',
+                 'line_getters', 'line_cells', 'neighbour_cache', 'zobrist')
+
+    def __init__(self, _size):
+        """初始化棋盘预计算表方法。
+
+        Args:
+            _size: 棋盘每行每列格子数量
+        """
+        self.size = _size
+        self.area = _size * _size
+        self.coords = tuple((x, y) for x in range(_size) for y in range(_size))
+
+        # 每个点在四个方向上以其为中心的 9 个点的下标，下标 index * 4 + i。
+        self.lines = []
+        for x, y in self.coords:
+            for offset_x, offset_y in SEARCH_DIRECTION:
+                line = []
+                for i in range(-4, 5):
+                    line_x, line_y = x + i * offset_x, y + i * offset_y
+                    if 0 <= line_x < _size and 0 <= line_y < _size:
+                        line.append(line_x * _size + line_y)
+                    else:
+                        line.append(self.area)
+                self.lines.append(tuple(line))
+        self.lines = tuple(self.lines)
+        self.line_array = array('i', sum(self.lines, ()))
+        self.line_getters = tuple(itemgetter(*line) for line in self.lines)
+        # 每个点四个方向上 9 个点的并集，即棋形会受该点影响的点。
+        self.line_cells = tuple(
+            tuple(sorted(set(sum(self.lines[i * 4:i * 4 + 4], ())) -
+                         {self.area}))
+            for i in range(self.area))
+
+        # 各半径、形状下每个点的邻居下标，在第一次使用时创建。
+        self.neighbour_cache = {}
+
+        # 每个玩家在每个点落子时的 Zobrist 键值，下标 player * area + index。
+        rand = Random(_size)
+        self.zobrist = tuple(rand.getrandbits(64)
+                             for _ in range(2 * self.area))
+
+    def get_neighbours(self, _radius, _shape=CandidateShape.SQUARE):
+        """获取每个点周围邻居下标方法。
+
+        邻居关系是对称的，即 a 为 b 的邻居时 b 也为 a 的邻居。
+
+        Args:
+            _radius: 邻居半径
+            _shape: 邻居形状，为 CandidateShape 中的值
+
+        Returns:
+            每个点周围半径 _radius 内（不含自身）的下标元组构成的元组。
+        """
+        key = _radius, _shape
+        if key in self.neighbour_cache:
+            return self.neighbour_cache[key]
+
+        offsets = []
+        for i in range(-_radius, _radius + 1):
+            for j in range(-_radius, _radius + 1):
+                if i == 0 and j == 0:
+                    continue
+                if (_shape == CandidateShape.LINE and
+                        i != 0 and j != 0 and abs(i) != abs(j)):
+                    continue
+                offsets.append((i, j))
+
+        res = []
+        for x, y in self.coords:
+            neighbour = []
+            for offset_x, offset_y in offsets:
+                i, j = x + offset_x, y + offset_y
+                if 0 <= i < self.size and 0 <= j < self.size:
+                    neighbour.append(i * self.size + j)
+            res.append(tuple(neighbour))
+        res = tuple(res)
+        self.neighbour_cache[key] = res
+        return res
+
+
+def get_board_table(_size):
+    """获取棋盘预计算表方法。
+
+    各尺寸的预计算表在第一次使用时创建，之后直接返回缓存的表。
+
+    Args:
+        _size: 棋盘每行每列格子数量
+
+    Returns:
+        该尺寸对应的 BoardTable 对象。
+    """
+    table = _board_tables.get(_size)
+    if table is None:
+        table = BoardTable(_size)
+        _board_tables[_size] = table
+    return table
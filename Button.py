@@ -112,7 +112,7 @@ class Button(object):
         """
         self.__text = value
         self.__text_image = Text(None, BUTTON_HEIGHT * 2 // 3,
-                                 self.__text, self.__color, *self.__rect.center)
+                                 self.__text, WHITE_COLOR, self.__rect.center)
 
     @property
     def text_element(self):
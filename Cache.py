@@ -0,0 +1,533 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    Cache.py
+时间:
+    2026/10/19 11:20
+"""
+from array import array
+from multiprocessing import shared_memory
+
+
+class PointCache(object):
+    """单点评分缓存类。
+
+    缓存每个点在双方落子时的分值与最高棋形，缓存大小固定为棋盘面积的两倍。\n
+    落子或取回棋子时，只有与该点处于同一米字方向、距离不超过 4 的点会失效，\n
+    其余点的评分在兄弟节点之间可以直接复用。
+    """
+    __slots__ = ('__area', '__line_cells', '__valid', '__hits', '__misses',
+                 'scores', 'levels')
+
+    def __init__(self, _table):
+        """初始化单点评分缓存方法。
+
+        Args:
+            _table: 棋盘预计算表
+        """
+        self.__area = _table.area
+        self.__line_cells = _table.line_cells
+        self.__valid = bytearray(_table.area)
+        self.__hits = 0
+        self.__misses = 0
+        # 玩家 player 在点 index 落子时的分值与最高棋形，下标 player * area + index。
+        self.scores = array('i', [0]) * (2 * _table.area)
+        self.levels = bytearray(2 * _table.area)
+
+    def lookup(self, _index):
+        """查询缓存方法。
+
+        Args:
+            _index: 点的一维下标
+
+        Returns:
+            该点的缓存是否有效。
+        """
+        if self.__valid[_index]:
+            self.__hits += 1
+            return True
+        self.__misses += 1
+        return False
+
+    def store(self, _index, _scores, _levels):
+        """写入缓存方法。
+
+        Args:
+            _index: 点的一维下标
+            _scores: (玩家 1 的分值, 玩家 2 的分值)
+            _levels: (玩家 1 的最高棋形, 玩家 2 的最高棋形)
+        """
+        area = self.__area
+        self.scores[_index], self.scores[area + _index] = _scores
+        self.levels[_index], self.levels[area + _index] = _levels
+        self.__valid[_index] = 1
+
+    def invalidate(self, _index):
+        """使某点落子或取回棋子所影响的点的缓存失效方法。
+
+        Args:
+            _index: 落子或取回棋子点的一维下标
+        """
+        valid = self.__valid
+        for i in self.__line_cells[_index]:
+            valid[i] = 0
+
+    def clear(self):
+        """清空缓存方法。"""
+        self.__valid[:] = bytes(self.__area)
+
+    @property
+    def hits(self):
+        """缓存命中次数属性。
+
+        Returns:
+            缓存命中次数。
+        """
+        return self.__hits
+
+    @property
+    def misses(self):
+        """缓存未命中次数属性。
+
+        Returns:
+            缓存未命中次数。
+        """
+        return self.__misses
+
+    @property
+    def nbytes(self):
+        """占用内存属性。
+
+        Returns:
+            缓存数组占用的字节数。
+        """
+        return len(self.__valid) + len(self.levels) + (
+            self.scores.itemsize * len(self.scores))
+
+
+class PositionCache(object):
+    """棋局评分缓存类。
+
+    以 Zobrist 哈希值为键缓存整个棋局的评分以及是否有未解决的威胁，\n
+    同一棋局经不同落子顺序到达时不需要重新统计棋形。\n
+    缓存为直接映射的定长表，容量在创建时由内存预算决定，\n
+    两个棋局映射到同一位置时新的结果直接替换旧的结果。
+    """
+    __slots__ = ('__capacity', '__keys', '__scores', '__flags', '__size',
+                 '__hits', '__misses')
+
+    ENTRY_SIZE = 13     # 每项占用的字节数：8 字节键、4 字节评分与 1 字节标记。
+
+    def __init__(self, _capacity):
+        """初始化棋局评分缓存方法。
+
+        Args:
+            _capacity: 缓存项数，为 0 时不缓存
+        """
+        self.__capacity = _capacity
+        self.__keys = array('Q', [0]) * _capacity
+        self.__scores = array('i', [0]) * _capacity
+        # 0 为空，1 为无威胁的棋局，2 为有未解决威胁的棋局。
+        self.__flags = bytearray(_capacity)
+        self.__size = 0
+        self.__hits = 0
+        self.__misses = 0
+
+    @classmethod
+    def get_capacity(cls, _nbytes):
+        """获取一定内存内可容纳的缓存项数方法。
+
+        Args:
+            _nbytes: 可用的字节数
+
+        Returns:
+            缓存项数，内存不足一项时为 0。
+        """
+        return max(_nbytes // cls.ENTRY_SIZE, 0)
+
+    def lookup(self, _key):
+        """查询缓存方法。
+
+        Args:
+            _key: 棋局哈希值与落子方组合成的键
+
+        Returns:
+            (评分, 是否有未解决的威胁)，未命中时为 None。
+        """
+        if self.__capacity == 0:
+            return None
+        slot = _key % self.__capacity
+        flag = self.__flags[slot]
+        if flag and self.__keys[slot] == _key:
+            self.__hits += 1
+            return self.__scores[slot], flag == 2
+        self.__misses += 1
+        return None
+
+    def store(self, _key, _score, _threat):
+        """写入缓存方法。
+
+        Args:
+            _key: 棋局哈希值与落子方组合成的键
+            _score: 棋局评分
+            _threat: 是否有未解决的威胁
+        """
+        if self.__capacity == 0:
+            return
+        slot = _key % self.__capacity
+        if not self.__flags[slot]:
+            self.__size += 1
+        self.__keys[slot] = _key
+        self.__scores[slot] = _score
+        self.__flags[slot] = 2 if _threat else 1
+
+    def clear(self):
+        """清空缓存方法。"""
+        self.__flags[:] = bytes(len(self.__flags))
+        self.__size = 0
+
+    @property
+    def capacity(self):
+        """缓存项数属性。
+
+        Returns:
+            缓存可容纳的项数。
+        """
+        return self.__capacity
+
+    @property
+    def size(self):
+        """已使用的缓存项数属性。
+
+        Returns:
+            已写入结果的缓存项数。
+        """
+        return self.__size
+
+    @property
+    def hits(self):
+        """缓存命中次数属性。
+
+        Returns:
+            缓存命中次数。
+        """
+        return self.__hits
+
+    @property
+    def misses(self):
+        """缓存未命中次数属性。
+
+        Returns:
+            缓存未命中次数。
+        """
+        return self.__misses
+
+    @property
+    def nbytes(self):
+        """占用内存属性。
+
+        Returns:
+            缓存数组占用的字节数。
+        """
+        return self.capacity * self.ENTRY_SIZE
+
+
+class ProofTable(object):
+    """证明数表类。
+
+    以 Zobrist 哈希值为键保存证明数搜索中各节点的证明数与反证数，\n
+    与棋局评分缓存相同，为直接映射的定长表，新的结果直接替换旧的结果。
+    """
+    __slots__ = ('__capacity', '__keys', '__values', '__flags')
+
+    ENTRY_SIZE = 17     # 每项占用的字节数：8 字节键、两个 4 字节的数与 1 字节标记。
+
+    def __init__(self, _capacity):
+        """初始化证明数表方法。
+
+        Args:
+            _capacity: 表项数，为 0 时不保存
+        """
+        self.__capacity = _capacity
+        self.__keys = array('Q', [0]) * _capacity
+        # 第 i 项的证明数与反证数分别位于下标 2 * i 与 2 * i + 1。
+        self.__values = array('i', [0]) * (2 * _capacity)
+        self.__flags = bytearray(_capacity)
+
+    def lookup(self, _key):
+        """查询证明数表方法。
+
+        Args:
+            _key: 棋局哈希值与落子方组合成的键
+
+        Returns:
+            (证明数, 反证数)，未命中时为 None。
+        """
+        if self.__capacity == 0:
+            return None
+        slot = _key % self.__capacity
+        if self.__flags[slot] and self.__keys[slot] == _key:
+            return self.__values[2 * slot], self.__values[2 * slot + 1]
+        return None
+
+    def store(self, _key, _proof, _disproof):
+        """写入证明数表方法。
+
+        Args:
+            _key: 棋局哈希值与落子方组合成的键
+            _proof: 证明数
+            _disproof: 反证数
+        """
+        if self.__capacity == 0:
+            return
+        slot = _key % self.__capacity
+        self.__keys[slot] = _key
+        self.__values[2 * slot] = _proof
+        self.__values[2 * slot + 1] = _disproof
+        self.__flags[slot] = 1
+
+    def clear(self):
+        """清空证明数表方法。"""
+        self.__flags[:] = bytes(self.__capacity)
+
+    @property
+    def nbytes(self):
+        """占用内存属性。
+
+        Returns:
+            表数组占用的字节数。
+        """
+        return self.__capacity * self.ENTRY_SIZE
+
+
+class TranspositionTable(object):
+    """置换表类。
+
+    保存博弈树搜索中各局面的分值、剩余搜索深度、分值类型与最佳落子，\n
+    每项 16 字节：第一个 64 位字为键与数据的异或，第二个为数据。\n
+    读取时以异或校验键，其他进程写入到一半的项会校验失败而被忽略，\n
+    因此放在 multiprocessing.shared_memory 中时多个进程不加锁即可\n
+    同时读写。共享的表需由创建它的进程以 multiprocessing 启动各工作进程。
+    """
+    __slots__ = ('__memory', '__words', '__capacity', '__owner')
+
+    ENTRY_SIZE = 16
+
+    # 分值类型：准确值、下界与上界，0 表示空项。
+    EXACT = 1
+    LOWER = 2
+    UPPER = 3
+
+    SCORE_OFFSET = 1 << 19  # 分值加上该值后以 20 位无符号数保存。
+
+    def __init__(self, _capacity=0, _name=None, _create=False):
+        """初始化置换表方法。
+
+        Args:
+            _capacity: 表项数，仅在 _name 为 None 或 _create 为 True 时使用
+            _name: 共享内存的名称，为 None 时表只属于当前进程
+            _create: 为 True 时创建名为 _name 的共享内存，否则连接已有的
+        """
+        self.__owner = _create
+        if _name is None:
+            self.__memory = None
+            buffer = bytearray(_capacity * self.ENTRY_SIZE)
+        elif _create:
+            self.__memory = shared_memory.SharedMemory(
+                _name, True, max(_capacity, 1) * self.ENTRY_SIZE)
+            buffer = self.__memory.buf
+            buffer[:] = bytes(len(buffer))
+        else:
+            self.__memory = shared_memory.SharedMemory(_name)
+            buffer = self.__memory.buf
+        # 共享内存的大小可能被向上取整到页大小。
+        self.__capacity = len(buffer) // self.ENTRY_SIZE
+        self.__words = memoryview(buffer)[
+            :self.__capacity * self.ENTRY_SIZE].cast('Q')
+
+    def lookup(self, _key):
+        """查询置换表方法。
+
+        Args:
+            _key: 棋局哈希值与落子方组合成的键
+
+        Returns:
+            (分值, 剩余搜索深度, 分值类型, 最佳落子点一维下标)，\n
+            未命中时为 None，没有最佳落子时落子点为 -1。
+        """
+        if self.__capacity == 0:
+            return None
+        slot = 2 * (_key % self.__capacity)
+        data = self.__words[slot + 1]
+        if data == 0 or self.__words[slot] ^ data != _key:
+            return None
+        return ((data & 0xFFFFF) - self.SCORE_OFFSET, data >> 20 & 0x3F,
+                data >> 26 & 0x3, (data >> 28 & 0xFFFF) - 1)
+
+    def store(self, _key, _score, _depth, _flag, _move=-1):
+        """写入置换表方法。
+
+        同一局面只在剩余搜索深度不低于已有结果时替换，\n
+        不同局面直接替换。
+
+        Args:
+            _key: 棋局哈希值与落子方组合成的键
+            _score: 分值
+            _depth: 剩余搜索深度
+            _flag: 分值类型，为 EXACT、LOWER 或 UPPER
+            _move: 最佳落子点一维下标，没有时为 -1
+        """
+        if self.__capacity == 0:
+            return
+        slot = 2 * (_key % self.__capacity)
+        old = self.__words[slot + 1]
+        if (old != 0 and self.__words[slot] ^ old == _key and
+                old >> 20 & 0x3F > _depth):
+            return
+        data = ((_score + self.SCORE_OFFSET) | _depth << 20 | _flag << 26 |
+                (_move + 1) << 28)
+        self.__words[slot] = _key ^ data
+        self.__words[slot + 1] = data
+
+    def __del__(self):
+        """释放置换表方法。"""
+        self.close()
+
+    def close(self):
+        """断开共享内存方法，创建者还会删除共享内存。"""
+        if self.__memory is None:
+            return
+        self.__words.release()
+        self.__memory.close()
+        if self.__owner:
+            self.__memory.unlink()
+        self.__memory = None
+
+    @property
+    def name(self):
+        """共享内存名称属性。
+
+        Returns:
+            共享内存的名称，表只属于当前进程时为 None。
+        """
+        return None if self.__memory is None else self.__memory.name
+
+    @property
+    def capacity(self):
+        """表项数属性。
+
+        Returns:
+            表可容纳的项数。
+        """
+        return self.__capacity
+
+    @property
+    def nbytes(self):
+        """占用内存属性。
+
+        Returns:
+            表占用的字节数。
+        """
+        return self.__capacity * self.ENTRY_SIZE
+
+
+class MemoryBudget(object):
+    """内存预算类。
+
+    每个 AI 对象有一个内存预算，搜索时使用的各个表在创建时登记\n
+    其最多占用的字节数，登记的总量不能超过上限。\n
+    只统计预先分配的数组与集合。所有 AI 共用的棋形表与共享置换表\n
+    大小固定，登记为共用表，在 usage 中报告但不占用本 AI 的预算；\n
+    棋盘预计算表不登记。
+    """
+    __slots__ = ('__ceiling', '__reserved', '__tables', '__shared_tables')
+
+    def __init__(self, _ceiling):
+        """初始化内存预算方法。
+
+        Args:
+            _ceiling: 内存上限的字节数
+        """
+        self.__ceiling = _ceiling
+        self.__reserved = 0
+        self.__tables = {}
+        self.__shared_tables = {}
+
+    def reserve(self, _name, _table, _nbytes=None):
+        """登记一个表方法。
+
+        Args:
+            _name: 表的名称
+            _table: 有 nbytes 属性的表
+            _nbytes: 该表最多占用的字节数，默认为其当前的 nbytes
+
+        Raises:
+            ValueError: 登记后超出内存上限。
+        """
+        if _nbytes is None:
+            _nbytes = _table.nbytes
+        if self.__reserved + _nbytes > self.__ceiling:
+            raise ValueError('memory budget of {} bytes is too small for '
+                             '{}'.format(self.__ceiling, _name))
+        self.__reserved += _nbytes
+        self.__tables[_name] = _table
+
+    def reserve_shared(self, _name, _table):
+        """登记一个所有 AI 共用的表方法。
+
+        Args:
+            _name: 表的名称
+            _table: 有 nbytes 属性的表
+        """
+        self.__shared_tables[_name] = _table
+
+    @property
+    def ceiling(self):
+        """内存上限属性。
+
+        Returns:
+            内存上限的字节数。
+        """
+        return self.__ceiling
+
+    @property
+    def free(self):
+        """剩余内存属性。
+
+        Returns:
+            内存上限减去已登记字节数。
+        """
+        return self.__ceiling - self.__reserved
+
+    @property
+    def used(self):
+        """当前占用内存属性。
+
+        Returns:
+            各表当前占用的字节数之和。
+        """
+        return sum(table.nbytes for table in self.__tables.values())
+
+    @property
+    def shared(self):
+        """共用表占用内存属性。
+
+        Returns:
+            各共用表当前占用的字节数之和，不计入 used。
+        """
+        return sum(table.nbytes for table in self.__shared_tables.values())
+
+    @property
+    def usage(self):
+        """各表占用内存属性。
+
+        Returns:
+            表名称到当前占用字节数的字典，包括共用表。
+        """
+        return {name: table.nbytes for name, table in
+                {**self.__tables, **self.__shared_tables}.items()}
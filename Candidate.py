@@ -0,0 +1,116 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    Candidate.py
+时间:
+    2026/10/19 10:05
+"""
+import sys
+from array import array
+
+from Constant import PlayerEnum
+from Settings import AI_CANDIDATE_RADIUS
+from Settings import AI_CANDIDATE_SHAPE
+
+
+class CandidateIndex(object):
+    """候选点索引类。
+
+    对每个点记录其邻居范围内的棋子数量，并显式维护候选点集合，\n
+    使得落子、取回棋子与遍历候选点的开销只与邻居数、候选点数相关。
+    """
+    __slots__ = ('__count', '__candidates', '__neighbours', '__max_nbytes')
+
+    def __init__(self, _table, _radius=AI_CANDIDATE_RADIUS,
+                 _shape=AI_CANDIDATE_SHAPE):
+        """初始化候选点索引方法。
+
+        Args:
+            _table: 棋盘预计算表
+            _radius: 候选点半径
+            _shape: 候选点形状，为 CandidateShape 中的值
+        """
+        self.__count = array('i', [0]) * _table.area
+        self.__candidates = set()
+        self.__neighbours = _table.get_neighbours(_radius, _shape)
+        # 所有点都是候选点时占用的内存。
+        self.__max_nbytes = self.__get_count_nbytes() + sys.getsizeof(
+            set(range(_table.area)))
+
+    def add(self, _index, _chess):
+        """落子时更新候选点方法。
+
+        Args:
+            _index: 落子点的一维下标
+            _chess: 一维棋盘
+        """
+        count = self.__count
+        candidates = self.__candidates
+        no_player = PlayerEnum.NO_PLAYER.value
+        candidates.discard(_index)
+        for i in self.__neighbours[_index]:
+            count[i] += 1
+            if _chess[i] == no_player:
+                candidates.add(i)
+
+    def remove(self, _index):
+        """取回棋子时更新候选点方法。
+
+        Args:
+            _index: 取回棋子点的一维下标
+        """
+        count = self.__count
+        candidates = self.__candidates
+        for i in self.__neighbours[_index]:
+            count[i] -= 1
+            if count[i] == 0:
+                candidates.discard(i)
+        if count[_index] > 0:
+            candidates.add(_index)
+
+    def __iter__(self):
+        """按一维下标从小到大遍历候选点方法。
+
+        Returns:
+            候选点一维下标的迭代器。
+        """
+        return iter(sorted(self.__candidates))
+
+    def __len__(self):
+        """候选点数量方法。
+
+        Returns:
+            候选点数量。
+        """
+        return len(self.__candidates)
+
+    def __get_count_nbytes(self):
+        """获取邻居棋子数量数组占用内存方法。
+
+        Returns:
+            邻居棋子数量数组占用的字节数。
+        """
+        return self.__count.itemsize * len(self.__count)
+
+    @property
+    def nbytes(self):
+        """占用内存属性。
+
+        Returns:
+            邻居棋子数量数组与候选点集合当前占用的字节数。
+        """
+        return self.__get_count_nbytes() + sys.getsizeof(self.__candidates)
+
+    @property
+    def max_nbytes(self):
+        """最大占用内存属性。
+
+        Returns:
+            所有点都是候选点时占用的字节数。
+        """
+        return self.__max_nbytes
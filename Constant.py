@@ -24,7 +24,9 @@ class ButtonEnum(IntEnum):
     EXIT_BUTTON = 3,
     RESTART_BUTTON = 4,
     GIVE_UP_BUTTON = 5,
-    BACK_BUTTON = 6
+    BACK_BUTTON = 6,
+    UNDO_BUTTON = 7,
+    REDO_BUTTON = 8
 
 
 class PlayerEnum(IntEnum):
@@ -67,3 +69,32 @@ class ChessScore(IntEnum):
     SLEEP_TWO = 2,
     MAX = 10000,
     MIN = -10000,
+
+
+class CandidateShape(IntEnum):
+    """候选点形状枚举类。
+
+    表示落子点周围哪些点会成为候选点，分为\n
+    半径内的整个方形区域，以及仅米字方向上的点。
+    """
+    SQUARE = 0,
+    LINE = 1,
+
+
+class DifficultyEnum(IntEnum):
+    """AI 难度枚举类。
+
+    分为简单、普通与困难。
+    """
+    EASY = 0,
+    NORMAL = 1,
+    HARD = 2,
+
+
+class EngineEnum(IntEnum):
+    """AI 搜索引擎枚举类。
+
+    分为 α,β-剪枝的极小极大搜索，以及蒙特卡洛树搜索。
+    """
+    ALPHA_BETA = 0,
+    MCTS = 1,
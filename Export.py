@@ -0,0 +1,251 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    Export.py
+时间:
+    2026/10/19 19:50
+
+训练数据导出工具。\n
+依次分析棋谱（或先自我对弈生成棋谱）中的每个局面，导出双方棋子平面、\n
+落子方、每个空点在双方落子时的单点评分与 AI 搜索出的最佳落子点，\n
+每满 shard_size 个局面写入一个 .npz 分片文件，内存占用与棋谱数量无关。
+
+    python Export.py --selfplay 100 --output /tmp/shards
+    python Export.py --records ~/.gobang/records --output /tmp/shards
+
+分片可用 load_shards 逐个或逐批读取：
+
+    for batch in load_shards('/tmp/shards', 256):
+        train(batch['planes'], batch['best_move'])
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from AI import AI
+from AI import load_shape_module
+from Analysis import load_record
+from BoardTable import get_board_table
+from Constant import PlayerEnum
+from Profile import Profile
+from Settings import AI_SEARCH_DEPTH
+from Settings import CHESS_MAX_NUM
+from Settings import RECORD_DIR
+from Tune import selfplay_game
+
+SHARD_PATTERN = 'positions-{:05d}.npz'  # 分片文件名格式。
+
+
+class ShardWriter(object):
+    """分片写入类。
+
+    局面先写入预先分配的缓冲数组，缓冲区满时保存为一个分片文件。\n
+    每个分片包含以下数组，n 为分片中的局面数：
+
+    - planes: (n, 2, size, size) uint8，第 i 个平面为玩家 i 的棋子
+    - player: (n,) uint8，落子方玩家编号
+    - scores: (n, 2, size, size) int32，第 i 个平面为玩家 i 在各空点落子时
+      的单点评分，已落子点为 0
+    - best_move: (n,) int16，最佳落子点的一维下标 x * size + y
+    - score: (n,) int32，落子方视角的搜索分值
+    """
+
+    def __init__(self, _directory, _size, _shard_size=4096):
+        """初始化分片写入方法。
+
+        Args:
+            _directory: 分片文件目录
+            _size: 棋盘每行每列格子数量
+            _shard_size: 每个分片的局面数
+        """
+        self.__directory = _directory
+        self.__shard_size = _shard_size
+        self.__shard_num = 0
+        self.__position_num = 0
+        self.__buffer_num = 0   # 缓冲区中的局面数。
+        self.__buffers = {
+            'planes': np.zeros((_shard_size, 2, _size, _size), np.uint8),
+            'player': np.zeros(_shard_size, np.uint8),
+            'scores': np.zeros((_shard_size, 2, _size, _size), np.int32),
+            'best_move': np.zeros(_shard_size, np.int16),
+            'score': np.zeros(_shard_size, np.int32),
+        }
+        os.makedirs(_directory, exist_ok=True)
+
+    def add(self, _planes, _player, _scores, _best_move, _score):
+        """添加一个局面方法。
+
+        Args:
+            _planes: 形状为 (2, size, size) 的双方棋子平面
+            _player: 落子方玩家编号
+            _scores: 形状为 (2, size, size) 的双方单点评分
+            _best_move: 最佳落子点的一维下标
+            _score: 落子方视角的搜索分值
+        """
+        i = self.__buffer_num
+        buffers = self.__buffers
+        buffers['planes'][i] = _planes
+        buffers['player'][i] = _player
+        buffers['scores'][i] = _scores
+        buffers['best_move'][i] = _best_move
+        buffers['score'][i] = _score
+        self.__buffer_num += 1
+        self.__position_num += 1
+        if self.__buffer_num == self.__shard_size:
+            self.flush()
+
+    def flush(self):
+        """把缓冲区中的局面写入一个分片文件方法。"""
+        if self.__buffer_num == 0:
+            return
+        path = os.path.join(self.__directory,
+                            SHARD_PATTERN.format(self.__shard_num))
+        np.savez_compressed(path, **{
+            name: buffer[:self.__buffer_num]
+            for name, buffer in self.__buffers.items()})
+        self.__shard_num += 1
+        self.__buffer_num = 0
+
+    def close(self):
+        """写入剩余局面方法。"""
+        self.flush()
+
+    @property
+    def shard_num(self):
+        """已写入的分片数属性。
+
+        Returns:
+            已写入的分片数。
+        """
+        return self.__shard_num
+
+    @property
+    def position_num(self):
+        """已添加的局面数属性。
+
+        Returns:
+            已添加的局面数，包括尚在缓冲区中的局面。
+        """
+        return self.__position_num
+
+
+def load_shards(_directory, _batch_size=None):
+    """逐个读取分片方法。
+
+    每次只读取一个分片，内存占用与分片总数无关。
+
+    Args:
+        _directory: 分片文件目录
+        _batch_size: 每批的局面数，为 None 时每个分片为一批；\n
+            批不跨越分片，每个分片的最后一批可能较小
+
+    Yields:
+        {数组名: 数组} 字典，数组含义见 ShardWriter。
+    """
+    paths = sorted(glob.glob(os.path.join(_directory, 'positions-*.npz')))
+    for path in paths:
+        with np.load(path) as shard:
+            arrays = {name: shard[name] for name in shard.files}
+        num = len(arrays['player'])
+        batch_size = num if _batch_size is None else _batch_size
+        for start in range(0, num, batch_size):
+            yield {name: array[start:start + batch_size]
+                   for name, array in arrays.items()}
+
+
+def export_record(_args):
+    """分析一局棋中每个局面方法。
+
+    Args:
+        _args: (棋谱文件路径, 棋盘每行每列格子数量, 搜索深度)
+
+    Returns:
+        [(双方棋子平面, 落子方, 双方单点评分, 最佳落子点, 分值)] 列表，\n
+        不含开局空棋盘、已分出胜负与没有可选落子点的局面；\n
+        棋盘尺寸不同的棋谱返回空列表。
+    """
+    path, size, depth = _args
+    record_size, steps = load_record(path)
+    if record_size != size:
+        return []
+    table = get_board_table(size)
+    shape = load_shape_module(_batch=True)
+    ai = AI((PlayerEnum.PLAYER_ONE, PlayerEnum.PLAYER_TWO), size,
+            _profile=Profile(_depth=depth))
+    board = [[PlayerEnum.NO_PLAYER] * size for _ in range(size)]
+    chess = bytearray([PlayerEnum.NO_PLAYER]) * (table.area + 1)
+    planes = np.zeros((2, table.area), np.uint8)
+    positions = []
+    for num in range(1, len(steps)):
+        (x, y), player = steps[num - 1]
+        board[x][y] = player
+        chess[x * size + y] = player
+        planes[player, x * size + y] = 1
+        if ai.game_over(board, (x, y), (player, PlayerEnum(1 - player))):
+            break
+        now = steps[num][1]
+        score, best_move = ai.analyse(board, (now, PlayerEnum(1 - now)))
+        if best_move is None:
+            # 没有可选落子点（如棋盘已满）时没有可学习的落子。
+            continue
+
+        empties = [index for index in range(table.area)
+                   if chess[index] == PlayerEnum.NO_PLAYER]
+        scores = np.zeros((2, table.area), np.int32)
+        results = shape.get_points_score(table, chess, empties)
+        scores[:, empties] = np.array([point_scores for point_scores, _
+                                       in results], np.int32).T
+        positions.append((planes.reshape(2, size, size).copy(), int(now),
+                          scores.reshape(2, size, size),
+                          best_move[0] * size + best_move[1], int(score)))
+    return positions
+
+
+def main():
+    """训练数据导出入口。"""
+    parser = argparse.ArgumentParser(
+        description='Export searched positions as sharded .npz files.')
+    parser.add_argument('--records', default=RECORD_DIR,
+                        help='directory of game records')
+    parser.add_argument('--selfplay', type=int, default=0,
+                        help='play this many self-play games into '
+                             '--records first')
+    parser.add_argument('--size', type=int, default=CHESS_MAX_NUM)
+    parser.add_argument('--output', default='shards')
+    parser.add_argument('--shard-size', type=int, default=4096)
+    parser.add_argument('--depth', type=int, default=AI_SEARCH_DEPTH)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    record_dir = os.path.expanduser(args.records)
+    os.makedirs(record_dir, exist_ok=True)
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        if args.selfplay > 0:
+            existing = len(glob.glob(os.path.join(record_dir, '*.json')))
+            pool.map(selfplay_game, [(existing + seed, args.size, record_dir)
+                                     for seed in range(args.selfplay)])
+        paths = sorted(glob.glob(os.path.join(record_dir, '*.json')))
+        writer = ShardWriter(args.output, args.size, args.shard_size)
+        # 按棋谱顺序逐局取回结果并写入，内存中只保留少量棋局的结果。
+        for positions in pool.imap(export_record, [
+                (path, args.size, args.depth) for path in paths]):
+            for position in positions:
+                writer.add(*position)
+    writer.close()
+    print('exported {} positions from {} records into {} shards '
+          'in {:.1f}s'.format(writer.position_num, len(paths),
+                              writer.shard_num, time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,384 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    FastShape.pyx
+时间:
+    2026/10/19 13:05
+
+Shape.py 的 Cython 实现，接口与 Shape.py 完全相同。\n
+编译方法：在项目根目录下执行 `cythonize -i FastShape.pyx`。\n
+Shape.py 为参考实现，修改棋形判断时两者需同步修改，\n
+并用 `python Benchmark.py shape` 检查两者结果是否一致。
+"""
+from Constant import ChessType
+from Constant import ChessScore
+from Constant import PlayerEnum
+
+cdef int NO_PLAYER = PlayerEnum.NO_PLAYER
+cdef int OFF_BOARD = NO_PLAYER + 1  # 计算单点评分时棋盘外格子的编号。
+
+cdef enum:
+    CHESS_TYPE_NUM = 8  # 棋形总数，与 Settings.CHESS_TYPE_NUM 相同。
+    WINDOW_NUM = 262144  # 一行 9 个棋子的情况数，即 4^9。
+
+# 一行 9 个棋子（以 4 进制编码）对双方而言的棋形，每种棋形的数量占 2 位，
+# 玩家 1 在低 16 位、玩家 2 在高 16 位。导入时穷举全部情况，大小固定为 1 MiB。
+cdef unsigned int _window_shapes[WINDOW_NUM]
+
+cdef int SLEEP_TWO = ChessType.SLEEP_TWO
+cdef int LIVE_TWO = ChessType.LIVE_TWO
+cdef int SLEEP_THREE = ChessType.SLEEP_THREE
+cdef int LIVE_THREE = ChessType.LIVE_THREE
+cdef int SLEEP_FOUR = ChessType.SLEEP_FOUR
+cdef int LIVE_FOUR = ChessType.LIVE_FOUR
+cdef int LIVE_FIVE = ChessType.LIVE_FIVE
+
+cdef int SCORE_LIVE_FIVE = ChessScore.LIVE_FIVE
+cdef int SCORE_LIVE_FOUR = ChessScore.LIVE_FOUR
+cdef int SCORE_SLEEP_FOUR = ChessScore.SLEEP_FOUR
+cdef int SCORE_LIVE_THREE = ChessScore.LIVE_THREE
+cdef int SCORE_SLEEP_THREE = ChessScore.SLEEP_THREE
+cdef int SCORE_LIVE_TWO = ChessScore.LIVE_TWO
+cdef int SCORE_SLEEP_TWO = ChessScore.SLEEP_TWO
+
+
+cdef inline void _set_visited(int _left, int _right, const int *_line,
+                              unsigned char *_visited) noexcept:
+    """更新 visited 数组。"""
+    cdef int i
+    if _visited == NULL:
+        return
+    for i in range(_left, _right + 1):
+        _visited[_line[i]] = 1
+
+
+cdef void _count_shape(const int *_chess_list, int _mine, int _opponent,
+                       int *_count, const int *_line,
+                       unsigned char *_visited) noexcept:
+    """获取一行棋子中的棋形，与 Shape.get_one_chess_shape 相同。
+
+    Shape.py 中 mine_range == 3 分支内对 2 子、1 子棋形的判断永远不会执行，
+    此处不再重复。
+    """
+    cdef int left_index = 4, right_index = 4
+    cdef int left_range, right_range, chess_range, mine_range
+    cdef bint left_empty, right_empty, left_four, right_four
+
+    # 统计己方有多少已连起来的棋子。
+    while right_index < 8:
+        if _chess_list[right_index + 1] != _mine:
+            break
+        right_index += 1
+    while left_index > 0:
+        if _chess_list[left_index - 1] != _mine:
+            break
+        left_index -= 1
+
+    # 统计两端有多少空格。
+    left_range, right_range = left_index, right_index
+    while right_range < 8:
+        if _chess_list[right_range + 1] == _opponent:
+            break
+        right_range += 1
+    while left_range > 0:
+        if _chess_list[left_range - 1] == _opponent:
+            break
+        left_range -= 1
+
+    chess_range = right_range - left_range + 1
+    if chess_range < 5:
+        _set_visited(left_range, right_range, _line, _visited)
+        return
+
+    _set_visited(left_index, right_index, _line, _visited)
+
+    mine_range = right_index - left_index + 1
+    if mine_range >= 5:
+        _count[LIVE_FIVE] += 1
+
+    if mine_range == 4:
+        left_empty = _chess_list[left_index - 1] == NO_PLAYER
+        right_empty = _chess_list[right_index + 1] == NO_PLAYER
+        if left_empty and right_empty:
+            _count[LIVE_FOUR] += 1
+        elif left_empty or right_empty:
+            _count[SLEEP_FOUR] += 1
+
+    if mine_range == 3:
+        left_empty = right_empty = False
+        left_four = right_four = False
+        if _chess_list[left_index - 1] == NO_PLAYER:
+            if _chess_list[left_index - 2] == _mine:
+                _set_visited(left_index - 2, left_index - 1, _line, _visited)
+                _count[SLEEP_FOUR] += 1
+                left_four = True
+            left_empty = True
+
+        if _chess_list[right_index + 1] == NO_PLAYER:
+            if _chess_list[right_index + 2] == _mine:
+                _set_visited(right_index + 1, right_index + 2, _line,
+                             _visited)
+                _count[SLEEP_FOUR] += 1
+                right_four = True
+            right_empty = True
+
+        if left_four or right_four:
+            pass
+        elif left_empty and right_empty:
+            if chess_range > 5:
+                _count[LIVE_THREE] += 1
+            else:
+                _count[SLEEP_THREE] += 1
+        elif left_empty or right_empty:
+            _count[SLEEP_THREE] += 1
+
+
+cdef void _build_window_shapes() noexcept:
+    """穷举一行 9 个棋子的全部情况，计算对双方而言的棋形。
+
+    与 Shape._get_window_shape 相同，棋盘外的格子算作对方所落的子。
+    """
+    cdef int window[9]
+    cdef int chess_list[9]
+    cdef int count[CHESS_TYPE_NUM]
+    cdef unsigned int rest, shape
+    cdef int code, player, i
+    for code in range(WINDOW_NUM):
+        rest = code
+        for i in range(8, -1, -1):
+            window[i] = rest & 3
+            rest >>= 2
+        shape = 0
+        for player in range(2):
+            for i in range(9):
+                chess_list[i] = (1 - player if window[i] == OFF_BOARD
+                                 else window[i])
+            for i in range(CHESS_TYPE_NUM):
+                count[i] = 0
+            _count_shape(chess_list, player, 1 - player, count, NULL, NULL)
+            for i in range(1, CHESS_TYPE_NUM):
+                shape |= <unsigned int>count[i] << (player * 16 + i * 2)
+        _window_shapes[code] = shape
+
+
+_build_window_shapes()
+# 棋形表的只读视图，用于在内存预算中报告其大小。
+_window_view = memoryview(<unsigned int[:WINDOW_NUM]> _window_shapes)
+
+
+cdef inline void _add_shape(unsigned int _shape, int *_count) noexcept:
+    """把一名玩家的压缩棋形加到棋形数量数组中。"""
+    cdef int i
+    for i in range(1, CHESS_TYPE_NUM):
+        _count[i] += (_shape >> (i * 2)) & 3
+
+
+cdef inline unsigned int _read_window(const int[:] _lines, int _base,
+                                      int _area,
+                                      const unsigned char[:] _chess) noexcept:
+    """读取一行 9 个棋子并返回其 4 进制编码。"""
+    cdef int j, cell
+    cdef unsigned int code = 0
+    for j in range(9):
+        cell = _lines[_base + j]
+        code = code * 4 + (OFF_BOARD if cell == _area else _chess[cell])
+    return code
+
+
+def get_one_chess_shape(_chess_list, _player, _count, _line=None,
+                        unsigned char[:] _visited=None):
+    """获取一行棋子中的棋形。
+
+    Args:
+        _chess_list: 一行棋子的落子者列表
+        _player: (己方玩家编号, 对手玩家编号)
+        _count: 棋形数量数组
+        _line: 该行 9 个点在一维棋盘上的下标
+        _visited: 记录已统计过棋形的棋子的一维数组
+
+    Returns:
+        各种棋形数量的列表。
+    """
+    cdef int[:] count = _count
+    cdef int chess_list[9]
+    cdef int line[9]
+    cdef int i
+    for i in range(9):
+        chess_list[i] = _chess_list[i]
+    if _line is not None:
+        for i in range(9):
+            line[i] = _line[i]
+    _count_shape(chess_list, _player[0], _player[1], &count[0], line,
+                 &_visited[0] if _visited is not None else NULL)
+    return _count
+
+
+def get_point_shape(_table, unsigned char[:] _chess, int _index, int _player,
+                    _count):
+    """获取某点在某玩家落子时的棋形。
+
+    Args:
+        _table: 棋盘预计算表
+        _chess: 一维棋盘，最后一格为棋盘外的哨兵格
+        _index: 点的一维下标
+        _player: 落子的玩家编号
+        _count: 棋形数量数组
+
+    Returns:
+        各种棋形数量的列表。
+    """
+    cdef const int[:] lines = _table.line_array
+    cdef int area = _table.area
+    cdef int[:] count = _count
+    cdef unsigned int code
+    cdef int i
+    for i in range(4):
+        code = _read_window(lines, (_index * 4 + i) * 9, area, _chess)
+        _add_shape(_window_shapes[code] >> (_player * 16), &count[0])
+    return _count
+
+
+def get_board_shape(_table, unsigned char[:] _chess, _stones, _counts,
+                    unsigned char[:] _visited):
+    """获取整个棋盘上双方的棋形。
+
+    Args:
+        _table: 棋盘预计算表
+        _chess: 一维棋盘，最后一格为棋盘外的哨兵格
+        _stones: 已落子点的一维下标
+        _counts: (玩家 1 棋形数量数组, 玩家 2 棋形数量数组)
+        _visited: 四个方向上已统计过棋形的棋子，长度为 4 * area 且已清空
+
+    Returns:
+        (玩家 1 棋形数量数组, 玩家 2 棋形数量数组)。
+    """
+    cdef const int[:] lines = _table.line_array
+    cdef int area = _table.area
+    cdef int[:] count_one = _counts[0]
+    cdef int[:] count_two = _counts[1]
+    cdef int *count
+    cdef int chess_list[9]
+    cdef int index, mine, opponent, i, j, base, cell
+    for index in _stones:
+        mine = _chess[index]
+        opponent = 1 - mine
+        count = &count_one[0] if mine == 0 else &count_two[0]
+        for i in range(4):
+            if _visited[i * area + index]:
+                continue
+            base = (index * 4 + i) * 9
+            for j in range(9):
+                cell = lines[base + j]
+                chess_list[j] = opponent if cell == area else _chess[cell]
+            _count_shape(chess_list, mine, opponent, count, &lines[base],
+                         &_visited[i * area])
+    return _counts
+
+
+cdef int _point_score(const int *_count) noexcept:
+    """根据棋形获取某点的分值，与 Shape.get_point_score 相同。"""
+    cdef int score = 0
+    if _count[LIVE_FIVE] > 0:
+        return SCORE_LIVE_FIVE
+
+    if _count[LIVE_FOUR] > 0:
+        return SCORE_LIVE_FOUR
+
+    if _count[SLEEP_FOUR] > 1:
+        score += _count[SLEEP_FOUR] * SCORE_SLEEP_FOUR
+    elif _count[SLEEP_FOUR] > 0 and _count[LIVE_THREE] > 0:
+        score += _count[SLEEP_FOUR] * SCORE_SLEEP_FOUR
+    elif _count[SLEEP_FOUR] > 0:
+        score += SCORE_LIVE_THREE
+
+    if _count[LIVE_THREE] > 1:
+        score += 5 * SCORE_LIVE_THREE
+    elif _count[LIVE_THREE] > 0:
+        score += SCORE_LIVE_THREE
+
+    score += _count[SLEEP_THREE] * SCORE_SLEEP_THREE
+    score += _count[LIVE_TWO] * SCORE_LIVE_TWO
+    score += _count[SLEEP_TWO] * SCORE_SLEEP_TWO
+
+    return score
+
+
+cdef int _top_chess_type(const int *_count) noexcept:
+    """获取最高棋形，与 Shape.get_top_chess_type 相同。"""
+    cdef int chess_type
+    for chess_type in range(LIVE_FIVE, 0, -1):
+        if _count[chess_type] > 0:
+            return chess_type
+    return 0
+
+
+def get_point_score(int[:] _count):
+    """根据棋形获取某点的分值。
+
+    Args:
+        _count: 各棋形数量
+
+    Returns:
+        该点分值。
+    """
+    return _point_score(&_count[0])
+
+
+def get_top_chess_type(int[:] _count):
+    """获取最高棋形方法。
+
+    Args:
+        _count: 各棋形数量
+
+    Returns:
+        数量大于 0 的最高棋形，没有任何棋形时为 ChessType.NONE。
+    """
+    return _top_chess_type(&_count[0])
+
+
+def get_points_score(_table, unsigned char[:] _chess, _indices):
+    """批量获取多个点在双方落子时的分值与最高棋形。
+
+    Args:
+        _table: 棋盘预计算表
+        _chess: 一维棋盘，最后一格为棋盘外的哨兵格
+        _indices: 点的一维下标列表
+
+    Returns:
+        每个点的 ((玩家 1 分值, 玩家 2 分值), (玩家 1 最高棋形, 玩家 2 最高棋形))
+        列表。
+    """
+    cdef const int[:] lines = _table.line_array
+    cdef int area = _table.area
+    cdef int count[2][CHESS_TYPE_NUM]
+    cdef unsigned int code, shape
+    cdef int index, i
+    results = []
+    for index in _indices:
+        for i in range(CHESS_TYPE_NUM):
+            count[0][i] = count[1][i] = 0
+        # 每个方向的一行棋子只读取一次，同时得到双方的棋形。
+        for i in range(4):
+            code = _read_window(lines, (index * 4 + i) * 9, area, _chess)
+            shape = _window_shapes[code]
+            _add_shape(shape, count[0])
+            _add_shape(shape >> 16, count[1])
+        results.append(((_point_score(count[0]), _point_score(count[1])),
+                        (_top_chess_type(count[0]),
+                         _top_chess_type(count[1]))))
+    return results
+
+
+def get_shared_tables():
+    """获取所有 AI 共用的棋形表方法。
+
+    Returns:
+        {表名称: 有 nbytes 属性的表} 字典。
+    """
+    return {'window_shapes': _window_view}
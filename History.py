@@ -0,0 +1,110 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    History.py
+时间:
+    2026/10/19 14:10
+"""
+
+
+class History(object):
+    """落子记录类。
+
+    记录已落下的棋子，悔棋时将棋子移入可重做记录，重做时再移回，\n
+    有新的落子时清空可重做记录。每条记录的格式为 ((x 坐标, y 坐标), 落子者)。
+    """
+
+    def __init__(self):
+        """初始化落子记录方法。"""
+        self.__steps = []       # 已落下的棋子。
+        self.__undone = []      # 可重做的棋子，最后一个为下一次重做的棋子。
+
+    def push(self, _step):
+        """记录一步新的落子方法。
+
+        Args:
+            _step: 落子记录
+        """
+        self.__steps.append(_step)
+        self.__undone.clear()
+
+    def undo(self, _num=1):
+        """悔棋方法。
+
+        Args:
+            _num: 悔棋步数，超出已落子数时只悔到棋盘为空
+
+        Returns:
+            被悔掉的落子记录列表，按悔棋顺序排列。
+        """
+        undone = []
+        for _ in range(min(_num, len(self.__steps))):
+            step = self.__steps.pop()
+            self.__undone.append(step)
+            undone.append(step)
+        return undone
+
+    def redo(self, _num=1):
+        """重做方法。
+
+        Args:
+            _num: 重做步数，超出可重做步数时只重做全部可重做的落子
+
+        Returns:
+            被重做的落子记录列表，按落子顺序排列。
+        """
+        redone = []
+        for _ in range(min(_num, len(self.__undone))):
+            step = self.__undone.pop()
+            self.__steps.append(step)
+            redone.append(step)
+        return redone
+
+    def load(self, _steps):
+        """载入棋谱方法。
+
+        清空落子记录，并将棋谱中的全部落子作为可重做记录，\n
+        之后可以通过重做逐步回放。
+
+        Args:
+            _steps: 落子记录列表
+        """
+        self.__steps.clear()
+        self.__undone = list(reversed(_steps))
+
+    def clear(self):
+        """清空落子记录方法。"""
+        self.__steps.clear()
+        self.__undone.clear()
+
+    @property
+    def steps(self):
+        """已落下的棋子属性。
+
+        Returns:
+            已落下的棋子的列表。
+        """
+        return self.__steps
+
+    @property
+    def undo_num(self):
+        """可悔棋步数属性。
+
+        Returns:
+            可悔棋步数。
+        """
+        return len(self.__steps)
+
+    @property
+    def redo_num(self):
+        """可重做步数属性。
+
+        Returns:
+            可重做步数。
+        """
+        return len(self.__undone)
@@ -13,13 +13,22 @@
 import pygame
 
 from AI import AI
+from Analysis import Analyzer
+from Analysis import load_record
+from Analysis import save_record
+from Asset import FIRST_INTERFACE_IMAGES
+from Asset import get_asset_manager
 from Constant import ButtonEnum
+from Constant import DifficultyEnum
+from Constant import EngineEnum
 from Constant import PlayerEnum
+from History import History
 from Interface import FirstInterface
 from Interface import GameInterface
+from MCTS import MCTS
+from Profile import get_profile
 from Settings import *
 from Utils import get_board_pos
-from Utils import resource_path
 
 
 class Interactive(object):
@@ -28,26 +37,46 @@ class Interactive(object):
     用于完成游戏中的人机交互。
     """
 
-    def __init__(self):
-        """游戏交互初始化方法。"""
+    def __init__(self, _size=CHESS_MAX_NUM, _record_path=None,
+                 _seed=AI_RANDOM_SEED):
+        """游戏交互初始化方法。
+
+        Args:
+            _size: 棋盘每行每列格子数量
+            _record_path: 需要回放分析的棋谱路径，指定时棋盘尺寸以棋谱为准
+            _seed: AI 的随机数种子，为 None 时每局随机生成
+        """
+        steps = []
+        if _record_path is not None:
+            _size, steps = load_record(_record_path)
+
         # 初始化游戏窗口和时钟。
         self.__windows, self.__clock = Interactive.__init_windows()
 
-        # 初始化游戏界面。
-        self.__first_interface = FirstInterface(self.__windows)
-        self.__game_interface = GameInterface(self.__windows)
+        # 预加载首页所需图片，并初始化首页；游戏界面在第一次进入时创建。
+        get_asset_manager().preload(FIRST_INTERFACE_IMAGES)
+        self.__size = _size
+        self.__difficulty = AI_DIFFICULTY
+        self.__first_interface = FirstInterface(self.__windows,
+                                                self.__difficulty)
+        self.__game_interface = None
         self.__in_first_interface = True
 
         # 初始化游戏相关数据。
-        self.__board = [[PlayerEnum.NO_PLAYER] * BOARD_WIDTH
-                        for _ in range(BOARD_HEIGHT)]
+        self.__board = [[PlayerEnum.NO_PLAYER] * _size for _ in range(_size)]
         self.__player = PlayerEnum.PLAYER_ONE, PlayerEnum.PLAYER_TWO
         self.__winner = None        # 游戏中胜者。
-        self.__steps = []        # 落子记录。
+        self.__history = History()  # 落子记录。
+        self.__changes = []         # 上一次 AI 决策后棋盘上有变化的点。
 
         # 初始化 AI 相关数据
         self.__use_AI = True  # 默认为人机对战。
-        self.__ai = AI(self.__player)
+        self.__seed = _seed
+        self.__ai = self.__create_ai()
+        self.__analyzer = None  # 回放分析模式下的后台分析器。
+
+        if _record_path is not None:
+            self.__start_replay(steps)
 
     def play(self):
         """进行游戏方法。
@@ -56,21 +85,40 @@ class Interactive(object):
         1. 关闭界面事件。\n
         2. 界面跳转事件。\n
         3. 落子事件。\n
-        4. 投降与重新开始事件。
+        4. 投降与重新开始事件。\n
+        5. 悔棋与重做事件。
         """
         self.__handle_event()       # 处理 Pygame 中的事件。
 
         self.__draw_window()
 
         now, _ = self.__player
-        if self.__winner is None and now == PlayerEnum.PLAYER_TWO:
-            people_pos = self.__steps[-1][0]
+        if (self.__use_AI and self.__winner is None and
+                now == PlayerEnum.PLAYER_TWO):
+            people_pos = self.__history.steps[-1][0]
+            changes, self.__changes = self.__changes, []
             self.__make_one_step(
-                self.__ai.make_decision(self.__board, people_pos))
+                self.__ai.make_decision(self.__board, people_pos, changes))
 
     def __make_one_step(self, _board_pos):
         """进行一步落子方法。
 
+        记录该步落子并清空可重做的落子，再在棋盘上落子。
+
+        Args:
+            _board_pos: 落子坐标。
+        """
+        now, _ = self.__player
+        self.__history.push((_board_pos, now))
+        self.__put_chess(_board_pos)
+        if self.__winner is not None:
+            # 对局结束时自动保存棋谱，以便之后回放分析。
+            save_record(self.__size, self.__history.steps,
+                        _seed=self.__ai.seed)
+
+    def __put_chess(self, _board_pos):
+        """在棋盘上落子方法。
+
         先进行一步落子，再判断是否获胜，最后翻转当前落子者。
 
         Args:
@@ -79,11 +127,78 @@ class Interactive(object):
         board_x, board_y = _board_pos
         now, _ = self.__player
         self.__board[board_x][board_y] = now
-        self.__steps.append(((board_x, board_y), now))
+        self.__changes.append(_board_pos)
         if self.__ai.game_over(self.__board, _board_pos, self.__player):
             self.__winner = now
             self.__game_interface.enable_restart_button()
         self.__player = self.__player[::-1]
+        self.__update_history_buttons()
+
+    def __undo(self):
+        """悔棋方法。
+
+        人机对战时一直悔棋到轮到玩家落子，即悔掉 AI 的一步与玩家的一步。\n
+        被悔掉的点记录在变化列表中，AI 在下一次决策时只比较这些点，\n
+        无需重新创建。
+        """
+        num = 1
+        steps = self.__history.steps
+        if (self.__use_AI and len(steps) > 0 and
+                steps[-1][1] == PlayerEnum.PLAYER_TWO):
+            num = 2
+        undone = self.__history.undo(num)
+        if len(undone) == 0:
+            return
+        for (board_x, board_y), _ in undone:
+            self.__board[board_x][board_y] = PlayerEnum.NO_PLAYER
+            self.__changes.append((board_x, board_y))
+        now = undone[-1][1]
+        self.__player = now, PlayerEnum(1 - now)
+        if self.__winner is not None:
+            self.__winner = None
+            self.__game_interface.enable_give_up_button()
+        self.__update_history_buttons()
+
+    def __redo(self):
+        """重做方法。
+
+        人机对战时一直重做到再次轮到玩家落子，或有一方获胜。
+        """
+        num = 2 if self.__use_AI else 1
+        for board_pos, _ in self.__history.redo(num):
+            self.__put_chess(board_pos)
+            if self.__winner is not None:
+                break
+
+    def __start_replay(self, _steps):
+        """进入回放分析模式方法。
+
+        载入棋谱后从空棋盘开始，通过重做、悔棋按钮或左右方向键逐步回放，\n
+        后台线程同时分析每一步之后的局面。
+
+        Args:
+            _steps: 棋谱中的落子记录列表
+        """
+        self.__game_interface = GameInterface(self.__windows, self.__size)
+        self.__game_interface.reset()
+        self.__in_first_interface = False
+        self.__use_AI = False
+        self.__history.load(_steps)
+        self.__update_history_buttons()
+        self.__analyzer = Analyzer(self.__size, _steps)
+        self.__analyzer.start()
+
+    def __stop_replay(self):
+        """退出回放分析模式方法。"""
+        if self.__analyzer is not None:
+            self.__analyzer.stop()
+            self.__analyzer = None
+        self.__use_AI = True
+
+    def __update_history_buttons(self):
+        """根据落子记录更新悔棋与重做按钮方法。"""
+        self.__game_interface.update_history_buttons(
+            self.__history.undo_num > 0, self.__history.redo_num > 0)
 
     def __click(self, _mouse_pos):
         """处理点击事件方法。
@@ -97,16 +212,31 @@ class Interactive(object):
         if self.__in_first_interface:
             status = self.__first_interface.check_buttons(_mouse_pos)
             if status == ButtonEnum.START_BUTTON:
+                if self.__game_interface is None:
+                    self.__game_interface = GameInterface(self.__windows,
+                                                          self.__size)
                 self.__game_interface.reset()
                 self.__in_first_interface = False
+            elif status == ButtonEnum.MODULE_BUTTON:
+                # 切换 AI 难度，新的难度在下一局生效。
+                self.__difficulty = DifficultyEnum(
+                    (self.__difficulty + 1) % len(DifficultyEnum))
+                self.__first_interface.set_difficulty(self.__difficulty)
+                self.__ai = self.__create_ai()
             elif status == ButtonEnum.EXIT_BUTTON:
                 exit(0)
         else:
             status = self.__game_interface.check_buttons(_mouse_pos)
+            if self.__analyzer is not None and status in (
+                    ButtonEnum.RESTART_BUTTON, ButtonEnum.GIVE_UP_BUTTON,
+                    ButtonEnum.NO_BUTTON):
+                # 回放时不可重新开始、投降或落子。
+                return
             if status == ButtonEnum.RESTART_BUTTON:
                 # 重新开始游戏，先清空游戏数据，并使得投降按钮可用。
                 self.__reset_game_data()
                 self.__game_interface.enable_give_up_button()
+                self.__update_history_buttons()
             elif status == ButtonEnum.GIVE_UP_BUTTON:
                 # 投降，设定胜者，并使得重新开始按钮可用。
                 if self.__use_AI and now == PlayerEnum.PLAYER_TWO:
@@ -114,8 +244,13 @@ class Interactive(object):
                     return
                 self.__winner = nxt
                 self.__game_interface.enable_restart_button()
+            elif status == ButtonEnum.UNDO_BUTTON:
+                self.__undo()
+            elif status == ButtonEnum.REDO_BUTTON:
+                self.__redo()
             elif status == ButtonEnum.BACK_BUTTON:
                 self.__first_interface.reset()      # 清空页面。
+                self.__stop_replay()
                 self.__reset_game_data()        # 清空游戏数据。
                 self.__in_first_interface = True
             else:
@@ -127,7 +262,8 @@ class Interactive(object):
                     # 如果游戏结束，则不可落子。
                     return
                 elif self.__game_interface.check_in_board(_mouse_pos):
-                    board_x, board_y = get_board_pos(_mouse_pos)
+                    board_x, board_y = get_board_pos(
+                        _mouse_pos, self.__game_interface.rec_size)
                     if self.__board[board_x][board_y] == PlayerEnum.NO_PLAYER:
                         self.__make_one_step((board_x, board_y))
 
@@ -136,12 +272,19 @@ class Interactive(object):
         if self.__in_first_interface:
             self.__first_interface.draw()
         else:
-            self.__game_interface.draw(self.__steps)
+            self.__game_interface.draw(self.__history.steps)
 
             # 如果是人机对战，且比赛未结束，则画出 AI 头像。
             if self.__use_AI and self.__winner is None:
                 self.__game_interface.draw_ai()
 
+            # 回放分析时显示当前局面的分析结果。
+            if self.__analyzer is not None:
+                num = self.__history.undo_num
+                self.__game_interface.draw_analysis(
+                    num, num + self.__history.redo_num,
+                    self.__analyzer.get_result(num))
+
             # 如果有胜者，则标出胜者，否则说明在游戏中，进行游戏中判断。
             if self.__winner is not None:
                 self.__game_interface.show_winner(self.__winner)
@@ -160,6 +303,33 @@ class Interactive(object):
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 # 鼠标点击事件。
                 self.__click(pygame.mouse.get_pos())
+            elif event.type == pygame.KEYDOWN:
+                # 键盘事件。
+                self.__press(event.key)
+
+    def __press(self, _key):
+        """处理按键事件方法。
+
+        游戏界面中左右方向键用于悔棋与重做，\n
+        回放分析时 Home、End 键分别跳到棋谱开头与结尾。
+
+        Args:
+            _key: 按键编号
+        """
+        if self.__in_first_interface:
+            return
+        if _key == pygame.K_LEFT:
+            self.__undo()
+        elif _key == pygame.K_RIGHT:
+            self.__redo()
+        elif self.__analyzer is not None:
+            if _key == pygame.K_HOME:
+                while self.__history.undo_num > 0:
+                    self.__undo()
+            elif _key == pygame.K_END:
+                while (self.__history.redo_num > 0 and
+                       self.__winner is None):
+                    self.__redo()
 
     def __change_mouse_show(self):
         """更改鼠标样式方法。
@@ -168,8 +338,9 @@ class Interactive(object):
         当鼠标位于棋盘内且该处无棋子时，将鼠标变为一个亮红色的圆圈。
         """
         now, _ = self.__player
-        if self.__in_first_interface or self.__winner is not None:
-            # 在非游戏中时，不修改鼠标样式
+        if (self.__in_first_interface or self.__winner is not None or
+                self.__analyzer is not None):
+            # 在非游戏中或回放分析时，不修改鼠标样式
             pygame.mouse.set_visible(True)
             return
         if self.__use_AI and now == PlayerEnum.PLAYER_TWO:
@@ -177,11 +348,13 @@ class Interactive(object):
             pygame.mouse.set_visible(True)
             return
         if self.__game_interface.check_in_board(pygame.mouse.get_pos()):
-            board_x, board_y = get_board_pos(pygame.mouse.get_pos())
+            board_x, board_y = get_board_pos(
+                pygame.mouse.get_pos(), self.__game_interface.rec_size)
             if self.__board[board_x][board_y] == PlayerEnum.NO_PLAYER:
                 pygame.mouse.set_visible(False)
                 pygame.draw.circle(self.__windows, LIGHT_RED,
-                                   pygame.mouse.get_pos(), CHESS_RADIUS)
+                                   pygame.mouse.get_pos(),
+                                   self.__game_interface.chess_radius)
             else:
                 pygame.mouse.set_visible(True)
         else:
@@ -192,12 +365,25 @@ class Interactive(object):
 
         清空棋盘，并设置目前玩家为玩家 1，胜者为空。
         """
-        self.__board = [[PlayerEnum.NO_PLAYER] * BOARD_WIDTH
-                        for _ in range(BOARD_HEIGHT)]
+        self.__board = [[PlayerEnum.NO_PLAYER] * self.__size
+                        for _ in range(self.__size)]
         self.__player = PlayerEnum.PLAYER_ONE, PlayerEnum.PLAYER_TWO
         self.__winner = None
-        self.__steps = []
-        self.__ai = AI(self.__player)
+        self.__history.clear()
+        self.__ai = self.__create_ai()
+
+    def __create_ai(self):
+        """按当前难度与 AI_ENGINE 所选引擎创建 AI 方法。
+
+        Returns:
+            AI 对象或 MCTS 对象。
+        """
+        # 新的 AI 第一次决策时会扫描整个棋盘，之前的变化不再需要。
+        self.__changes.clear()
+        engine = MCTS if AI_ENGINE == EngineEnum.MCTS else AI
+        return engine(self.__player, self.__size,
+                      _profile=get_profile(self.__difficulty),
+                      _seed=self.__seed)
 
     @staticmethod
     def __init_windows():
@@ -211,8 +397,7 @@ class Interactive(object):
         # 初始化窗口、标题和图标。
         windows = pygame.display.set_mode([SCREEN_WIDTH, SCREEN_HEIGHT])
         pygame.display.set_caption("{} {}".format(GAME_NAME, GAME_VERSION))
-        pygame.display.set_icon(
-            pygame.image.load(resource_path('./resource/image/head.ico')))
+        pygame.display.set_icon(get_asset_manager().get_image('head'))
 
         # 初始化时钟、设定帧率为 60 帧/秒。
         clock = pygame.time.Clock()
@@ -13,14 +13,13 @@
 from abc import abstractmethod
 
 import pygame
-import pygame.image
 
+from Asset import get_asset_manager
 from Button import Button
 from Constant import ButtonEnum
 from Constant import PlayerEnum
 from Text import Text
 from Settings import *
-from Utils import resource_path
 from Utils import get_chess_pos
 
 
@@ -61,18 +60,19 @@ class AbstractInterface(object):
 class FirstInterface(AbstractInterface):
     """首页类。"""
 
-    def __init__(self, _windows):
+    def __init__(self, _windows, _difficulty=AI_DIFFICULTY):
         """初始化首页方法。
 
         Args:
             _windows: 由 Pygame 创建的当前游戏窗口
+            _difficulty: 当前 AI 难度，显示在难度按钮上
         """
         self.__windows = _windows
+        self.__difficulty_text = _difficulty.name.capitalize()
 
-        # 加载背景图并将其缩放至适合窗口的大小。
-        self.__background_img = pygame.transform.scale(
-            pygame.image.load('./resource/image/background.jpg'),
-            [SCREEN_WIDTH, SCREEN_HEIGHT])
+        # 获取缩放至适合窗口大小的背景图。
+        self.__background_img = get_asset_manager().get_image(
+            'background', (SCREEN_WIDTH, SCREEN_HEIGHT))
 
         # 创建首页上标题。
         self.__title_text = Text(None, TITLE_HEIGHT, 'Gobang',
@@ -82,7 +82,8 @@ class FirstInterface(AbstractInterface):
         self.__start_button = Button('Start', BUTTON_COLOR, True,
                                      (TITLE_X - BUTTON_WIDTH // 2,
                                       TITLE_Y + TITLE_HEIGHT))
-        self.__model_button = Button('PVE', MODULE_BUTTON_COLOR, True,
+        self.__model_button = Button(self.__difficulty_text,
+                                     MODULE_BUTTON_COLOR, True,
                                      (TITLE_X - BUTTON_WIDTH // 2,
                                       TITLE_Y + TITLE_HEIGHT + 60))
         self.__exit_button = Button('Exit', BUTTON_COLOR, True,
@@ -127,13 +128,23 @@ class FirstInterface(AbstractInterface):
         self.__start_button = Button('Start', BUTTON_COLOR, True,
                                      (TITLE_X - BUTTON_WIDTH // 2,
                                       TITLE_Y + TITLE_HEIGHT))
-        self.__model_button = Button('PVE', MODULE_BUTTON_COLOR, True,
+        self.__model_button = Button(self.__difficulty_text,
+                                     MODULE_BUTTON_COLOR, True,
                                      (TITLE_X - BUTTON_WIDTH // 2,
                                       TITLE_Y + TITLE_HEIGHT + 60))
         self.__exit_button = Button('Exit', BUTTON_COLOR, True,
                                     (TITLE_X - BUTTON_WIDTH // 2,
                                      TITLE_Y + TITLE_HEIGHT + 120))
 
+    def set_difficulty(self, _difficulty):
+        """设置难度按钮上显示的难度方法。
+
+        Args:
+            _difficulty: AI 难度，为 DifficultyEnum 中的值
+        """
+        self.__difficulty_text = _difficulty.name.capitalize()
+        self.__model_button.text = self.__difficulty_text
+
     def __draw_background(self):
         """绘制首页背景。"""
         pygame.draw.rect(self.__windows, WHITE_COLOR,
@@ -150,17 +161,23 @@ class FirstInterface(AbstractInterface):
 class GameInterface(AbstractInterface):
     """游戏界面类。"""
 
-    def __init__(self, _windows):
+    def __init__(self, _windows, _size=CHESS_MAX_NUM):
         """初始化游戏界面方法。
 
         Args:
             _windows: 由 Pygame 创建的当前游戏窗口
+            _size: 棋盘每行每列格子数量
         """
         self.__windows = _windows
 
-        # 加载 AI 用头像
-        self.__ai_img = pygame.transform.scale(pygame.image.load(
-            resource_path('./resource/image/ai.jpg')), (100, 100))
+        # 根据棋盘尺寸缩放每一格的长宽，使棋盘总大小保持不变。
+        self.__size = _size
+        self.__rec_size = BOARD_WIDTH // _size
+        self.__chess_radius = self.__rec_size // 2 - 2
+        self.__board_length = self.__rec_size * _size
+
+        # 获取 AI 用头像
+        self.__ai_img = get_asset_manager().get_image('ai', (100, 100))
 
         # 创建游戏界面上按钮。
         self.__restart_button = Button('Restart', BUTTON_COLOR, False,
@@ -169,6 +186,12 @@ class GameInterface(AbstractInterface):
                                        (BOARD_WIDTH + 30, BUTTON_HEIGHT + 160))
         self.__back_button = Button('Menu', BUTTON_COLOR, True,
                                     (BOARD_WIDTH + 30, 2 * BUTTON_HEIGHT + 190))
+        self.__undo_button = Button('Undo', BUTTON_COLOR, False,
+                                    (BOARD_WIDTH + 30,
+                                     3 * BUTTON_HEIGHT + 220))
+        self.__redo_button = Button('Redo', BUTTON_COLOR, False,
+                                    (BOARD_WIDTH + 30,
+                                     4 * BUTTON_HEIGHT + 250))
 
     def draw(self, _steps=None):
         """绘制游戏界面方法。
@@ -185,6 +208,8 @@ class GameInterface(AbstractInterface):
         self.__draw_button(self.__restart_button)
         self.__draw_button(self.__give_up_button)
         self.__draw_button(self.__back_button)
+        self.__draw_button(self.__undo_button)
+        self.__draw_button(self.__redo_button)
 
     def draw_ai(self):
         """绘制 ai 头像方法。"""
@@ -209,6 +234,33 @@ class GameInterface(AbstractInterface):
                     (BOARD_WIDTH + 100, SCREEN_HEIGHT - 45))
         self.__windows.blit(*text.text_element)
 
+    def draw_analysis(self, _num, _total, _result):
+        """绘制棋局分析结果方法。
+
+        在信息栏中显示当前步数、评分与最佳落子点，并在棋盘上圈出最佳落子点。
+
+        Args:
+            _num: 当前局面中的棋子数量
+            _total: 棋谱中的棋子总数
+            _result: (黑方视角的评分, 最佳落子点)，尚未分析完成时为 None
+        """
+        lines = ['Move {}/{}'.format(_num, _total)]
+        if _result is None:
+            lines.append('Analysing...')
+        else:
+            score, best_move = _result
+            lines.append('Score: {:+d}'.format(score))
+            if best_move is not None:
+                lines.append('Best: {}, {}'.format(*best_move))
+                x, y = get_chess_pos(best_move, self.__rec_size)
+                pos = x + self.__rec_size // 2, y + self.__rec_size // 2
+                pygame.draw.circle(self.__windows, BLUE_COLOR, pos,
+                                   self.__chess_radius, 2)
+        for i, line in enumerate(lines):
+            text = Text(None, 30, line, BLACK_COLOR,
+                        (BOARD_WIDTH + 100, 5 * BUTTON_HEIGHT + 290 + 35 * i))
+            self.__windows.blit(*text.text_element)
+
     def check_buttons(self, _mouse_pos):
         """检查游戏界面按钮点击方法。
 
@@ -227,6 +279,10 @@ class GameInterface(AbstractInterface):
             return ButtonEnum.GIVE_UP_BUTTON
         if self.__back_button.clicked(_mouse_pos):
             return ButtonEnum.BACK_BUTTON
+        if self.__undo_button.clicked(_mouse_pos):
+            return ButtonEnum.UNDO_BUTTON
+        if self.__redo_button.clicked(_mouse_pos):
+            return ButtonEnum.REDO_BUTTON
         return ButtonEnum.NO_BUTTON
 
     def reset(self):
@@ -241,6 +297,12 @@ class GameInterface(AbstractInterface):
                                        (BOARD_WIDTH + 30, BUTTON_HEIGHT + 160))
         self.__back_button = Button('Menu', BUTTON_COLOR, True,
                                     (BOARD_WIDTH + 30, 2 * BUTTON_HEIGHT + 190))
+        self.__undo_button = Button('Undo', BUTTON_COLOR, False,
+                                    (BOARD_WIDTH + 30,
+                                     3 * BUTTON_HEIGHT + 220))
+        self.__redo_button = Button('Redo', BUTTON_COLOR, False,
+                                    (BOARD_WIDTH + 30,
+                                     4 * BUTTON_HEIGHT + 250))
 
     def enable_restart_button(self):
         """启用重新开始按钮。
@@ -262,8 +324,19 @@ class GameInterface(AbstractInterface):
         if self.__restart_button.enabled:
             self.__restart_button.reverse_enabled()
 
-    @staticmethod
-    def check_in_board(_pos):
+    def update_history_buttons(self, _can_undo, _can_redo):
+        """更新悔棋与重做按钮可用性方法。
+
+        Args:
+            _can_undo: 是否可以悔棋
+            _can_redo: 是否可以重做
+        """
+        for button, enabled in ((self.__undo_button, _can_undo),
+                                (self.__redo_button, _can_redo)):
+            if button.enabled != enabled:
+                button.reverse_enabled()
+
+    def check_in_board(self, _pos):
         """检查坐标是否在棋盘内方法。
 
         Args:
@@ -273,7 +346,25 @@ class GameInterface(AbstractInterface):
             坐标是否在棋盘内。
         """
         x, y = _pos
-        return 0 < x < BOARD_WIDTH and 0 < y < BOARD_HEIGHT
+        return 0 < x < self.__board_length and 0 < y < self.__board_length
+
+    @property
+    def rec_size(self):
+        """棋盘上每一格长宽属性。
+
+        Returns:
+            当前棋盘尺寸下每一格的长宽。
+        """
+        return self.__rec_size
+
+    @property
+    def chess_radius(self):
+        """棋子半径属性。
+
+        Returns:
+            当前棋盘尺寸下棋子的半径。
+        """
+        return self.__chess_radius
 
     def __draw_background(self):
         """绘制游戏界面背景。"""
@@ -285,35 +376,41 @@ class GameInterface(AbstractInterface):
                          (BOARD_WIDTH, 0, INFO_WIDTH, BOARD_HEIGHT))
 
         # 绘制棋盘上线。
-        for y in range(CHESS_MAX_NUM):
+        rec_size = self.__rec_size
+        for y in range(self.__size):
             # 画横线。
-            start_pos = REC_SIZE // 2, REC_SIZE // 2 + REC_SIZE * y
-            end_pos = BOARD_WIDTH - REC_SIZE // 2, REC_SIZE // 2 + REC_SIZE * y
-            if y == CHESS_MAX_NUM // 2:
+            start_pos = rec_size // 2, rec_size // 2 + rec_size * y
+            end_pos = (self.__board_length - rec_size // 2,
+                       rec_size // 2 + rec_size * y)
+            if y == self.__size // 2:
                 width = 2
             else:
                 width = 1
             pygame.draw.line(self.__windows, BLACK_COLOR, start_pos,
                              end_pos, width)
-        for x in range(CHESS_MAX_NUM):
+        for x in range(self.__size):
             # 画竖线。
-            start_pos = REC_SIZE // 2 + REC_SIZE * x, REC_SIZE // 2
-            end_pos = REC_SIZE // 2 + REC_SIZE * x, BOARD_HEIGHT - REC_SIZE // 2
-            if x == BOARD_HEIGHT // 2:
+            start_pos = rec_size // 2 + rec_size * x, rec_size // 2
+            end_pos = (rec_size // 2 + rec_size * x,
+                       self.__board_length - rec_size // 2)
+            if x == self.__size // 2:
                 width = 2
             else:
                 width = 1
             pygame.draw.line(self.__windows, BLACK_COLOR, start_pos,
                              end_pos, width)
 
-        # 绘制棋盘上方块。
-        rec_size = 8
-        pos = [(3, 3), (11, 3), (3, 11), (11, 11), (7, 7)]
+        # 绘制棋盘上方块，奇数尺寸的棋盘额外绘制天元。
+        point_size = 8
+        edge = self.__size - 4
+        pos = [(3, 3), (edge, 3), (3, edge), (edge, edge)]
+        if self.__size % 2 == 1:
+            pos.append((self.__size // 2, self.__size // 2))
         for x, y in pos:
             pygame.draw.rect(self.__windows, BLACK_COLOR,
-                             (REC_SIZE // 2 + REC_SIZE * x - rec_size // 2,
-                              REC_SIZE // 2 + REC_SIZE * y - rec_size // 2,
-                              rec_size, rec_size))
+                             (rec_size // 2 + rec_size * x - point_size // 2,
+                              rec_size // 2 + rec_size * y - point_size // 2,
+                              point_size, point_size))
 
     def __draw_chess(self, _steps):
         """绘制已落下的棋子。"""
@@ -321,27 +418,28 @@ class GameInterface(AbstractInterface):
             PlayerEnum.PLAYER_ONE: PLAYER_ONE_COLOR,
             PlayerEnum.PLAYER_TWO: PLAYER_TWO_COLOR
         }
+        rec_size = self.__rec_size
         # 绘制已落下棋子。
         for i in range(len(_steps)):
             board_pos, turn = _steps[i]
-            x, y = get_chess_pos(board_pos)
-            pos = (x + REC_SIZE // 2, y + REC_SIZE // 2)
-            radius = CHESS_RADIUS
+            x, y = get_chess_pos(board_pos, rec_size)
+            pos = (x + rec_size // 2, y + rec_size // 2)
+            radius = self.__chess_radius
             if turn == PlayerEnum.PLAYER_ONE:
                 op_turn = PlayerEnum.PLAYER_TWO
             else:
                 op_turn = PlayerEnum.PLAYER_ONE
             pygame.draw.circle(self.__windows, player_color[turn], pos, radius)
-            text = Text(None, REC_SIZE * 2 // 3, str(i),
+            text = Text(None, rec_size * 2 // 3, str(i),
                         player_color[op_turn], pos)
             self.__windows.blit(*text.text_element)
         # 圈出最后落下的棋子。
         if len(_steps) > 0:
             last_pos = _steps[-1]
-            x, y = get_chess_pos(last_pos[0])
-            line_list = [(x, y), (x + REC_SIZE, y),
-                         (x + REC_SIZE, y + REC_SIZE),
-                         (x, y + REC_SIZE)]
+            x, y = get_chess_pos(last_pos[0], rec_size)
+            line_list = [(x, y), (x + rec_size, y),
+                         (x + rec_size, y + rec_size),
+                         (x, y + rec_size)]
             pygame.draw.lines(self.__windows, PURPLE_COLOR, True, line_list, 1)
 
     def __draw_button(self, _button):
@@ -0,0 +1,514 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    MCTS.py
+时间:
+    2026/10/19 17:30
+"""
+import math
+import random
+import sys
+import time
+from array import array
+
+from AI import NO_PLAYER
+from AI import load_shape_module
+from BoardTable import get_board_table
+from Cache import MemoryBudget
+from Cache import PointCache
+from Candidate import CandidateIndex
+from Constant import ChessType
+from Profile import get_profile
+from Settings import AI_DIFFICULTY
+from Settings import AI_MCTS_EXPLORATION
+from Settings import AI_MCTS_MOVE_NUM
+from Settings import AI_MCTS_ROLLOUT_DEPTH
+from Settings import AI_MCTS_ROLLOUT_MOVE_NUM
+from Settings import AI_MCTS_TIME_BUDGET
+from Settings import AI_RANDOM_SEED
+from Settings import CHESS_MAX_NUM
+from Settings import CHESS_TYPE_NUM
+
+
+class Node(object):
+    """蒙特卡洛树节点类。"""
+    __slots__ = ('move', 'player', 'parent', 'children', 'untried',
+                 'visits', 'wins', 'winner')
+
+    def __init__(self, _move, _player, _parent=None, _winner=None):
+        """初始化节点方法。
+
+        Args:
+            _move: 到达该节点的落子点一维下标，根节点为 None
+            _player: 到达该节点的落子方玩家编号
+            _parent: 父节点
+            _winner: 该落子已成五时为落子方玩家编号，否则为 None
+        """
+        self.move = _move
+        self.player = _player
+        self.parent = _parent
+        self.children = []
+        self.untried = None     # 尚未展开的落子点，第一次展开时生成。
+        self.visits = 0
+        self.wins = 0.0         # 落子方的得分，获胜计 1，和棋计 0.5。
+        self.winner = _winner
+
+
+# 每个节点占用内存的估计值：节点对象、子节点列表与未展开落子点列表。
+NODE_NBYTES = sys.getsizeof(Node(0, 0)) + 2 * sys.getsizeof([]) + (
+    8 * AI_MCTS_MOVE_NUM)
+
+
+class SearchTree(object):
+    """蒙特卡洛树类。
+
+    记录根节点与节点数，节点数达到内存预算允许的上限时不再展开新节点。
+    """
+    __slots__ = ('root', 'node_num', 'max_node_num')
+
+    def __init__(self, _max_node_num):
+        """初始化蒙特卡洛树方法。
+
+        Args:
+            _max_node_num: 最大节点数
+        """
+        self.root = None
+        self.node_num = 0
+        self.max_node_num = _max_node_num
+
+    def set_root(self, _root):
+        """更换根节点并重新统计节点数方法。
+
+        Args:
+            _root: 新的根节点
+        """
+        _root.parent = None
+        self.root = _root
+        self.node_num = 0
+        nodes = [_root]
+        while len(nodes) > 0:
+            node = nodes.pop()
+            self.node_num += 1
+            nodes.extend(node.children)
+
+    @property
+    def nbytes(self):
+        """占用内存属性。
+
+        Returns:
+            按每个节点的估计值计算的字节数。
+        """
+        return self.node_num * NODE_NBYTES
+
+
+class MCTS(object):
+    """蒙特卡洛树搜索 AI 类。
+
+    与 AI 类接口相同，可以互相替换。以 UCT 公式选择节点，\n
+    每个节点只展开单点分值最高的数个候选点；模拟对局中每一步从\n
+    分值最高的数个点中按分值随机选择。搜索在时间或次数用尽时停止，\n
+    实际落子及对方回应对应的子树会保留到下一次决策。
+    """
+
+    def __init__(self, _player, _size=CHESS_MAX_NUM, _profile=None,
+                 _seed=AI_RANDOM_SEED):
+        """初始化蒙特卡洛树搜索 AI 方法。
+
+        Args:
+            _player: (真实玩家编号，AI 玩家编号)
+            _size: 棋盘每行每列格子数量
+            _profile: 难度配置，使用其中的时间、节点数与内存预算
+            _seed: 模拟对局所用的随机数种子，为 None 时随机生成
+        """
+        if _profile is None:
+            _profile = get_profile(AI_DIFFICULTY)
+        self.__profile = _profile
+
+        self.__size = _size
+        self.__table = get_board_table(_size)
+        self.__shape = load_shape_module()
+        self.__chess = bytearray([NO_PLAYER]) * (self.__table.area + 1)
+        self.__synced = False   # 是否已与外部棋盘整体同步过一次。
+        self.__can_move = CandidateIndex(self.__table)
+        self.__point_cache = PointCache(self.__table)
+        self.__iteration_num = 0    # 本次决策中的模拟次数。
+
+        # 大小固定的表登记后，剩余内存全部用于蒙特卡洛树的节点。
+        self.__memory = MemoryBudget(_profile.memory_budget)
+        self.__memory.reserve('board', memoryview(self.__chess))
+        self.__memory.reserve('candidates', self.__can_move,
+                              self.__can_move.max_nbytes)
+        self.__memory.reserve('point_cache', self.__point_cache)
+        self.__tree = SearchTree(self.__memory.free // NODE_NBYTES)
+        self.__memory.reserve('tree', self.__tree,
+                              self.__tree.max_node_num * NODE_NBYTES)
+        for name, table in self.__shape.get_shared_tables().items():
+            self.__memory.reserve_shared(name, table)
+
+        if _seed is None:
+            _seed = random.randrange(2 ** 32)
+        self.__seed = _seed
+        self.__random = random.Random(_seed)
+
+        people_player, ai_player = _player
+        self.__people_player = int(people_player)
+        self.__ai_player = int(ai_player)
+
+    def game_over(self, _board, _pos, _player):
+        """判断游戏是否结束方法。
+
+        根据当前所落子判断游戏是否结束。
+
+        Args:
+            _board: 棋盘数组
+            _pos: 当前落子的坐标
+            _player: (当前玩家编号, 对手玩家编号)
+
+        Returns:
+            游戏是否结束。
+        """
+        mine, opponent = int(_player[0]), int(_player[1])
+        x, y = _pos
+        index = x * self.__size + y
+        area = self.__table.area
+        count = array('i', [0]) * CHESS_TYPE_NUM
+        for line in self.__table.lines[index * 4:index * 4 + 4]:
+            chess_list = tuple(
+                opponent if i == area else
+                _board[i // self.__size][i % self.__size] for i in line)
+            self.__shape.get_one_chess_shape(chess_list, (mine, opponent),
+                                             count)
+        return count[ChessType.LIVE_FIVE] > 0
+
+    @property
+    def node_num(self):
+        """模拟次数属性。
+
+        Returns:
+            上一次决策中的模拟次数。
+        """
+        return self.__iteration_num
+
+    @property
+    def profile(self):
+        """难度配置属性。
+
+        Returns:
+            该 AI 对象的难度配置。
+        """
+        return self.__profile
+
+    @property
+    def seed(self):
+        """随机数种子属性。
+
+        Returns:
+            模拟对局所用的随机数种子。
+        """
+        return self.__seed
+
+    @property
+    def memory(self):
+        """内存预算属性。
+
+        Returns:
+            该 AI 对象的内存预算。
+        """
+        return self.__memory
+
+    @property
+    def tree(self):
+        """蒙特卡洛树属性。
+
+        Returns:
+            蒙特卡洛树，可从中读取根节点与节点数。
+        """
+        return self.__tree
+
+    def make_decision(self, _board, _pos, _changes=None):
+        """AI 落子方法。
+
+        Args:
+            _board: 棋盘数组
+            _pos: 玩家落子的坐标
+            _changes: 上一次决策后棋盘上其他可能有变化的点的坐标列表，\n
+                为 None 时扫描整个棋盘
+
+        Returns:
+            (x, y)——决定落子的坐标。
+        """
+        if _changes is not None:
+            _changes = list(_changes) + [_pos]
+        self.__sync_tree(_board, _changes)
+        if len(self.__can_move) == 0:
+            center = self.__size // 2
+            best = center * self.__size + center
+        else:
+            self.__run()
+            children = self.__tree.root.children
+            if len(children) > 0:
+                best = max(children, key=lambda child: child.visits).move
+            else:
+                # 内存预算不足以展开节点时，选择单点分值最高的点。
+                player = self.__ai_player, self.__people_player
+                best = self.__get_moves(player, 1)[0][1]
+
+        # 保留实际落子对应的子树。
+        self.__set_chess(best, self.__ai_player)
+        child = self.__find_child(self.__tree.root, best)
+        if child is None:
+            child = Node(best, self.__ai_player)
+        self.__tree.set_root(child)
+        return self.__table.coords[best]
+
+    def __run(self):
+        """在时间与次数预算内反复进行模拟方法。"""
+        profile = self.__profile
+        time_budget = profile.time_budget
+        if time_budget is None:
+            time_budget = AI_MCTS_TIME_BUDGET
+        deadline = time.perf_counter() + time_budget
+        self.__iteration_num = 0
+        while True:
+            self.__iterate()
+            self.__iteration_num += 1
+            if (profile.node_budget is not None and
+                    self.__iteration_num >= profile.node_budget):
+                break
+            if time.perf_counter() >= deadline:
+                break
+
+    def __iterate(self):
+        """进行一次选择、展开、模拟与回溯方法。"""
+        tree = self.__tree
+        node = tree.root
+        path = [node]
+
+        # 选择：所有落子都已展开时，按 UCT 公式选择子节点。
+        while (node.winner is None and node.untried is not None and
+               len(node.untried) == 0 and len(node.children) > 0):
+            node = self.__select(node)
+            self.__set_chess(node.move, node.player)
+            path.append(node)
+
+        # 展开：落子方为上一个节点落子方的对手。
+        player = 1 - node.player
+        if node.winner is None:
+            if node.untried is None:
+                node.untried = self.__get_moves((player, node.player),
+                                                AI_MCTS_MOVE_NUM)[::-1]
+            if len(node.untried) > 0 and tree.node_num < tree.max_node_num:
+                _, move = node.untried.pop()
+                winner = self.__get_winner(move, player)
+                child = Node(move, player, node, winner)
+                node.children.append(child)
+                tree.node_num += 1
+                node = child
+                self.__set_chess(move, player)
+                path.append(node)
+
+        # 模拟。
+        winner = node.winner
+        if winner is None:
+            winner = self.__rollout((1 - node.player, node.player))
+
+        # 回溯，并还原棋盘。
+        for node in reversed(path):
+            node.visits += 1
+            if winner == NO_PLAYER:
+                node.wins += 0.5
+            elif winner == node.player:
+                node.wins += 1
+            if node is not tree.root:
+                self.__set_chess(node.move, NO_PLAYER)
+
+    @staticmethod
+    def __select(_node):
+        """按 UCT 公式选择子节点方法。
+
+        Args:
+            _node: 所有落子都已展开的节点
+
+        Returns:
+            UCT 值最高的子节点。
+        """
+        log_visits = math.log(_node.visits)
+        return max(_node.children, key=lambda child: (
+            child.wins / child.visits +
+            AI_MCTS_EXPLORATION * math.sqrt(log_visits / child.visits)))
+
+    def __rollout(self, _player):
+        """模拟对局方法。
+
+        Args:
+            _player: (落子方玩家编号, 对手玩家编号)
+
+        Returns:
+            胜者的玩家编号，和棋时为 NO_PLAYER。
+        """
+        mine, opponent = _player
+        moved = []
+        winner = NO_PLAYER
+        for _ in range(AI_MCTS_ROLLOUT_DEPTH):
+            moves = self.__get_moves((mine, opponent),
+                                     AI_MCTS_ROLLOUT_MOVE_NUM)
+            if len(moves) == 0:
+                break
+            _, move = self.__random.choices(
+                moves, weights=[score + 1 for score, _ in moves])[0]
+            if self.__get_winner(move, mine) is not None:
+                winner = mine
+                break
+            self.__set_chess(move, mine)
+            moved.append(move)
+            mine, opponent = opponent, mine
+
+        for move in reversed(moved):
+            self.__set_chess(move, NO_PLAYER)
+        return winner
+
+    def __get_winner(self, _index, _player):
+        """判断落子后是否成五方法。
+
+        Args:
+            _index: 落子点的一维下标
+            _player: 落子的玩家编号
+
+        Returns:
+            成五时为落子方玩家编号，否则为 None。
+        """
+        self.__evaluate_points([_index])
+        level = self.__point_cache.levels[_player * self.__table.area +
+                                          _index]
+        return _player if level == ChessType.LIVE_FIVE else None
+
+    def __get_moves(self, _player, _num):
+        """获取分值最高的数个落子点方法。
+
+        可以直接成五时只返回成五点，对方可以成五时只返回防守点。
+
+        Args:
+            _player: (落子方玩家编号, 对手玩家编号)
+            _num: 最大落子点数
+
+        Returns:
+            [(分值, 落子点一维下标)] 列表，按分值从高到低排列。
+        """
+        mine, opponent = _player
+        area = self.__table.area
+        scores = self.__point_cache.scores
+        levels = self.__point_cache.levels
+        indices = list(self.__can_move)
+        self.__evaluate_points(indices)
+        blocks, moves = [], []
+        for index in indices:
+            score = max(scores[mine * area + index],
+                        scores[opponent * area + index])
+            if levels[mine * area + index] == ChessType.LIVE_FIVE:
+                return [(score, index)]
+            if levels[opponent * area + index] == ChessType.LIVE_FIVE:
+                blocks.append((score, index))
+            moves.append((score, index))
+        if len(blocks) > 0:
+            return blocks
+        moves.sort(reverse=True)
+        return moves[:_num]
+
+    def __evaluate_points(self, _indices):
+        """计算多个点的分值方法。
+
+        Args:
+            _indices: 待评分点的一维下标列表
+        """
+        cache = self.__point_cache
+        misses = [index for index in _indices if not cache.lookup(index)]
+        if len(misses) == 0:
+            return
+        results = self.__shape.get_points_score(self.__table, self.__chess,
+                                                misses)
+        for index, (scores, levels) in zip(misses, results):
+            cache.store(index, scores, levels)
+
+    def __sync_tree(self, _board, _changes=None):
+        """同步棋盘与蒙特卡洛树方法。
+
+        与上一次决策相比只多了对方的一步落子，且该落子已在树中时，\n
+        以其对应的子树作为新的根节点，否则重建棋盘并创建新的树。\n
+        给出 _changes 时只比较其中的点，否则扫描整个棋盘。
+
+        Args:
+            _board: 棋盘数组
+            _changes: 可能有变化的点的坐标列表，可以重复
+        """
+        coords = self.__table.coords
+        if _changes is None or not self.__synced:
+            indices = range(self.__table.area)
+        else:
+            indices = sorted({x * self.__size + y for x, y in _changes})
+        self.__synced = True
+        added, changed = [], []
+        for index in indices:
+            x, y = coords[index]
+            player = int(_board[x][y])
+            if self.__chess[index] != player:
+                changed.append((index, player))
+                if self.__chess[index] == NO_PLAYER:
+                    added.append(index)
+
+        tree = self.__tree
+        if (len(changed) == 1 and len(added) == 1 and
+                changed[0][1] == self.__people_player and
+                tree.root is not None):
+            self.__set_chess(added[0], self.__people_player)
+            child = self.__find_child(tree.root, added[0])
+            if child is not None:
+                tree.set_root(child)
+                return
+        else:
+            # 先取回棋子再落子，与 AI 同步棋盘的顺序相同。
+            for index, player in changed:
+                if self.__chess[index] != NO_PLAYER:
+                    self.__set_chess(index, NO_PLAYER)
+            for index, player in changed:
+                if player != NO_PLAYER:
+                    self.__set_chess(index, player)
+        tree.set_root(Node(None, self.__people_player))
+
+    @staticmethod
+    def __find_child(_node, _move):
+        """查找某落子对应的子节点方法。
+
+        Args:
+            _node: 父节点
+            _move: 落子点的一维下标
+
+        Returns:
+            子节点，不存在时为 None。
+        """
+        if _node is None:
+            return None
+        for child in _node.children:
+            if child.move == _move:
+                return child
+        return None
+
+    def __set_chess(self, _index, _player):
+        """在一维棋盘上落子或取回棋子方法。
+
+        同时更新可选落子点，并使受影响的单点评分缓存失效。
+
+        Args:
+            _index: 点的一维下标
+            _player: 落子的玩家编号，为 NO_PLAYER 时是取回棋子
+        """
+        self.__chess[_index] = _player
+        self.__point_cache.invalidate(_index)
+        if _player == NO_PLAYER:
+            self.__can_move.remove(_index)
+        else:
+            self.__can_move.add(_index, self.__chess)
@@ -0,0 +1,286 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    NumpyShape.py
+时间:
+    2026/10/19 13:40
+
+Shape.py 的 NumPy 实现，接口与 Shape.py 完全相同。\n
+一行 9 个棋子相对于己方只有 3^9 种情况，导入时用 Shape.py 穷举出\n
+每种情况的棋形数量与需标记的棋子，之后的棋形计算只需查表：\n
+单点评分以数组运算一次完成一批点，整个棋盘的评分在安装了 numba 时\n
+由其编译为机器码。\n
+搜索中每个节点只计算少量的点，数组运算的调用开销抵消了查表的收益，\n
+因此本模块不用于搜索，只用于一次计算整个棋盘的批量场景：\n
+Export.py 在 FastShape 不可用时用它计算单点评分，Policy.py 使用其查找表。\n
+它同时是与 Shape.py 结果一致的参照实现。
+"""
+import itertools
+
+import numpy as np
+
+import Shape
+from Constant import ChessType
+from Constant import ChessScore
+from Constant import PlayerEnum
+from Settings import CHESS_TYPE_NUM
+from Shape import get_point_score
+from Shape import get_top_chess_type
+
+try:
+    from numba import njit
+    jit = njit(cache=True)
+except ImportError:
+    def jit(_function):
+        """未安装 numba 时直接使用原函数。"""
+        return _function
+
+NO_PLAYER = int(PlayerEnum.NO_PLAYER)
+OFF_BOARD = NO_PLAYER + 1   # 计算时哨兵格临时使用的编号。
+
+# 以己方为准的相对编号：0 为己方，1 为对方或棋盘外，2 为空格。
+# RELATIVE[player][value] 为玩家 player 看来编号为 value 的格子的相对编号。
+RELATIVE = np.array([[0, 1, 2, 1], [1, 0, 2, 1]], dtype=np.intp)
+POWER = 3 ** np.arange(9, dtype=np.intp)    # 一行相对编号转换为查表下标。
+
+
+def build_tables():
+    """穷举一行棋子的全部情况，生成查找表方法。
+
+    Returns:
+        (各情况的棋形数量, 各情况需在 visited 中标记的棋子位掩码)。
+    """
+    counts = np.zeros((3 ** 9, CHESS_TYPE_NUM), dtype=np.int32)
+    visits = np.zeros(3 ** 9, dtype=np.int32)
+    line = tuple(range(9))
+    for chess_list in itertools.product((0, 1, 2), repeat=9):
+        code = int(np.dot(chess_list, POWER))
+        visited = bytearray(9)
+        Shape.get_one_chess_shape(chess_list, (0, 1), counts[code], line,
+                                  visited)
+        visits[code] = sum(1 << i for i in range(9) if visited[i])
+    return counts, visits
+
+
+COUNT_TABLE, VISIT_TABLE = build_tables()
+
+
+def get_line_array(_table):
+    """获取三维的行下标数组方法。
+
+    Args:
+        _table: 棋盘预计算表
+
+    Returns:
+        形状为 (area, 4, 9) 的数组，与 _table.line_array 共享内存。
+    """
+    return np.frombuffer(_table.line_array, dtype=np.int32).reshape(
+        _table.area, 4, 9)
+
+
+def get_cells(_table, _chess, _indices):
+    """获取若干点四个方向上的棋子方法。
+
+    Args:
+        _table: 棋盘预计算表
+        _chess: 一维棋盘，最后一格为棋盘外的哨兵格
+        _indices: 点的一维下标数组
+
+    Returns:
+        形状为 (点数, 4, 9) 的落子者数组，棋盘外的格子为 OFF_BOARD。
+    """
+    _chess[_table.area] = OFF_BOARD
+    cells = np.frombuffer(_chess, dtype=np.uint8)[
+        get_line_array(_table)[_indices]]
+    _chess[_table.area] = NO_PLAYER
+    return cells
+
+
+def get_one_chess_shape(_chess_list, _player, _count, _line=None,
+                        _visited=None):
+    """获取一行棋子中的棋形。
+
+    Args:
+        _chess_list: 一行棋子的落子者列表
+        _player: (己方玩家编号, 对手玩家编号)
+        _count: 棋形数量数组
+        _line: 该行 9 个点在一维棋盘上的下标
+        _visited: 记录已统计过棋形的棋子的一维数组
+
+    Returns:
+        各种棋形数量的列表。
+    """
+    mine, opponent = _player
+    code = 0
+    for i, chess in enumerate(_chess_list):
+        if chess != mine:
+            code += POWER[i] * (1 if chess == opponent else 2)
+    for chess_type, count in enumerate(COUNT_TABLE[code].tolist()):
+        _count[chess_type] += count
+    if _visited is not None:
+        mask = int(VISIT_TABLE[code])
+        for i in range(9):
+            if mask >> i & 1:
+                _visited[_line[i]] = 1
+    return _count
+
+
+def get_point_shape(_table, _chess, _index, _player, _count):
+    """获取某点在某玩家落子时的棋形。
+
+    Args:
+        _table: 棋盘预计算表
+        _chess: 一维棋盘，最后一格为棋盘外的哨兵格
+        _index: 点的一维下标
+        _player: 落子的玩家编号
+        _count: 棋形数量数组
+
+    Returns:
+        各种棋形数量的列表。
+    """
+    cells = get_cells(_table, _chess, _index)
+    codes = RELATIVE[_player][cells] @ POWER
+    total = COUNT_TABLE[codes].sum(axis=0).tolist()
+    for chess_type, count in enumerate(total):
+        _count[chess_type] += count
+    return _count
+
+
+def get_points_score(_table, _chess, _indices):
+    """批量获取多个点在双方落子时的分值与最高棋形。
+
+    Args:
+        _table: 棋盘预计算表
+        _chess: 一维棋盘，最后一格为棋盘外的哨兵格
+        _indices: 点的一维下标列表
+
+    Returns:
+        每个点的 ((玩家 1 分值, 玩家 2 分值), (玩家 1 最高棋形, 玩家 2 最高棋形))
+        列表。
+    """
+    cells = get_cells(_table, _chess, np.asarray(_indices, dtype=np.intp))
+    scores, levels = [], []
+    for relative in RELATIVE:
+        counts = COUNT_TABLE[relative[cells] @ POWER].sum(axis=1)
+        scores.append(get_points_score_array(counts).tolist())
+        levels.append(get_top_chess_type_array(counts).tolist())
+    return list(zip(zip(*scores), zip(*levels)))
+
+
+def get_points_score_array(_counts):
+    """根据棋形批量获取点的分值，与 get_point_score 相同。
+
+    Args:
+        _counts: 形状为 (点数, CHESS_TYPE_NUM) 的棋形数量数组
+
+    Returns:
+        各点分值数组。
+    """
+    five = _counts[:, ChessType.LIVE_FIVE]
+    live_four = _counts[:, ChessType.LIVE_FOUR]
+    sleep_four = _counts[:, ChessType.SLEEP_FOUR]
+    live_three = _counts[:, ChessType.LIVE_THREE]
+
+    score = np.where((sleep_four > 1) | (sleep_four > 0) & (live_three > 0),
+                     sleep_four * ChessScore.SLEEP_FOUR,
+                     np.where(sleep_four > 0, ChessScore.LIVE_THREE, 0))
+    score += np.where(live_three > 1, 5 * ChessScore.LIVE_THREE,
+                      np.where(live_three > 0, ChessScore.LIVE_THREE, 0))
+    score += _counts[:, ChessType.SLEEP_THREE] * ChessScore.SLEEP_THREE
+    score += _counts[:, ChessType.LIVE_TWO] * ChessScore.LIVE_TWO
+    score += _counts[:, ChessType.SLEEP_TWO] * ChessScore.SLEEP_TWO
+
+    score = np.where(live_four > 0, ChessScore.LIVE_FOUR, score)
+    return np.where(five > 0, ChessScore.LIVE_FIVE, score)
+
+
+def get_top_chess_type_array(_counts):
+    """批量获取最高棋形方法。
+
+    Args:
+        _counts: 形状为 (点数, CHESS_TYPE_NUM) 的棋形数量数组
+
+    Returns:
+        各点数量大于 0 的最高棋形数组，没有任何棋形时为 ChessType.NONE。
+    """
+    exists = _counts[:, :0:-1] > 0
+    return np.where(exists.any(axis=1),
+                    ChessType.LIVE_FIVE - exists.argmax(axis=1),
+                    ChessType.NONE)
+
+
+@jit
+def count_board_shape(_stones, _codes, _players, _lines, _count_table,
+                      _visit_table, _count_one, _count_two, _visited,
+                      _area):
+    """按顺序统计已落子点的棋形方法。
+
+    同一方向上已统计过的棋子需跳过，各点之间有先后依赖，无法向量化，\n
+    安装了 numba 时此函数会被编译为机器码。
+
+    Args:
+        _stones: 已落子点的一维下标数组
+        _codes: 形状为 (点数, 4) 的查表下标数组
+        _players: 各已落子点的落子者数组
+        _lines: 形状为 (area, 4, 9) 的行下标数组
+        _count_table: 棋形数量查找表
+        _visit_table: 需标记棋子的位掩码查找表
+        _count_one: 玩家 1 棋形数量数组
+        _count_two: 玩家 2 棋形数量数组
+        _visited: 四个方向上已统计过棋形的棋子
+        _area: 棋盘面积
+    """
+    for k in range(_stones.shape[0]):
+        index = _stones[k]
+        count = _count_one if _players[k] == 0 else _count_two
+        for i in range(4):
+            if _visited[i * _area + index]:
+                continue
+            code = _codes[k, i]
+            for chess_type in range(count.shape[0]):
+                count[chess_type] += _count_table[code, chess_type]
+            mask = _visit_table[code]
+            for j in range(9):
+                if mask >> j & 1:
+                    _visited[i * _area + _lines[index, i, j]] = 1
+
+
+def get_board_shape(_table, _chess, _stones, _counts, _visited):
+    """获取整个棋盘上双方的棋形。
+
+    Args:
+        _table: 棋盘预计算表
+        _chess: 一维棋盘，最后一格为棋盘外的哨兵格
+        _stones: 已落子点的一维下标
+        _counts: (玩家 1 棋形数量数组, 玩家 2 棋形数量数组)
+        _visited: 四个方向上已统计过棋形的棋子，长度为 4 * area 且已清空
+
+    Returns:
+        (玩家 1 棋形数量数组, 玩家 2 棋形数量数组)。
+    """
+    if len(_stones) == 0:
+        return _counts
+    stones = np.asarray(_stones, dtype=np.intp)
+    players = np.frombuffer(_chess, dtype=np.uint8)[stones]
+    cells = get_cells(_table, _chess, stones)
+    codes = RELATIVE[players[:, None, None], cells] @ POWER
+    count_board_shape(stones, codes, players, get_line_array(_table),
+                      COUNT_TABLE, VISIT_TABLE,
+                      np.frombuffer(_counts[0], dtype=np.int32),
+                      np.frombuffer(_counts[1], dtype=np.int32),
+                      np.frombuffer(_visited, dtype=np.uint8), _table.area)
+    return _counts
+
+
+def get_shared_tables():
+    """获取所有 AI 共用的棋形表方法。
+
+    Returns:
+        {表名称: 有 nbytes 属性的表} 字典。
+    """
+    return {'window_counts': COUNT_TABLE, 'window_visits': VISIT_TABLE}
@@ -0,0 +1,279 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    Policy.py
+时间:
+    2026/10/19 20:30
+
+线性棋形走法模型。\n
+候选点在四个方向上各有一行 9 个棋子，分别以落子方与对方为准编码为\n
+3^9 种情况之一，模型为每种情况学习一个进攻分值与一个防守分值，\n
+候选点的分值为八项之和。一批候选点的分值由一次 NumPy 查表求和得到，\n
+AI 据此对平稳落子排序，并只搜索累计概率达到 AI_POLICY_MASS 的落子。
+
+模型由 Export.py 导出的训练数据训练：
+
+    python Policy.py --shards /tmp/shards --output policy.npz
+
+将 Settings.py 中的 AI_POLICY_PATH 设为输出文件即可使用，\n
+`python Benchmark.py policy --model policy.npz` 比较使用模型前后的搜索。
+"""
+import argparse
+import time
+import zlib
+
+import numpy as np
+
+from BoardTable import get_board_table
+from Constant import ChessScore
+from Constant import PlayerEnum
+from Export import load_shards
+from NumpyShape import POWER
+from NumpyShape import RELATIVE
+from NumpyShape import get_cells
+from Settings import AI_CANDIDATE_RADIUS
+from Settings import AI_CANDIDATE_SHAPE
+from Settings import AI_POLICY_MASS
+from Settings import AI_POLICY_MIN_MOVE_NUM
+
+WINDOW_NUM = 3 ** 9     # 一行 9 个棋子相对于某一方的情况数。
+
+
+class PolicyModel(object):
+    """线性棋形走法模型类。"""
+    __slots__ = ('attack', 'defense')
+
+    def __init__(self, _attack=None, _defense=None):
+        """初始化走法模型方法。
+
+        Args:
+            _attack: 以落子方为准的各情况分值，默认全为 0
+            _defense: 以对方为准的各情况分值，默认全为 0
+        """
+        if _attack is None:
+            _attack = np.zeros(WINDOW_NUM, np.float32)
+        if _defense is None:
+            _defense = np.zeros(WINDOW_NUM, np.float32)
+        self.attack = _attack
+        self.defense = _defense
+
+    @property
+    def nbytes(self):
+        """模型占用内存属性。
+
+        Returns:
+            两张分值表占用的字节数。
+        """
+        return self.attack.nbytes + self.defense.nbytes
+
+    @property
+    def key(self):
+        """模型摘要属性。
+
+        Returns:
+            由两张分值表与选择候选点的设置计算出的 8 位十六进制字符串，\n
+            用于区分不同模型的缓存。
+        """
+        crc = zlib.crc32(self.attack.tobytes())
+        crc = zlib.crc32(self.defense.tobytes(), crc)
+        crc = zlib.crc32('{}:{}'.format(AI_POLICY_MASS,
+                                        AI_POLICY_MIN_MOVE_NUM).encode(), crc)
+        return '{:08x}'.format(crc)
+
+    def get_logits(self, _table, _chess, _indices, _player):
+        """批量计算候选点分值方法。
+
+        Args:
+            _table: 棋盘预计算表
+            _chess: 一维棋盘，最后一格为棋盘外的哨兵格
+            _indices: 候选点的一维下标列表
+            _player: 落子方玩家编号
+
+        Returns:
+            各候选点分值的数组。
+        """
+        cells = get_cells(_table, _chess, np.asarray(_indices, np.intp))
+        attack = RELATIVE[_player][cells] @ POWER
+        defense = RELATIVE[1 - _player][cells] @ POWER
+        return (self.attack[attack].sum(axis=1) +
+                self.defense[defense].sum(axis=1))
+
+    def select(self, _logits, _move_num):
+        """根据分值选择需要搜索的候选点方法。
+
+        按分值从高到低排序，保留累计概率达到 AI_POLICY_MASS 的候选点，\n
+        数量不少于 AI_POLICY_MIN_MOVE_NUM 且不超过 _move_num。
+
+        Args:
+            _logits: 各候选点分值的数组
+            _move_num: 最多保留的候选点数
+
+        Returns:
+            保留的候选点在 _logits 中的下标列表，按分值从高到低排列。
+        """
+        order = np.argsort(-_logits, kind='stable')[:_move_num]
+        probabilities = np.exp(_logits - _logits[order[0]])
+        mass = np.cumsum(probabilities[order]) / probabilities.sum()
+        num = int(np.searchsorted(mass, AI_POLICY_MASS)) + 1
+        num = min(max(num, AI_POLICY_MIN_MOVE_NUM), len(order))
+        return order[:num].tolist()
+
+
+def load_policy(_path):
+    """读取走法模型方法。
+
+    Args:
+        _path: 模型文件路径
+
+    Returns:
+        PolicyModel 对象。
+    """
+    with np.load(_path) as model:
+        return PolicyModel(model['attack'].astype(np.float32),
+                           model['defense'].astype(np.float32))
+
+
+def save_policy(_model, _path):
+    """保存走法模型方法。
+
+    Args:
+        _model: PolicyModel 对象
+        _path: 模型文件路径
+    """
+    np.savez(_path, attack=_model.attack, defense=_model.defense)
+
+
+def get_features(_batch):
+    """提取一批训练局面中平稳落子的棋形编码方法。
+
+    只使用最佳落子为平稳落子的局面，候选点与 AI 搜索时相同：\n
+    已落子点周围的空点中，双方单点评分均低于冲四的点。
+
+    Args:
+        _batch: load_shards 读取的一批局面
+
+    Returns:
+        (进攻编码数组, 防守编码数组, 各局面第一个候选点的下标数组,
+        各局面最佳落子在全部候选点中的下标数组)，\n
+        编码数组的形状为 (候选点总数, 4)。
+    """
+    planes, players = _batch['planes'], _batch['player']
+    scores, best_moves = _batch['scores'], _batch['best_move']
+    size = planes.shape[-1]
+    table = get_board_table(size)
+    neighbours = table.get_neighbours(AI_CANDIDATE_RADIUS, AI_CANDIDATE_SHAPE)
+    attacks, defenses, offsets, targets = [], [], [], []
+    total = 0
+    for i in range(len(players)):
+        flat = planes[i].reshape(2, -1)
+        point_scores = scores[i].reshape(2, -1).max(axis=0)
+        chess = bytearray([PlayerEnum.NO_PLAYER]) * (table.area + 1)
+        stones = np.flatnonzero(flat.any(axis=0))
+        for player in (0, 1):
+            for index in np.flatnonzero(flat[player]):
+                chess[index] = player
+        candidates = sorted({neighbour for index in stones
+                             for neighbour in neighbours[index]
+                             if chess[neighbour] == PlayerEnum.NO_PLAYER and
+                             point_scores[neighbour] < ChessScore.SLEEP_FOUR})
+        if int(best_moves[i]) not in candidates or len(candidates) < 2:
+            continue
+        cells = get_cells(table, chess, np.asarray(candidates, np.intp))
+        attacks.append(RELATIVE[players[i]][cells] @ POWER)
+        defenses.append(RELATIVE[1 - players[i]][cells] @ POWER)
+        offsets.append(total)
+        targets.append(total + candidates.index(int(best_moves[i])))
+        total += len(candidates)
+    if total == 0:
+        return None
+    return (np.concatenate(attacks), np.concatenate(defenses),
+            np.array(offsets), np.array(targets))
+
+
+def get_gradient(_model, _features):
+    """计算交叉熵损失及其梯度方法。
+
+    Args:
+        _model: PolicyModel 对象
+        _features: get_features 的返回值
+
+    Returns:
+        (平均损失, 进攻分值梯度, 防守分值梯度)。
+    """
+    attacks, defenses, offsets, targets = _features
+    logits = (_model.attack[attacks].sum(axis=1) +
+              _model.defense[defenses].sum(axis=1))
+    # 每个局面的候选点构成一段，段内做 softmax。
+    segments = np.repeat(np.arange(len(offsets)),
+                         np.diff(np.append(offsets, len(logits))))
+    logits -= np.maximum.reduceat(logits, offsets)[segments]
+    exp = np.exp(logits)
+    probabilities = exp / np.add.reduceat(exp, offsets)[segments]
+    loss = -np.mean(np.log(probabilities[targets] + 1e-12))
+    delta = probabilities
+    delta[targets] -= 1
+    delta = np.repeat(delta / len(offsets), 4)
+    attack = np.bincount(attacks.ravel(), delta, WINDOW_NUM)
+    defense = np.bincount(defenses.ravel(), delta, WINDOW_NUM)
+    return float(loss), attack, defense
+
+
+def train_policy(_directory, _epochs=20, _batch_size=256, _rate=1.0,
+                 _l2=1e-4):
+    """训练走法模型方法。
+
+    Args:
+        _directory: Export.py 导出的分片目录
+        _epochs: 训练轮数
+        _batch_size: 每批的局面数
+        _rate: 学习率
+        _l2: L2 正则化系数
+
+    Returns:
+        PolicyModel 对象。
+    """
+    batches = [features for features in map(
+        get_features, load_shards(_directory, _batch_size))
+        if features is not None]
+    print('{} positions in {} batches'.format(
+        sum(len(features[2]) for features in batches), len(batches)))
+    model = PolicyModel()
+    for epoch in range(_epochs):
+        losses = []
+        for features in batches:
+            loss, attack, defense = get_gradient(model, features)
+            model.attack -= (_rate * (attack + _l2 * model.attack)).astype(
+                np.float32)
+            model.defense -= (_rate * (defense + _l2 * model.defense)).astype(
+                np.float32)
+            losses.append(loss)
+        print('epoch {:>3}: loss {:.4f}'.format(epoch + 1, np.mean(losses)))
+    return model
+
+
+def main():
+    """走法模型训练入口。"""
+    parser = argparse.ArgumentParser(
+        description='Train the move-ordering policy on exported shards.')
+    parser.add_argument('--shards', required=True,
+                        help='directory written by Export.py')
+    parser.add_argument('--output', default='policy.npz')
+    parser.add_argument('--epochs', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--rate', type=float, default=1.0)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    model = train_policy(args.shards, args.epochs, args.batch_size,
+                         args.rate)
+    save_policy(model, args.output)
+    print('saved to {} in {:.1f}s'.format(args.output,
+                                          time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    Profile.py
+时间:
+    2026/10/19 16:20
+"""
+import json
+import zlib
+
+from Constant import DifficultyEnum
+from Settings import AI_ADAPTIVE_WIDTH
+from Settings import AI_LEAF_MOVE_NUM
+from Settings import AI_LIMITED_MOVE_NUM
+from Settings import AI_MEMORY_BUDGET
+from Settings import AI_QUIESCENCE_NODE_NUM
+from Settings import AI_RANDOM_MARGIN
+from Settings import AI_ROOT_MOVE_NUM
+from Settings import AI_SEARCH_DEPTH
+from Settings import AI_SOLVER_NODE_NUM
+
+
+class Profile(object):
+    """AI 难度配置类。
+
+    决定一个 AI 对象的搜索深度、宽度、节点数、时间与内存预算、\n
+    随机选择落子的分值范围以及启用哪些求解器。\n
+    各难度只是配置不同，共用同一套搜索代码，默认参数与 Settings.py 相同。
+    """
+    __slots__ = ('depth', 'move_num', 'adaptive_width', 'root_move_num',
+                 'leaf_move_num', 'random_margin', 'quiescence_node_num',
+                 'solver_node_num', 'node_budget', 'time_budget',
+                 'memory_budget')
+
+    def __init__(self, _depth=AI_SEARCH_DEPTH, _move_num=AI_LIMITED_MOVE_NUM,
+                 _adaptive_width=AI_ADAPTIVE_WIDTH,
+                 _root_move_num=AI_ROOT_MOVE_NUM,
+                 _leaf_move_num=AI_LEAF_MOVE_NUM,
+                 _random_margin=AI_RANDOM_MARGIN,
+                 _quiescence_node_num=AI_QUIESCENCE_NODE_NUM,
+                 _solver_node_num=AI_SOLVER_NODE_NUM,
+                 _node_budget=None, _time_budget=None,
+                 _memory_budget=AI_MEMORY_BUDGET):
+        """初始化难度配置方法。
+
+        Args:
+            _depth: 博弈树搜索深度
+            _move_num: 固定宽度时每层的搜索宽度
+            _adaptive_width: 是否根据深度、候选点分值调整搜索宽度
+            _root_move_num: 自适应宽度时根节点的搜索宽度
+            _leaf_move_num: 自适应宽度时最深一层的搜索宽度
+            _random_margin: 与最佳落子分值相差不超过该值的落子会被随机选择
+            _quiescence_node_num: 每次决策中静态搜索的最大节点数，为 0 时不进行
+            _solver_node_num: 每次决策中证明数搜索的最大节点数，为 0 时不进行
+            _node_budget: 每次决策的最大节点数，为 None 时不限制
+            _time_budget: 每次决策的最长秒数，为 None 时不限制
+            _memory_budget: 搜索所用表的内存上限字节数，剩余内存用于棋局评分缓存
+        """
+        self.depth = _depth
+        self.move_num = _move_num
+        self.adaptive_width = _adaptive_width
+        self.root_move_num = _root_move_num
+        self.leaf_move_num = _leaf_move_num
+        self.random_margin = _random_margin
+        self.quiescence_node_num = _quiescence_node_num
+        self.solver_node_num = _solver_node_num
+        self.node_budget = _node_budget
+        self.time_budget = _time_budget
+        self.memory_budget = _memory_budget
+
+    @property
+    def has_budget(self):
+        """是否有预算限制属性。
+
+        Returns:
+            是否限制了节点数或时间。
+        """
+        return self.node_budget is not None or self.time_budget is not None
+
+    @property
+    def key(self):
+        """配置摘要属性。
+
+        Returns:
+            由全部参数计算出的 8 位十六进制字符串，用于区分不同配置的缓存。
+        """
+        text = json.dumps({name: getattr(self, name)
+                           for name in self.__slots__}, sort_keys=True)
+        return '{:08x}'.format(zlib.crc32(text.encode()))
+
+
+# 各难度的配置。
+PROFILES = {
+    DifficultyEnum.EASY: Profile(_depth=2, _move_num=6,
+                                 _adaptive_width=False, _random_margin=100,
+                                 _quiescence_node_num=0, _solver_node_num=0,
+                                 _node_budget=500),
+    DifficultyEnum.NORMAL: Profile(),
+    DifficultyEnum.HARD: Profile(_depth=6, _root_move_num=14,
+                                 _random_margin=2,
+                                 _quiescence_node_num=4000,
+                                 _solver_node_num=20000,
+                                 _time_budget=5.0),
+}
+
+
+def get_profile(_difficulty):
+    """获取某难度的配置方法。
+
+    Args:
+        _difficulty: 难度，为 DifficultyEnum 中的值
+
+    Returns:
+        Profile 对象。
+    """
+    return PROFILES[_difficulty]
@@ -0,0 +1,323 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    Protocol.py
+时间:
+    2026/10/19 21:10
+
+Gomocup 协议前端。\n
+通过标准输入输出与比赛管理程序通信，不需要 pygame 与显示器：
+
+    python Protocol.py
+
+支持 START、RESTART、BEGIN、TURN、BOARD、INFO、TAKEBACK、ABOUT 与 END\n
+命令。每步的时间预算由 INFO 中的 timeout_turn、timeout_match 与\n
+time_left 决定，搜索表的内存预算由 max_memory 决定。\n
+坐标 x,y 直接对应棋盘数组的 board[x][y]。
+"""
+import sys
+import time
+
+from AI import AI
+from Constant import PlayerEnum
+from Profile import Profile
+from Settings import AI_MEMORY_BUDGET
+from Settings import PROTOCOL_MAX_SIZE
+from Settings import PROTOCOL_MEMORY_SHARE
+from Settings import PROTOCOL_MIN_TIME
+from Settings import PROTOCOL_MOVES_LEFT
+from Settings import PROTOCOL_SEARCH_DEPTH
+from Settings import PROTOCOL_TIME_MARGIN
+from Settings import PROTOCOL_TIMEOUT_TURN
+
+ABOUT = ('name="Gobang", version="1.0", author="Yang Yun", '
+         'country="China"')
+
+# 协议中引擎自己的棋子总是记为玩家 1，对手的棋子记为玩家 2。
+MINE, OPPONENT = PlayerEnum.PLAYER_ONE, PlayerEnum.PLAYER_TWO
+
+
+class Protocol(object):
+    """Gomocup 协议类。
+
+    逐行读取管理程序的命令并回复，收到 END 或输入结束时返回。
+    """
+
+    def __init__(self, _input=sys.stdin, _output=sys.stdout):
+        """初始化协议方法。
+
+        Args:
+            _input: 命令输入流
+            _output: 回复输出流
+        """
+        self.__input = _input
+        self.__output = _output
+        self.__size = 0
+        self.__board = None
+        self.__ai = None
+        # 时间预算在每步搜索前按 INFO 设置的时间计算。
+        self.__profile = Profile(_depth=PROTOCOL_SEARCH_DEPTH,
+                                 _random_margin=0, _time_budget=0)
+        self.__timeout_turn = PROTOCOL_TIMEOUT_TURN     # 毫秒，0 为尽快落子。
+        self.__timeout_match = 0    # 毫秒，0 为不限制。
+        self.__time_left = None     # 毫秒，整局剩余时间。
+        self.__max_memory = 0       # 字节，0 为不限制。
+        self.__commands = {
+            'START': self.__start,
+            'RECTSTART': self.__rect_start,
+            'RESTART': self.__restart,
+            'BEGIN': self.__begin,
+            'TURN': self.__turn,
+            'BOARD': self.__board_command,
+            'INFO': self.__info,
+            'TAKEBACK': self.__takeback,
+            'ABOUT': self.__about,
+        }
+
+    def run(self):
+        """处理命令直到收到 END 方法。"""
+        for line in self.__input:
+            words = line.strip().split(maxsplit=1)
+            if len(words) == 0:
+                continue
+            command = words[0].upper()
+            argument = words[1] if len(words) > 1 else ''
+            if command == 'END':
+                return
+            handler = self.__commands.get(command)
+            if handler is None:
+                self.__send('UNKNOWN command {}'.format(command))
+                continue
+            try:
+                handler(argument)
+            except ValueError as e:
+                self.__send('ERROR {}'.format(e))
+
+    def __send(self, _text):
+        """发送一行回复方法。
+
+        Args:
+            _text: 回复内容
+        """
+        self.__output.write(_text + '\n')
+        self.__output.flush()
+
+    def __start(self, _argument):
+        """START 命令：以指定尺寸开始新的一局。
+
+        Args:
+            _argument: 棋盘尺寸
+        """
+        size = int(_argument)
+        if not 5 <= size <= PROTOCOL_MAX_SIZE:
+            raise ValueError('unsupported board size {}'.format(size))
+        if size != self.__size:
+            self.__size = size
+            self.__ai = None
+        self.__restart('')
+
+    def __rect_start(self, _argument):
+        """RECTSTART 命令：不支持长方形棋盘。
+
+        Args:
+            _argument: 棋盘宽与高
+        """
+        raise ValueError('rectangular boards are not supported')
+
+    def __restart(self, _argument):
+        """RESTART 命令：清空棋盘。
+
+        Args:
+            _argument: 无
+        """
+        self.__restart_board()
+        self.__send('OK')
+
+    def __begin(self, _argument):
+        """BEGIN 命令：在空棋盘上先落子。
+
+        Args:
+            _argument: 无
+        """
+        self.__play()
+
+    def __turn(self, _argument):
+        """TURN 命令：对手落子后轮到引擎落子。
+
+        Args:
+            _argument: 对手落子的坐标 x,y
+        """
+        x, y = self.__parse_pos(_argument)
+        self.__put(x, y, OPPONENT)
+        self.__play()
+
+    def __board_command(self, _argument):
+        """BOARD 命令：读取整个局面后落子。
+
+        随后每行为 x,y,field，field 为 1 时是引擎自己的棋子，\n
+        否则是对手的棋子，直到 DONE 为止。
+
+        Args:
+            _argument: 无
+        """
+        # 先读完整个局面，出错时也不会把剩余的行当作命令。
+        lines = []
+        for line in self.__input:
+            if line.strip().upper() == 'DONE':
+                break
+            lines.append(line.strip())
+        self.__restart_board()
+        for line in lines:
+            pos, field = line.rsplit(',', 1)
+            x, y = self.__parse_pos(pos)
+            self.__put(x, y, MINE if int(field) == 1 else OPPONENT)
+        self.__play()
+
+    def __info(self, _argument):
+        """INFO 命令：设置时间、内存等参数。
+
+        Args:
+            _argument: 参数名与参数值
+        """
+        words = _argument.split()
+        if len(words) < 2:
+            return
+        key, value = words[0].lower(), words[1]
+        if key == 'timeout_turn':
+            self.__timeout_turn = int(value)
+        elif key == 'timeout_match':
+            self.__timeout_match = int(value)
+        elif key == 'time_left':
+            self.__time_left = int(value)
+        elif key == 'max_memory':
+            if int(value) != self.__max_memory:
+                self.__max_memory = int(value)
+                self.__ai = None
+        elif key == 'rule' and int(value) != 0:
+            self.__send('MESSAGE only free-style rules are supported')
+
+    def __takeback(self, _argument):
+        """TAKEBACK 命令：撤销一步落子。
+
+        Args:
+            _argument: 需撤销落子的坐标 x,y
+        """
+        x, y = self.__parse_pos(_argument)
+        self.__board[x][y] = PlayerEnum.NO_PLAYER
+        self.__send('OK')
+
+    def __about(self, _argument):
+        """ABOUT 命令：回复引擎信息。
+
+        Args:
+            _argument: 无
+        """
+        self.__send(ABOUT)
+
+    def __restart_board(self):
+        """清空棋盘但不回复方法。"""
+        if self.__size == 0:
+            raise ValueError('START has not been received')
+        self.__board = [[PlayerEnum.NO_PLAYER] * self.__size
+                        for _ in range(self.__size)]
+
+    def __parse_pos(self, _argument):
+        """解析坐标方法。
+
+        Args:
+            _argument: 形如 x,y 的坐标
+
+        Returns:
+            (x, y)。
+        """
+        if self.__board is None:
+            raise ValueError('START has not been received')
+        x, y = (int(value) for value in _argument.split(','))
+        if not (0 <= x < self.__size and 0 <= y < self.__size):
+            raise ValueError('coordinate {},{} is outside the board'.format(
+                x, y))
+        return x, y
+
+    def __put(self, _x, _y, _player):
+        """在棋盘上落子方法。
+
+        Args:
+            _x: x 坐标
+            _y: y 坐标
+            _player: 落子的玩家编号
+        """
+        if self.__board[_x][_y] != PlayerEnum.NO_PLAYER:
+            raise ValueError('square {},{} is occupied'.format(_x, _y))
+        self.__board[_x][_y] = _player
+
+    def __get_time_budget(self):
+        """计算本步时间预算方法。
+
+        Returns:
+            本步可用于搜索的秒数。
+        """
+        budget = self.__timeout_turn / 1000
+        if self.__timeout_match > 0 and self.__time_left is not None:
+            budget = min(budget,
+                         self.__time_left / 1000 / PROTOCOL_MOVES_LEFT)
+        return max(budget * (1 - PROTOCOL_TIME_MARGIN), PROTOCOL_MIN_TIME)
+
+    def __get_ai(self):
+        """获取 AI 对象方法。
+
+        棋盘尺寸或内存限制变化时重新创建 AI 对象，\n
+        内存限制过小时使用 AI 可以运行的最小预算。
+
+        Returns:
+            AI 对象。
+        """
+        if self.__ai is None:
+            budget = AI_MEMORY_BUDGET
+            if self.__max_memory > 0:
+                budget = int(self.__max_memory * PROTOCOL_MEMORY_SHARE)
+            # 预算不足以容纳大小固定的表时仍然落子，而不是让管理程序判负。
+            min_budget = AI.get_min_memory(self.__size, self.__profile)
+            if budget < min_budget:
+                self.__send('MESSAGE memory budget of {} bytes is too small, '
+                            'using {} bytes'.format(budget, min_budget))
+                budget = min_budget
+            self.__profile.memory_budget = budget
+            self.__ai = AI((OPPONENT, MINE), self.__size,
+                           _profile=self.__profile)
+        return self.__ai
+
+    def __play(self):
+        """搜索并回复引擎的落子方法。"""
+        if self.__board is None:
+            raise ValueError('START has not been received')
+        start = time.perf_counter()
+        ai = self.__get_ai()
+        # 创建 AI 所用的时间也计入本步时间。
+        self.__profile.time_budget = max(
+            self.__get_time_budget() - (time.perf_counter() - start),
+            PROTOCOL_MIN_TIME)
+        _, move = ai.analyse(self.__board, (MINE, OPPONENT))
+        if move is None:
+            # 棋局已分出胜负时仍需回复一个空点。
+            empties = [(x, y) for x in range(self.__size)
+                       for y in range(self.__size)
+                       if self.__board[x][y] == PlayerEnum.NO_PLAYER]
+            if len(empties) == 0:
+                raise ValueError('the board is full')
+            move = empties[0]
+        self.__board[move[0]][move[1]] = MINE
+        self.__send('{},{}'.format(*move))
+
+
+def main():
+    """协议模式入口。"""
+    Protocol().run()
+
+
+if __name__ == '__main__':
+    main()
@@ -10,12 +10,17 @@
 时间:
     2021/4/13 23:28
 """
+from Constant import CandidateShape
+from Constant import DifficultyEnum
+from Constant import EngineEnum
+
 GAME_NAME = 'Gobang'        # 游戏名称。
 GAME_VERSION = 'v2.0'       # 游戏版本。
 
 REC_SIZE = 50                               # 棋盘上每一格长宽。
 CHESS_RADIUS = REC_SIZE//2 - 2              # 棋子半径。
-CHESS_MAX_NUM = 15                          # 棋盘每行每列格子数量。
+CHESS_MAX_NUM = 15                          # 棋盘每行每列格子数量默认值。
+BOARD_SIZES = (15, 19, 20)                  # 可选的棋盘每行每列格子数量。
 BOARD_WIDTH = CHESS_MAX_NUM * REC_SIZE      # 棋盘长度。
 BOARD_HEIGHT = CHESS_MAX_NUM * REC_SIZE     # 棋盘宽度。
 
@@ -43,7 +48,54 @@ PURPLE_COLOR = (255, 0, 255)        # 紫色。
 LIGHT_YELLOW = (247, 238, 214)      # 亮黄色。
 LIGHT_RED = (213, 90, 107)          # 亮红色。
 
+AI_DIFFICULTY = DifficultyEnum.NORMAL   # 默认 AI 难度，普通难度使用以下参数。
 AI_SEARCH_DEPTH = 4         # 博弈树搜索深度。
-AI_LIMITED_MOVE_NUM = 10    # 博弈树搜索宽度。
+AI_LIMITED_MOVE_NUM = 10    # 博弈树搜索宽度，自适应宽度关闭时每层均使用该宽度。
+AI_ADAPTIVE_WIDTH = True    # 是否根据深度、候选点分值调整搜索宽度。
+AI_ROOT_MOVE_NUM = 12       # 自适应宽度时根节点的搜索宽度。
+AI_LEAF_MOVE_NUM = 3        # 自适应宽度时最深一层的搜索宽度。
+AI_CLOSE_SCORE_GAP = 2      # 分值与最后一个候选点相差不超过该值的点也会被搜索。
+AI_CLOSE_MOVE_NUM = 2       # 因分值接近而额外搜索的最大点数。
+AI_REDUCTION_MOVE_INDEX = 2     # 排序在此之后的平稳落子减少一层搜索深度。
+AI_RANDOM_MARGIN = 10       # 与最佳落子分值相差不超过该值的落子会被随机选择。
+AI_RANDOM_SEED = None       # 选择落子所用的随机数种子，为 None 时每个 AI 随机生成。
+AI_QUIESCENCE_DEPTH = 8     # 静态搜索最大额外深度。
+AI_QUIESCENCE_NODE_NUM = 2000   # 每次决策中静态搜索的最大节点数。
+AI_SOLVER_NODE_NUM = 3000   # 每次决策中证明数搜索的最大节点数。
+AI_SOLVER_THREAT_NUM = 2    # 落子方可成四的点不少于该值时先以证明数搜索求解。
+AI_SOLVER_BUDGET_SHARE = 0.25   # 有预算限制时证明数搜索最多使用的节点数与时间比例。
+AI_MEMORY_BUDGET = 4 * 1024 * 1024  # 每个 AI 对象搜索所用表的内存上限（字节）。
+AI_WEIGHTS_PATH = None      # 棋局评分参数文件，由 Tune.py 生成，为 None 时使用默认参数。
+AI_POLICY_PATH = None       # 走法模型文件，由 Policy.py 训练，为 None 时不使用。
+AI_POLICY_MASS = 0.9        # 使用走法模型时搜索的平稳落子的累计概率。
+AI_POLICY_MIN_MOVE_NUM = 3  # 使用走法模型时至少搜索的平稳落子数。
+AI_SHARED_TABLE = None      # 多个进程共用的置换表的共享内存名称，为 None 时不使用。
+AI_ENGINE = EngineEnum.ALPHA_BETA   # 人机对战所用的搜索引擎。
+AI_MCTS_TIME_BUDGET = 2.0   # 难度配置未限制时间时，蒙特卡洛树搜索每次决策的秒数。
+AI_MCTS_EXPLORATION = 1.4   # UCT 公式中的探索系数。
+AI_MCTS_MOVE_NUM = 8        # 蒙特卡洛树中每个节点展开的最大落子数。
+AI_MCTS_ROLLOUT_MOVE_NUM = 3    # 模拟对局中每一步从分值最高的这些点中随机选择。
+AI_MCTS_ROLLOUT_DEPTH = 30  # 模拟对局的最大步数，超出时视为和棋。
+AI_USE_FAST_SHAPE = True    # 是否优先使用编译后的棋形计算模块。
+AI_CANDIDATE_RADIUS = 2                     # 候选点半径。
+AI_CANDIDATE_SHAPE = CandidateShape.LINE    # 候选点形状。
 
 CHESS_TYPE_NUM = 8          # 棋形总数。
+
+TELEMETRY_PATH = None       # AI 决策遥测的导出文件，如 '~/.gobang/ai.prom'，为 None 时不统计。
+TELEMETRY_INTERVAL = 60.0   # 遥测导出的最短间隔（秒）。
+TELEMETRY_PHASE_STONES = (10, 40)   # 棋子数达到这些值时分别进入中局、残局。
+TELEMETRY_SLOW_SECONDS = None   # 决策超过该秒数时采样调用栈，为 None 时不采样。
+TELEMETRY_SAMPLE_INTERVAL = 0.005   # 调用栈采样间隔（秒）。
+TELEMETRY_PROFILE_DIR = '~/.gobang/profiles'    # 慢决策采样结果的保存目录。
+
+RECORD_DIR = '~/.gobang/records'                # 对局结束后自动保存棋谱的目录。
+ANALYSIS_CACHE_PATH = '~/.gobang/analysis'      # 棋局分析结果的磁盘缓存。
+
+PROTOCOL_SEARCH_DEPTH = 10  # 协议模式下迭代加深的最大深度，实际深度由时间预算决定。
+PROTOCOL_TIMEOUT_TURN = 5000    # 管理程序未指定时每步的时间上限（毫秒）。
+PROTOCOL_TIME_MARGIN = 0.3  # 每步时间上限中留作余量的比例。
+PROTOCOL_MIN_TIME = 0.05    # 每步搜索的最短时间（秒）。
+PROTOCOL_MOVES_LEFT = 25    # 按整局剩余时间分配每步时间时估计的剩余步数。
+PROTOCOL_MEMORY_SHARE = 0.5     # 管理程序限制内存时可用于搜索表的比例。
+PROTOCOL_MAX_SIZE = 32      # 协议模式下支持的最大棋盘尺寸。
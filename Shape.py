@@ -0,0 +1,461 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    Shape.py
+时间:
+    2026/10/19 12:40
+"""
+import sys
+
+from Constant import ChessType
+from Constant import ChessScore
+from Constant import PlayerEnum
+from Settings import CHESS_TYPE_NUM
+
+NO_PLAYER = int(PlayerEnum.NO_PLAYER)   # 无玩家编号的整数值，用于加速比较。
+OFF_BOARD = NO_PLAYER + 1   # 计算单点评分时哨兵格临时使用的编号。
+
+WINDOW_CACHE_SIZE = 8192   # 一行棋子棋形缓存的最大项数。
+
+
+class WindowCache(dict):
+    """一行棋子的棋形缓存类。
+
+    一行 9 个棋子到 (玩家 1 的棋形, 玩家 2 的棋形) 的字典，棋形以\n
+    棋形编号元组表示，同一棋形出现两次时编号重复出现。\n
+    项数达到上限时清空，占用的内存不超过固定的上限，由所有 AI 共用。
+    """
+    __slots__ = ('__capacity', '__entry_nbytes')
+
+    def __init__(self, _capacity):
+        """初始化棋形缓存方法。
+
+        Args:
+            _capacity: 最大项数
+        """
+        super().__init__()
+        self.__capacity = _capacity
+        self.__entry_nbytes = 0     # 各项的键与值占用的字节数之和。
+
+    def add(self, _window, _shapes):
+        """添加一项方法。
+
+        Args:
+            _window: 一行 9 个棋子的落子者元组
+            _shapes: (玩家 1 的棋形编号元组, 玩家 2 的棋形编号元组)
+        """
+        if len(self) >= self.__capacity:
+            self.clear()
+            self.__entry_nbytes = 0
+        self[_window] = _shapes
+        self.__entry_nbytes += (sys.getsizeof(_window) +
+                                sys.getsizeof(_shapes) +
+                                sum(map(sys.getsizeof, _shapes)))
+
+    @property
+    def nbytes(self):
+        """缓存占用内存属性。
+
+        Returns:
+            字典与其中键、值占用的字节数。
+        """
+        return sys.getsizeof(self) + self.__entry_nbytes
+
+
+_window_shapes = WindowCache(WINDOW_CACHE_SIZE)
+
+
+def set_visited(_left, _right, _line, _visited):
+    """更新 visited 数组。
+
+    Args:
+        _left: 一行棋子中需标记部分的左端下标
+        _right: 一行棋子中需标记部分的右端下标
+        _line: 该行 9 个点在一维棋盘上的下标
+        _visited: 记录已统计过棋形的棋子的一维数组
+    """
+    if _visited is None: return
+    for i in range(_left, _right + 1):
+        _visited[_line[i]] = 1
+
+
+def get_one_chess_shape(_chess_list, _player, _count, _line=None,
+                          _visited=None):
+    """获取一行棋子中的棋形。
+
+    根据以某点为中心、在某方向上获取的一行 9 个棋子落子者列表，\n
+    判断其中所含有的棋形。棋盘外的格子已被算作对方所落的子。
+
+    Args:
+        _chess_list: 一行棋子的落子者列表
+        _player: (己方玩家编号, 对手玩家编号)
+        _count: 棋形数量数组
+        _line: 该行 9 个点在一维棋盘上的下标
+        _visited: 记录已统计过棋形的棋子的一维数组
+
+    Returns:
+        各种棋形数量的列表。
+    """
+    mine, opponent = _player
+    chess_list = _chess_list
+
+    # 统计己方有多少已连起来的棋子。
+    left_index, right_index = 4, 4
+    while right_index < 8:
+        if chess_list[right_index + 1] != mine:
+            break
+        right_index += 1
+    while left_index > 0:
+        if chess_list[left_index - 1] != mine:
+            break
+        left_index -= 1
+
+    # 统计两端有多少空格。
+    left_range, right_range = left_index, right_index
+    while right_range < 8:
+        if chess_list[right_range + 1] == opponent:
+            break
+        right_range += 1
+    while left_range > 0:
+        if chess_list[left_range - 1] == opponent:
+            break
+        left_range -= 1
+
+    chess_range = right_range - left_range + 1  # 连续的己方棋子 + 空白格数。
+    if chess_range < 5:
+        # 己方棋子 + 空白格数不到 5 格，则无法形成活五棋形。
+        set_visited(left_range, right_range, _line, _visited)
+        return
+
+    set_visited(left_index, right_index, _line, _visited)
+
+    mine_range = right_index - left_index + 1  # 连续的己方棋子数。
+    if mine_range >= 5:
+        # 活五棋形。
+        _count[ChessType.LIVE_FIVE] += 1
+
+    if mine_range == 4:
+        # 考虑冲四和活四棋形。
+        left_empty = right_empty = False
+        if chess_list[left_index - 1] == NO_PLAYER:
+            left_empty = True
+        if chess_list[right_index + 1] == NO_PLAYER:
+            right_empty = True
+        if left_empty and right_empty:
+            # 活四。
+            _count[ChessType.LIVE_FOUR] += 1
+        elif left_empty or right_empty:
+            # 冲四。
+            _count[ChessType.SLEEP_FOUR] += 1
+
+    if mine_range == 3:
+        # 考虑眠三、活三和冲四棋形。
+        left_empty = right_empty = False
+        left_four = right_four = False
+        if chess_list[left_index - 1] == NO_PLAYER:
+            if chess_list[left_index - 2] == mine:
+                set_visited(left_index - 2, left_index - 1, _line,
+                            _visited)
+                # 左侧有缺口的冲四棋形。
+                _count[ChessType.SLEEP_FOUR] += 1
+                left_four = True
+            left_empty = True
+
+        if chess_list[right_index + 1] == NO_PLAYER:
+            if chess_list[right_index + 2] == mine:
+                set_visited(right_index + 1, right_index + 2, _line,
+                            _visited)
+                # 右侧有缺口的冲四棋形。
+                _count[ChessType.SLEEP_FOUR] += 1
+                right_four = True
+            right_empty = True
+
+        if left_four or right_four:
+            pass
+        elif left_empty and right_empty:
+            if chess_range > 5:
+                # 活三棋形。
+                _count[ChessType.LIVE_THREE] += 1
+            else:
+                # 眠三棋形。
+                _count[ChessType.SLEEP_THREE] += 1
+        elif left_empty or right_empty:
+            # 眠三棋形。
+            _count[ChessType.SLEEP_THREE] += 1
+
+        if mine_range == 2:
+            # 考虑冲四、眠三、活三、眠二和活二棋形。
+            left_empty = right_empty = False
+            left_three = right_three = False
+            if chess_list[left_index - 1] == NO_PLAYER:
+                if chess_list[left_index - 2] == mine:
+                    set_visited(left_index - 2, left_index - 1, _line,
+                                _visited)
+                    if chess_list[left_index - 3] == NO_PLAYER:
+                        if (chess_list[right_index + 1] ==
+                                NO_PLAYER):
+                            # 活三棋形。
+                            _count[ChessType.LIVE_THREE] += 1
+                        else:
+                            # 眠三棋形。
+                            _count[ChessType.SLEEP_THREE] += 1
+                        left_three = True
+                    elif chess_list[left_index - 3] == opponent:
+                        if (chess_list[right_index + 1] ==
+                                NO_PLAYER):
+                            # 眠三棋形。
+                            _count[ChessType.SLEEP_THREE] += 1
+                            left_three = True
+
+                left_empty = True
+
+            if chess_list[right_index + 1] == NO_PLAYER:
+                if chess_list[right_index + 2] == mine:
+                    if chess_list[right_index + 3] == mine:
+                        set_visited(right_index + 1, right_index + 2,
+                                    _line, _visited)
+                        # 冲四棋形。
+                        _count[ChessType.SLEEP_FOUR] += 1
+                        right_three = True
+                    elif (chess_list[right_index + 3] ==
+                          NO_PLAYER):
+                        if left_empty:
+                            # 活三棋形。
+                            _count[ChessType.LIVE_THREE] += 1
+                        else:
+                            # 眠三棋形。
+                            _count[ChessType.SLEEP_THREE] += 1
+                        right_three = True
+                    elif left_empty:
+                        # 眠三棋形。
+                        _count[ChessType.SLEEP_THREE] += 1
+                        right_three = True
+
+                right_empty = True
+
+            if left_three or right_three:
+                pass
+            elif left_empty and right_empty:
+                # 活二棋形。
+                _count[ChessType.LIVE_TWO] += 1
+            elif left_empty or right_empty:
+                # 眠二棋形。
+                _count[ChessType.SLEEP_TWO] += 1
+
+        if mine_range == 1:
+            # 考虑眠二和活二棋形。
+            left_empty = False
+            if chess_list[left_index - 1] == NO_PLAYER:
+                if chess_list[left_index - 2] == mine:
+                    if chess_list[left_index - 3] == NO_PLAYER:
+                        if chess_list[right_index + 1] == opponent:
+                            # 眠二棋形。
+                            _count[ChessType.SLEEP_TWO] += 1
+                left_empty = True
+
+            if chess_list[right_index + 1] == NO_PLAYER:
+                if chess_list[right_index + 2] == mine:
+                    if chess_list[right_index + 3] == NO_PLAYER:
+                        if left_empty:
+                            # 活二棋形。
+                            _count[ChessType.LIVE_TWO] += 1
+                        else:
+                            # 眠二棋形。
+                            _count[ChessType.SLEEP_TWO] += 1
+                elif chess_list[right_index + 2] == NO_PLAYER:
+                    if (chess_list[right_index + 3] == mine and
+                            chess_list[right_index + 4] ==
+                            NO_PLAYER):
+                        # 活二棋形。
+                        _count[ChessType.LIVE_TWO] += 1
+    return _count
+
+
+def get_point_score(_count):
+    """根据棋形获取某点的分值。
+
+    根据 get_one_chess_shape 函数中获得的各个棋形数量，\n
+    获取某点的分值。
+
+    Args:
+        _count: 各棋形数量
+
+    Returns:
+        该点分值。
+    """
+    score = 0
+    if _count[ChessType.LIVE_FIVE] > 0:
+        return ChessScore.LIVE_FIVE
+
+    if _count[ChessType.LIVE_FOUR] > 0:
+        return ChessScore.LIVE_FOUR
+
+    if _count[ChessType.SLEEP_FOUR] > 1:
+        score += _count[ChessType.SLEEP_FOUR] * ChessScore.SLEEP_FOUR
+    elif (_count[ChessType.SLEEP_FOUR] > 0 and
+          _count[ChessType.LIVE_THREE] > 0):
+        score += _count[ChessType.SLEEP_FOUR] * ChessScore.SLEEP_FOUR
+    elif _count[ChessType.SLEEP_FOUR] > 0:
+        score += ChessScore.LIVE_THREE
+
+    if _count[ChessType.LIVE_THREE] > 1:
+        score += 5 * ChessScore.LIVE_THREE
+    elif _count[ChessType.LIVE_THREE] > 0:
+        score += ChessScore.LIVE_THREE
+
+    if _count[ChessType.SLEEP_THREE] > 0:
+        score += (_count[ChessType.SLEEP_THREE] *
+                  ChessScore.SLEEP_THREE)
+    if _count[ChessType.LIVE_TWO] > 0:
+        score += _count[ChessType.LIVE_TWO] * ChessScore.LIVE_TWO
+    if _count[ChessType.SLEEP_TWO] > 0:
+        score += _count[ChessType.SLEEP_TWO] * ChessScore.SLEEP_TWO
+
+    return score
+
+
+def get_top_chess_type(_count):
+    """获取最高棋形方法。
+
+    Args:
+        _count: 各棋形数量
+
+    Returns:
+        数量大于 0 的最高棋形，没有任何棋形时为 ChessType.NONE。
+    """
+    for chess_type in range(ChessType.LIVE_FIVE, ChessType.NONE, -1):
+        if _count[chess_type] > 0:
+            return chess_type
+    return ChessType.NONE
+
+
+def _get_window_shape(_window):
+    """获取一行棋子对双方而言的棋形方法。
+
+    一行棋子只读取一次，双方的棋形一起计算并缓存，\n
+    相同的一行棋子再次出现时（包括同一行上相邻的点）直接读取缓存。
+
+    Args:
+        _window: 一行 9 个棋子的落子者元组，棋盘外的格子为 OFF_BOARD
+
+    Returns:
+        (玩家 1 的棋形编号元组, 玩家 2 的棋形编号元组)。
+    """
+    shapes = _window_shapes.get(_window)
+    if shapes is not None:
+        return shapes
+    shapes = []
+    for player in (0, 1):
+        # 棋盘外的格子算作对方所落的子。
+        chess_list = [1 - player if chess == OFF_BOARD else chess
+                      for chess in _window]
+        count = [0] * CHESS_TYPE_NUM
+        get_one_chess_shape(chess_list, (player, 1 - player), count)
+        shapes.append(tuple(chess_type
+                            for chess_type in range(CHESS_TYPE_NUM)
+                            for _ in range(count[chess_type])))
+    shapes = tuple(shapes)
+    _window_shapes.add(_window, shapes)
+    return shapes
+
+
+def get_point_shape(_table, _chess, _index, _player, _count):
+    """获取某点在某玩家落子时的棋形。
+
+    Args:
+        _table: 棋盘预计算表
+        _chess: 一维棋盘，最后一格为棋盘外的哨兵格
+        _index: 点的一维下标
+        _player: 落子的玩家编号
+        _count: 棋形数量数组
+
+    Returns:
+        各种棋形数量的列表。
+    """
+    _chess[_table.area] = OFF_BOARD
+    for line_getter in _table.line_getters[_index * 4:_index * 4 + 4]:
+        for chess_type in _get_window_shape(line_getter(_chess))[_player]:
+            _count[chess_type] += 1
+    _chess[_table.area] = NO_PLAYER
+    return _count
+
+
+def get_board_shape(_table, _chess, _stones, _counts, _visited):
+    """获取整个棋盘上双方的棋形。
+
+    只遍历已落子点，同一方向上已统计过棋形的棋子不再重复统计。
+
+    Args:
+        _table: 棋盘预计算表
+        _chess: 一维棋盘，最后一格为棋盘外的哨兵格
+        _stones: 已落子点的一维下标
+        _counts: (玩家 1 棋形数量数组, 玩家 2 棋形数量数组)
+        _visited: 四个方向上已统计过棋形的棋子，长度为 4 * area 且已清空
+
+    Returns:
+        (玩家 1 棋形数量数组, 玩家 2 棋形数量数组)。
+    """
+    area = _table.area
+    lines = _table.lines
+    line_getters = _table.line_getters
+    view = memoryview(_visited)
+    visited = [view[i * area:(i + 1) * area] for i in range(4)]
+
+    for index in _stones:
+        mine = _chess[index]
+        player = mine, 1 - mine
+        _chess[area] = player[1]
+        for i in range(4):
+            if visited[i][index]: continue
+            line_index = index * 4 + i
+            get_one_chess_shape(line_getters[line_index](_chess), player,
+                                _counts[mine], lines[line_index], visited[i])
+    _chess[area] = NO_PLAYER
+    return _counts
+
+
+def get_points_score(_table, _chess, _indices):
+    """批量获取多个点在双方落子时的分值与最高棋形。
+
+    Args:
+        _table: 棋盘预计算表
+        _chess: 一维棋盘，最后一格为棋盘外的哨兵格
+        _indices: 点的一维下标列表
+
+    Returns:
+        每个点的 ((玩家 1 分值, 玩家 2 分值), (玩家 1 最高棋形, 玩家 2 最高棋形))
+        列表。
+    """
+    line_getters = _table.line_getters
+    shapes = _window_shapes
+    results = []
+    _chess[_table.area] = OFF_BOARD
+    for index in _indices:
+        counts = [0] * CHESS_TYPE_NUM, [0] * CHESS_TYPE_NUM
+        # 每个方向的一行棋子只读取一次，同时得到双方的棋形。
+        for line_getter in line_getters[index * 4:index * 4 + 4]:
+            window = line_getter(_chess)
+            window_shape = shapes.get(window)
+            if window_shape is None:
+                window_shape = _get_window_shape(window)
+            for player in (0, 1):
+                for chess_type in window_shape[player]:
+                    counts[player][chess_type] += 1
+        results.append((tuple(get_point_score(count) for count in counts),
+                        tuple(get_top_chess_type(count) for count in counts)))
+    _chess[_table.area] = NO_PLAYER
+    return results
+
+
+def get_shared_tables():
+    """获取所有 AI 共用的棋形表方法。
+
+    Returns:
+        {表名称: 有 nbytes 属性的表} 字典。
+    """
+    return {'window_shapes': _window_shapes}
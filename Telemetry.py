@@ -0,0 +1,360 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    Telemetry.py
+时间:
+    2026/10/19 21:50
+
+AI 决策的遥测统计。\n
+每次 make_decision 的耗时、完成的搜索深度、节点数与根节点搜索的落子数\n
+按棋局阶段记录在 HDR 风格的对数线性直方图中，每隔 TELEMETRY_INTERVAL 秒\n
+（以及进程退出时）以 Prometheus 文本格式写入 TELEMETRY_PATH，\n
+可由 node_exporter 的 textfile 收集器读取并设置慢决策告警。\n
+TELEMETRY_SLOW_SECONDS 不为 None 时，超过该秒数的决策由 TurnSampler\n
+采样调用栈，并以折叠栈格式写入 TELEMETRY_PROFILE_DIR，可直接用\n
+flamegraph.pl 或 speedscope 生成火焰图。
+"""
+import atexit
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from array import array
+
+from Constant import PlayerEnum
+from Settings import TELEMETRY_INTERVAL
+from Settings import TELEMETRY_PATH
+from Settings import TELEMETRY_PHASE_STONES
+from Settings import TELEMETRY_PROFILE_DIR
+from Settings import TELEMETRY_SAMPLE_INTERVAL
+
+SUB_BUCKET_BITS = 7     # 每个数量级内的桶数为 2^7，相对误差不超过 1/64。
+SUB_BUCKET_NUM = 1 << SUB_BUCKET_BITS
+HALF_BUCKET_NUM = SUB_BUCKET_NUM // 2
+QUANTILES = (0.5, 0.9, 0.99, 0.999, 1.0)    # 导出的分位数。
+PHASES = ('opening', 'middle', 'end')       # 棋局阶段名称。
+
+# 各指标的名称、说明，以及记录值与导出值之比。
+METRICS = (
+    ('move_seconds', 'Wall time of one make_decision call.', 1000000),
+    ('depth', 'Search depth completed in one decision.', 1),
+    ('nodes', 'Search nodes visited in one decision.', 1),
+    ('root_moves', 'Root moves searched in one decision.', 1),
+)
+
+# 已创建的遥测对象，同一进程中的 AI 共用。
+_telemetry = None
+
+
+class Histogram(object):
+    """对数线性直方图类。
+
+    小于 SUB_BUCKET_NUM 的值各占一个桶，更大的值每个二进制数量级分为\n
+    HALF_BUCKET_NUM 个桶，记录一个值只需常数时间的位运算与一次数组写入。
+    """
+    __slots__ = ('__counts', '__count', '__sum', '__max')
+
+    def __init__(self, _max_bits=48):
+        """初始化直方图方法。
+
+        Args:
+            _max_bits: 可记录的最大值的二进制位数，更大的值记入最后一个桶
+        """
+        self.__counts = array('Q', [0]) * (
+            self.__get_index((1 << _max_bits) - 1) + 1)
+        self.__count = 0
+        self.__sum = 0
+        self.__max = 0
+
+    @staticmethod
+    def __get_index(_value):
+        """获取某值所在桶的下标方法。
+
+        Args:
+            _value: 非负整数
+
+        Returns:
+            桶下标。
+        """
+        if _value < SUB_BUCKET_NUM:
+            return _value
+        shift = _value.bit_length() - SUB_BUCKET_BITS
+        return (SUB_BUCKET_NUM + (shift - 1) * HALF_BUCKET_NUM +
+                (_value >> shift) - HALF_BUCKET_NUM)
+
+    @staticmethod
+    def __get_upper(_index):
+        """获取某桶所含最大值方法。
+
+        Args:
+            _index: 桶下标
+
+        Returns:
+            该桶所含的最大整数。
+        """
+        if _index < SUB_BUCKET_NUM:
+            return _index
+        shift = (_index - SUB_BUCKET_NUM) // HALF_BUCKET_NUM + 1
+        top = (_index - SUB_BUCKET_NUM) % HALF_BUCKET_NUM + HALF_BUCKET_NUM
+        return ((top + 1) << shift) - 1
+
+    def record(self, _value):
+        """记录一个值方法。
+
+        Args:
+            _value: 非负整数
+        """
+        index = min(self.__get_index(_value), len(self.__counts) - 1)
+        self.__counts[index] += 1
+        self.__count += 1
+        self.__sum += _value
+        if _value > self.__max:
+            self.__max = _value
+
+    def get_quantile(self, _quantile):
+        """获取分位数方法。
+
+        Args:
+            _quantile: 0 到 1 之间的分位
+
+        Returns:
+            不小于该分位上记录值的桶上界，分位为 1 时为准确的最大值，\n
+            没有记录时为 0。
+        """
+        if self.__count == 0:
+            return 0
+        if _quantile >= 1:
+            return self.__max
+        rank = max(1, int(_quantile * self.__count + 0.5))
+        total = 0
+        for index, count in enumerate(self.__counts):
+            total += count
+            if total >= rank:
+                return min(self.__get_upper(index), self.__max)
+        return self.__max
+
+    @property
+    def count(self):
+        """记录数属性。
+
+        Returns:
+            记录值的个数。
+        """
+        return self.__count
+
+    @property
+    def sum(self):
+        """记录值之和属性。
+
+        Returns:
+            全部记录值之和。
+        """
+        return self.__sum
+
+    @property
+    def nbytes(self):
+        """直方图占用内存属性。
+
+        Returns:
+            桶数组的字节数。
+        """
+        return self.__counts.itemsize * len(self.__counts)
+
+
+class Telemetry(object):
+    """遥测统计类。"""
+
+    def __init__(self, _path=TELEMETRY_PATH, _interval=TELEMETRY_INTERVAL):
+        """初始化遥测统计方法。
+
+        Args:
+            _path: 导出文件路径
+            _interval: 两次导出之间的最短秒数
+        """
+        self.__path = os.path.expanduser(_path)
+        self.__interval = _interval
+        self.__last_export = time.monotonic()
+        # 每个指标、每个棋局阶段一个直方图。
+        self.__histograms = {(name, phase): Histogram()
+                             for name, _, _ in METRICS for phase in PHASES}
+
+    def record(self, _seconds, _depth, _nodes, _root_moves, _stones):
+        """记录一次决策方法。
+
+        距上次导出超过导出间隔时同时导出，导出在调用线程中完成，\n
+        不需要额外的线程。
+
+        Args:
+            _seconds: 决策耗时的秒数
+            _depth: 完成的搜索深度
+            _nodes: 搜索的节点数
+            _root_moves: 根节点搜索完的落子数
+            _stones: 棋盘上的棋子数，用于划分棋局阶段
+        """
+        phase = PHASES[sum(_stones >= stones
+                           for stones in TELEMETRY_PHASE_STONES)]
+        histograms = self.__histograms
+        histograms['move_seconds', phase].record(int(_seconds * 1000000))
+        histograms['depth', phase].record(_depth)
+        histograms['nodes', phase].record(_nodes)
+        histograms['root_moves', phase].record(_root_moves)
+        if time.monotonic() - self.__last_export >= self.__interval:
+            self.export()
+
+    def export(self):
+        """以 Prometheus 文本格式导出全部直方图方法。
+
+        先写入临时文件再替换，读取方不会看到写了一半的文件。
+        """
+        self.__last_export = time.monotonic()
+        lines = []
+        for name, description, unit in METRICS:
+            metric = 'gobang_ai_' + name
+            lines.append('# HELP {} {}'.format(metric, description))
+            lines.append('# TYPE {} summary'.format(metric))
+            for phase in PHASES:
+                histogram = self.__histograms[name, phase]
+                for quantile in QUANTILES:
+                    lines.append('{}{{phase="{}",quantile="{}"}} {}'.format(
+                        metric, phase, quantile,
+                        histogram.get_quantile(quantile) / unit))
+                lines.append('{}_sum{{phase="{}"}} {}'.format(
+                    metric, phase, histogram.sum / unit))
+                lines.append('{}_count{{phase="{}"}} {}'.format(
+                    metric, phase, histogram.count))
+        directory = os.path.dirname(self.__path)
+        if directory != '':
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.__path + '.tmp'
+        with open(temp_path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(temp_path, self.__path)
+
+    def get_histogram(self, _name, _phase):
+        """获取某指标在某棋局阶段的直方图方法。
+
+        Args:
+            _name: 指标名称，为 METRICS 中的名称
+            _phase: 棋局阶段，为 PHASES 中的名称
+
+        Returns:
+            Histogram 对象。
+        """
+        return self.__histograms[_name, _phase]
+
+
+class TurnSampler(object):
+    """慢决策调用栈采样类。
+
+    创建时启动一个采样线程，该线程先等待 _threshold 秒，决策在此之前\n
+    结束则不做任何采样；否则每隔 _interval 秒读取一次决策线程的调用栈，\n
+    直到 stop 被调用。快的决策只多出一次线程启动的开销。\n
+    采样只覆盖超过阈值之后的部分，慢决策通常是某一层迭代加深耗时过长，\n
+    这部分已足以看出时间花在哪里。
+    """
+
+    def __init__(self, _threshold, _interval=TELEMETRY_SAMPLE_INTERVAL):
+        """初始化并开始采样方法。
+
+        调用栈从调用者的栈帧开始记录，更外层的栈帧被省略。
+
+        Args:
+            _threshold: 开始采样前等待的秒数
+            _interval: 两次采样之间的秒数
+        """
+        self.__root = sys._getframe(1)
+        self.__thread_id = threading.get_ident()
+        self.__threshold = _threshold
+        self.__interval = _interval
+        self.__stacks = {}      # 折叠栈到采样次数的映射。
+        self.__stopped = threading.Event()
+        self.__thread = threading.Thread(target=self.__sample, daemon=True)
+        self.__thread.start()
+
+    def __sample(self):
+        """采样线程方法。"""
+        if self.__stopped.wait(self.__threshold):
+            return
+        while not self.__stopped.is_set():
+            frame = sys._current_frames().get(self.__thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append('{}:{}'.format(
+                    os.path.basename(code.co_filename),
+                    getattr(code, 'co_qualname', code.co_name)))
+                if frame is self.__root:
+                    break
+                frame = frame.f_back
+            # 决策已经返回时栈中没有根栈帧，这次采样不计入。
+            if frame is not None:
+                stack = ';'.join(reversed(names))
+                self.__stacks[stack] = self.__stacks.get(stack, 0) + 1
+            del frame
+            self.__stopped.wait(self.__interval)
+
+    def stop(self):
+        """停止采样方法。
+
+        Returns:
+            采样次数，决策未超过阈值时为 0。
+        """
+        self.__stopped.set()
+        self.__thread.join()
+        self.__root = None
+        return sum(self.__stacks.values())
+
+    def dump(self, _board, _player, _info, _directory=TELEMETRY_PROFILE_DIR):
+        """保存采样结果方法。
+
+        以当前时间与局面的哈希值命名，写入折叠栈文件 .folded，\n
+        以及记录该局面的同名 .json 文件，便于复现这次决策。
+
+        Args:
+            _board: 棋盘数组
+            _player: 落子方玩家编号
+            _info: 需一并记录的其他信息，如耗时、深度与节点数
+            _directory: 保存目录
+
+        Returns:
+            折叠栈文件路径。
+        """
+        stones = [[x, y, int(player)] for x, row in enumerate(_board)
+                  for y, player in enumerate(row)
+                  if player != PlayerEnum.NO_PLAYER]
+        digest = hashlib.sha1(json.dumps([len(_board), int(_player), stones])
+                              .encode()).hexdigest()[:8]
+        directory = os.path.expanduser(_directory)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, 'slow-{}-{}'.format(
+            time.strftime('%Y%m%d-%H%M%S'), digest))
+        with open(path + '.folded', 'w') as f:
+            for stack, count in sorted(self.__stacks.items()):
+                f.write('{} {}\n'.format(stack, count))
+        position = dict(_info, size=len(_board), player=int(_player),
+                        stones=stones)
+        with open(path + '.json', 'w') as f:
+            json.dump(position, f)
+        return path + '.folded'
+
+
+def get_telemetry():
+    """获取遥测统计对象方法。
+
+    第一次调用时创建，并在进程退出时导出一次。
+
+    Returns:
+        Telemetry 对象，TELEMETRY_PATH 为 None 时为 None。
+    """
+    global _telemetry
+    if _telemetry is None and TELEMETRY_PATH is not None:
+        _telemetry = Telemetry(TELEMETRY_PATH)
+        atexit.register(_telemetry.export)
+    return _telemetry
@@ -0,0 +1,305 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    Tune.py
+时间:
+    2026/10/19 19:05
+
+棋局评分参数的离线调整工具。\n
+读取棋谱（或先自我对弈生成棋谱），统计每个局面双方的棋形数量，\n
+再以 Texel 方法调整 Weights.TUNABLE 中的参数：用 sigmoid 把评分\n
+映射为落子方的胜率，使其与棋局实际结果的均方误差最小。\n
+棋形统计与自我对弈由进程池并行完成，误差计算以 NumPy 批量完成。
+
+    python Tune.py --selfplay 200 --output weights.json
+    python Tune.py --records ~/.gobang/records --output weights.json
+
+将 Settings.py 中的 AI_WEIGHTS_PATH 设为输出文件即可使用调整后的参数。
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import time
+from array import array
+
+import numpy as np
+
+from AI import AI
+from AI import load_shape_module
+from Analysis import load_record
+from Analysis import save_record
+from BoardTable import get_board_table
+from Constant import ChessType
+from Constant import ChessScore
+from Constant import PlayerEnum
+from Profile import Profile
+from Settings import CHESS_MAX_NUM
+from Settings import CHESS_TYPE_NUM
+from Settings import RECORD_DIR
+from Weights import Weights
+from Weights import load_weights
+from Weights import save_weights
+
+OPENING_STEP_NUM = 4    # 开局的这些步之后的局面才用于调整参数。
+
+
+def selfplay_game(_args):
+    """自我对弈一局并保存棋谱方法。
+
+    双方使用较浅的搜索与较大的随机选择范围，使各局棋互不相同。
+
+    Args:
+        _args: (随机数种子, 棋盘每行每列格子数量, 棋谱目录)
+
+    Returns:
+        棋谱文件路径。
+    """
+    seed, size, record_dir = _args
+    profile = Profile(_depth=2, _random_margin=50, _quiescence_node_num=0,
+                      _solver_node_num=0)
+    engines = [AI((PlayerEnum(1 - player), PlayerEnum(player)), size,
+                  _profile=profile, _seed=seed * 2 + player)
+               for player in (PlayerEnum.PLAYER_ONE, PlayerEnum.PLAYER_TWO)]
+    board = [[PlayerEnum.NO_PLAYER] * size for _ in range(size)]
+    pos = size // 2, size // 2
+    board[pos[0]][pos[1]] = PlayerEnum.PLAYER_ONE
+    steps = [(pos, PlayerEnum.PLAYER_ONE)]
+    player = PlayerEnum.PLAYER_TWO
+    while len(steps) < size * size:
+        pos = engines[player].make_decision(board, pos, ())
+        board[pos[0]][pos[1]] = player
+        steps.append((pos, player))
+        if engines[player].game_over(board, pos,
+                                     (player, PlayerEnum(1 - player))):
+            break
+        player = PlayerEnum(1 - player)
+    path = os.path.join(record_dir, 'selfplay-{:05d}.json'.format(seed))
+    return save_record(size, steps, path)
+
+
+def extract_positions(_path):
+    """统计一局棋中每个局面双方棋形数量方法。
+
+    Args:
+        _path: 棋谱文件路径
+
+    Returns:
+        [(落子方棋形数量, 对方棋形数量, 落子方的结果)] 列表，\n
+        结果为 1 时落子方获胜，0 时落子方失败，0.5 时为和棋。
+    """
+    size, steps = load_record(_path)
+    if len(steps) == 0:
+        return []
+    table = get_board_table(size)
+    shape = load_shape_module()
+    board = [[PlayerEnum.NO_PLAYER] * size for _ in range(size)]
+    for (x, y), player in steps:
+        board[x][y] = player
+    last_pos, last_player = steps[-1]
+    judge = AI((PlayerEnum.PLAYER_ONE, PlayerEnum.PLAYER_TWO), size)
+    winner = None
+    if judge.game_over(board, last_pos,
+                       (last_player, PlayerEnum(1 - last_player))):
+        winner = int(last_player)
+
+    chess = bytearray([PlayerEnum.NO_PLAYER]) * (table.area + 1)
+    stones = []
+    positions = []
+    for num, ((x, y), player) in enumerate(steps[:-1], 1):
+        index = x * size + y
+        chess[index] = player
+        stones.append(index)
+        if num < OPENING_STEP_NUM:
+            continue
+        now = 1 - int(player)
+        counts = [array('i', [0]) * CHESS_TYPE_NUM for _ in range(2)]
+        shape.get_board_shape(table, chess, sorted(stones), counts,
+                              bytearray(4 * table.area))
+        if winner is None:
+            result = 0.5
+        else:
+            result = 1.0 if winner == now else 0.0
+        positions.append((list(counts[now]), list(counts[1 - now]), result))
+    return positions
+
+
+def get_board_scores(_weights, _mine, _opponent):
+    """批量计算棋局评分方法，与 Weights.get_board_score 相同。
+
+    Args:
+        _weights: Weights 对象
+        _mine: 形状为 (局面数, CHESS_TYPE_NUM) 的落子方棋形数量数组
+        _opponent: 形状相同的对方棋形数量数组
+
+    Returns:
+        各局面落子方视角的评分数组。
+    """
+    w = _weights
+    mine, opponent = _mine.copy(), _opponent.copy()
+    mine[:, ChessType.LIVE_FOUR] += mine[:, ChessType.SLEEP_FOUR] >= 2
+    opponent[:, ChessType.LIVE_FOUR] += opponent[:, ChessType.SLEEP_FOUR] >= 2
+    m_five, o_five = (mine[:, ChessType.LIVE_FIVE],
+                      opponent[:, ChessType.LIVE_FIVE])
+    m_four, o_four = (mine[:, ChessType.LIVE_FOUR],
+                      opponent[:, ChessType.LIVE_FOUR])
+    m_sfour, o_sfour = (mine[:, ChessType.SLEEP_FOUR],
+                        opponent[:, ChessType.SLEEP_FOUR])
+    m_three, o_three = (mine[:, ChessType.LIVE_THREE],
+                        opponent[:, ChessType.LIVE_THREE])
+    m_sthree = mine[:, ChessType.SLEEP_THREE]
+
+    m_score = (np.where(o_sfour > 0, w.sleep_four_bonus, 0) +
+               np.where(m_three > 1, w.double_three,
+                        np.where(m_three == 1, w.three, 0)) +
+               m_sthree * w.sleep_three +
+               mine[:, ChessType.LIVE_TWO] * w.live_two +
+               mine[:, ChessType.SLEEP_TWO] * w.sleep_two)
+    o_score = (np.where(o_three > 1, w.opponent_double_three,
+                        np.where(o_three == 1, w.opponent_three, 0)) +
+               opponent[:, ChessType.SLEEP_THREE] * w.sleep_three +
+               opponent[:, ChessType.LIVE_TWO] * w.live_two +
+               opponent[:, ChessType.SLEEP_TWO] * w.sleep_two)
+
+    conditions = [m_five > 0, o_five > 0, m_four > 0, m_sfour > 0,
+                  o_four > 0, (o_sfour > 0) & (o_three > 0),
+                  (m_three > 0) & (o_sfour == 0),
+                  (o_three > 1) & (m_three == 0) & (m_sthree == 0)]
+    choices = [ChessScore.LIVE_FIVE, -ChessScore.LIVE_FIVE, w.live_four,
+               w.sleep_four, -w.block_four, -w.block_four_three,
+               w.live_three, -w.block_double_three]
+    return np.select(conditions, choices, m_score - o_score)
+
+
+def get_loss(_weights, _data, _scale):
+    """计算预测胜率与实际结果的均方误差方法。
+
+    Args:
+        _weights: Weights 对象
+        _data: (落子方棋形数量数组, 对方棋形数量数组, 结果数组)
+        _scale: 评分换算为胜率时的缩放系数
+
+    Returns:
+        均方误差。
+    """
+    mine, opponent, results = _data
+    scores = get_board_scores(_weights, mine, opponent)
+    predictions = 1 / (1 + np.exp(np.clip(-_scale * scores, -50, 50)))
+    return float(np.mean((results - predictions) ** 2))
+
+
+def fit_scale(_weights, _data):
+    """拟合评分换算为胜率的缩放系数方法。
+
+    Args:
+        _weights: Weights 对象
+        _data: (落子方棋形数量数组, 对方棋形数量数组, 结果数组)
+
+    Returns:
+        使均方误差最小的缩放系数。
+    """
+    scales = np.logspace(-5, -1, 81)
+    losses = [get_loss(_weights, _data, scale) for scale in scales]
+    return float(scales[int(np.argmin(losses))])
+
+
+def tune(_weights, _data, _iterations=50, _rate=0.25):
+    """以 Texel 局部搜索调整参数方法。
+
+    每轮依次将每个可调整参数增大或减小当前步长，误差降低时保留修改，\n
+    一轮中没有任何改进时步长减半。参数保持在 0 与优先棋形的最低分值\n
+    之间，使调整后的参数不改变优先棋形的先后。
+
+    Args:
+        _weights: 初始的 Weights 对象，会被直接修改
+        _data: (落子方棋形数量数组, 对方棋形数量数组, 结果数组)
+        _iterations: 最大轮数
+        _rate: 初始步长与参数值之比
+
+    Returns:
+        (调整后的 Weights 对象, 缩放系数, 初始误差, 调整后的误差)。
+    """
+    limit = _weights.block_double_three - 1
+    scale = fit_scale(_weights, _data)
+    start_loss = best_loss = get_loss(_weights, _data, scale)
+    for iteration in range(_iterations):
+        improved = False
+        for name in Weights.TUNABLE:
+            value = getattr(_weights, name)
+            step = max(1, round(value * _rate))
+            for delta in (step, -step):
+                if not 0 <= value + delta <= limit:
+                    continue
+                setattr(_weights, name, value + delta)
+                loss = get_loss(_weights, _data, scale)
+                if loss < best_loss:
+                    best_loss = loss
+                    improved = True
+                    break
+                setattr(_weights, name, value)
+        print('iteration {:>3}: loss {:.6f}'.format(iteration + 1, best_loss))
+        if not improved:
+            _rate /= 2
+            if _rate < 0.01:
+                break
+    return _weights, scale, start_loss, best_loss
+
+
+def main():
+    """参数调整入口。"""
+    parser = argparse.ArgumentParser(
+        description='Tune the board evaluation weights on game records.')
+    parser.add_argument('--records', default=RECORD_DIR,
+                        help='directory of game records')
+    parser.add_argument('--selfplay', type=int, default=0,
+                        help='play this many self-play games into '
+                             '--records first')
+    parser.add_argument('--size', type=int, default=CHESS_MAX_NUM)
+    parser.add_argument('--weights', default=None,
+                        help='initial weights file')
+    parser.add_argument('--output', default='weights.json')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    record_dir = os.path.expanduser(args.records)
+    os.makedirs(record_dir, exist_ok=True)
+    with multiprocessing.Pool(args.workers) as pool:
+        if args.selfplay > 0:
+            start = time.perf_counter()
+            existing = len(glob.glob(os.path.join(record_dir, '*.json')))
+            pool.map(selfplay_game, [(existing + seed, args.size, record_dir)
+                                     for seed in range(args.selfplay)])
+            print('played {} games in {:.1f}s'.format(
+                args.selfplay, time.perf_counter() - start))
+        paths = sorted(glob.glob(os.path.join(record_dir, '*.json')))
+        start = time.perf_counter()
+        positions = [position for game in pool.map(extract_positions, paths)
+                     for position in game]
+    if len(positions) == 0:
+        print('no positions found in {}'.format(record_dir))
+        return
+    print('extracted {} positions from {} records in {:.1f}s'.format(
+        len(positions), len(paths), time.perf_counter() - start))
+
+    mine, opponent, results = zip(*positions)
+    data = (np.array(mine, dtype=np.int64), np.array(opponent, dtype=np.int64),
+            np.array(results))
+    weights, scale, start_loss, loss = tune(load_weights(args.weights), data,
+                                            args.iterations)
+    save_weights(weights, args.output)
+    print('scale {:.2e}, loss {:.6f} -> {:.6f}, saved to {}'.format(
+        scale, start_loss, loss, args.output))
+    default = Weights()
+    for name in Weights.TUNABLE:
+        print('{:<22} {:>6} -> {:>6}'.format(
+            name, getattr(default, name), getattr(weights, name)))
+
+
+if __name__ == '__main__':
+    main()
@@ -37,34 +37,36 @@ def resource_path(path):
     return os.path.join(base_path, path)
 
 
-def get_chess_pos(_board_pos):
+def get_chess_pos(_board_pos, _rec_size=REC_SIZE):
     """获取棋子坐标。
 
     输入棋子在棋盘上的坐标，输出棋子在游戏中的真实坐标。
 
     Args:
         _board_pos: 棋盘上坐标
+        _rec_size: 棋盘上每一格长宽
 
     Returns:
         (真实 x 坐标， 真实 y 坐标).
     """
     board_x, board_y = _board_pos
-    return board_x * REC_SIZE, board_y * REC_SIZE
+    return board_x * _rec_size, board_y * _rec_size
 
 
-def get_board_pos(_pos):
+def get_board_pos(_pos, _rec_size=REC_SIZE):
     """获取棋子在棋盘上坐标。
 
     输入棋子真实坐标，输出棋子在棋盘上坐标。
 
     Args:
         _pos: 真实坐标
+        _rec_size: 棋盘上每一格长宽
 
     Returns:
         (棋盘上 x 坐标，棋盘上 y 坐标).
     """
     x, y = _pos
-    return x // REC_SIZE, y // REC_SIZE
+    return x // _rec_size, y // _rec_size
 
 
 def board_to_str(_board):
@@ -80,7 +82,7 @@ def board_to_str(_board):
 
 
 def random_score(score):
-    """使得分值进行上下 1% 的浮动。
+    """使得分值进行上下 10% 的浮动。
 
     Args:
         score: 分值
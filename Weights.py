@@ -0,0 +1,175 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    Weights.py
+时间:
+    2026/10/19 18:40
+"""
+import json
+import zlib
+
+from Constant import ChessType
+from Constant import ChessScore
+from Settings import AI_WEIGHTS_PATH
+
+
+class Weights(object):
+    """棋局评分参数类。
+
+    AI 计算全局棋形评分时使用的各项分值。前六项为必须优先处理的棋形，\n
+    其分值只决定彼此的先后；其余各项可由 Tune.py 根据棋谱调整。
+    """
+    __slots__ = ('live_four', 'sleep_four', 'block_four', 'block_four_three',
+                 'live_three', 'block_double_three', 'sleep_four_bonus',
+                 'double_three', 'three', 'opponent_double_three',
+                 'opponent_three', 'sleep_three', 'live_two', 'sleep_two')
+
+    # 可以调整的参数。
+    TUNABLE = ('sleep_four_bonus', 'double_three', 'three',
+               'opponent_double_three', 'opponent_three', 'sleep_three',
+               'live_two', 'sleep_two')
+
+    def __init__(self, **_values):
+        """初始化棋局评分参数方法。
+
+        Args:
+            _values: 需要修改的参数，其余参数使用默认值
+        """
+        self.live_four = 9050           # 己方有活四。
+        self.sleep_four = 9040          # 己方有冲四。
+        self.block_four = 9030          # 需要防守对方的活四。
+        self.block_four_three = 9020    # 需要防守对方的冲四活三。
+        self.live_three = 9010          # 己方有活三且对方无冲四。
+        self.block_double_three = 9000  # 需要防守对方的双活三。
+        self.sleep_four_bonus = 40      # 对方有冲四时己方的分值。
+        self.double_three = 5000        # 己方有多个活三。
+        self.three = 100                # 己方有一个活三。
+        self.opponent_double_three = 2000   # 对方有多个活三。
+        self.opponent_three = 400       # 对方有一个活三。
+        self.sleep_three = 10           # 每个眠三。
+        self.live_two = 6               # 每个活二。
+        self.sleep_two = 2              # 每个眠二。
+        for name, value in _values.items():
+            setattr(self, name, value)
+
+    def get_board_score(self, _player_count):
+        """获取全局棋形评分方法。
+
+        Args:
+            _player_count: (己方棋形数量, 对方棋形数量)
+
+        Returns:
+            (我方评分，对方评分)。
+        """
+        mine_count, opponent_count = _player_count
+        m_score, o_score = 0, 0
+        # 有活五时，直接返回活五分值。
+        if mine_count[ChessType.LIVE_FIVE] > 0:
+            return ChessScore.LIVE_FIVE, 0
+        if opponent_count[ChessType.LIVE_FIVE] > 0:
+            return 0, ChessScore.LIVE_FIVE
+
+        # 有两个冲四时，可以视作一个活四。
+        if mine_count[ChessType.SLEEP_FOUR] >= 2:
+            mine_count[ChessType.LIVE_FOUR] += 1
+        if opponent_count[ChessType.SLEEP_FOUR] >= 2:
+            opponent_count[ChessType.LIVE_FOUR] += 1
+
+        # 优先考虑己方活四和冲四。
+        if mine_count[ChessType.LIVE_FOUR] > 0:
+            return self.live_four, 0
+        if mine_count[ChessType.SLEEP_FOUR] > 0:
+            return self.sleep_four, 0
+
+        # 其次考虑防守敌方活四。
+        if opponent_count[ChessType.LIVE_FOUR] > 0:
+            return 0, self.block_four
+        # 如果敌方有冲四又有活三，需要防守。
+        if (opponent_count[ChessType.SLEEP_FOUR] > 0 and
+                opponent_count[ChessType.LIVE_THREE] > 0):
+            return 0, self.block_four_three
+
+        # 己方有活三、敌方无冲四时，可以返回活三分值。
+        if (mine_count[ChessType.LIVE_THREE] > 0 and
+                opponent_count[ChessType.SLEEP_FOUR] == 0):
+            return self.live_three, 0
+
+        # 敌方有活三，己方无眠三、活三时，需要防守活三。
+        if (opponent_count[ChessType.LIVE_THREE] > 1 and
+                mine_count[ChessType.LIVE_THREE] == 0 and
+                mine_count[ChessType.SLEEP_THREE] == 0):
+            return 0, self.block_double_three
+
+        # 以下是对非优先棋形的计分。
+        if opponent_count[ChessType.SLEEP_FOUR] > 0:
+            m_score += self.sleep_four_bonus
+
+        if mine_count[ChessType.LIVE_THREE] > 1:
+            m_score += self.double_three
+        elif mine_count[ChessType.LIVE_THREE] == 1:
+            m_score += self.three
+
+        if opponent_count[ChessType.LIVE_THREE] > 1:
+            o_score += self.opponent_double_three
+        elif opponent_count[ChessType.LIVE_THREE] == 1:
+            o_score += self.opponent_three
+
+        m_score += mine_count[ChessType.SLEEP_THREE] * self.sleep_three
+        o_score += opponent_count[ChessType.SLEEP_THREE] * self.sleep_three
+
+        m_score += mine_count[ChessType.LIVE_TWO] * self.live_two
+        o_score += opponent_count[ChessType.LIVE_TWO] * self.live_two
+
+        m_score += mine_count[ChessType.SLEEP_TWO] * self.sleep_two
+        o_score += opponent_count[ChessType.SLEEP_TWO] * self.sleep_two
+
+        return m_score, o_score
+
+    def to_dict(self):
+        """转换为字典方法。
+
+        Returns:
+            参数名称到分值的字典。
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @property
+    def key(self):
+        """参数摘要属性。
+
+        Returns:
+            由全部参数计算出的 8 位十六进制字符串，用于区分不同参数的缓存。
+        """
+        text = json.dumps(self.to_dict(), sort_keys=True)
+        return '{:08x}'.format(zlib.crc32(text.encode()))
+
+
+def load_weights(_path=AI_WEIGHTS_PATH):
+    """读取棋局评分参数方法。
+
+    Args:
+        _path: 参数文件路径，为 None 时使用默认参数
+
+    Returns:
+        Weights 对象，文件中没有的参数使用默认值。
+    """
+    if _path is None:
+        return Weights()
+    with open(_path) as f:
+        return Weights(**json.load(f))
+
+
+def save_weights(_weights, _path):
+    """保存棋局评分参数方法。
+
+    Args:
+        _weights: Weights 对象
+        _path: 参数文件路径
+    """
+    with open(_path, 'w') as f:
+        json.dump(_weights.to_dict(), f, indent=4)
@@ -10,17 +10,33 @@
 时间:
     2021/4/13 21:41
 """
+import argparse
+
 import pygame
 from Interactive import Interactive
+from Settings import BOARD_SIZES
+from Settings import CHESS_MAX_NUM
 
 
 def main():
     """五子棋游戏主入口。
 
-    初始化并启动游戏。
+    初始化并启动游戏，可通过第一个命令行参数指定棋盘尺寸，如 `main.py 19`，\n
+    或通过 `--replay` 参数回放并分析一局棋谱，如 `main.py --replay game.json`，\n
+    或通过 `--seed` 参数指定 AI 的随机数种子，以复现棋谱中记录的对局。
     """
-    pygame.init()
-    game = Interactive()
+    parser = argparse.ArgumentParser(description='Gobang game.')
+    parser.add_argument('size', nargs='?', type=int, default=CHESS_MAX_NUM,
+                        choices=BOARD_SIZES, help='board size')
+    parser.add_argument('--replay', metavar='RECORD',
+                        help='replay and analyse a saved game record')
+    parser.add_argument('--seed', type=int,
+                        help='AI random seed, reproduces a recorded game')
+    args = parser.parse_args()
+    # 只初始化游戏所需的显示与字体模块，不启动音频、手柄等模块。
+    pygame.display.init()
+    pygame.font.init()
+    game = Interactive(args.size, args.replay, args.seed)
     while True:
         game.play()
 
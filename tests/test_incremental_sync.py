@@ -0,0 +1,241 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    test_incremental_sync.py
+时间:
+    2026/10/19 23:20
+
+AI 增量同步棋盘的测试。\n
+随机落子、悔棋与重做后，只比较变化点同步棋盘的 AI 与每次新建、\n
+扫描整个棋盘的 AI 必须选出相同的落子点；同时检查 Interactive\n
+记录的变化点列表，在无窗口的 dummy 显示驱动下运行：
+
+    python -m pytest tests
+"""
+import os
+import random
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+
+import Interactive
+from AI import AI
+from Constant import PlayerEnum
+from Profile import Profile
+from Settings import BOARD_WIDTH
+from Settings import BUTTON_HEIGHT
+from Settings import TITLE_HEIGHT
+from Settings import TITLE_X
+from Settings import TITLE_Y
+
+SIZE = 15           # 测试的棋盘尺寸。
+ACTION_NUM = 60     # 每局随机操作的数量。
+SEEDS = (0, 1)      # 各局随机操作的种子。
+PEOPLE = PlayerEnum.PLAYER_ONE
+MACHINE = PlayerEnum.PLAYER_TWO
+
+
+def get_profile(_difficulty=None):
+    """获取测试所用难度配置方法。
+
+    分值相同的落子不随机选择，使两个 AI 的落子可以直接比较。
+
+    Args:
+        _difficulty: 未使用，与 Profile 模块中 get_profile 的参数一致
+
+    Returns:
+        深度 2、不随机选择落子的难度配置。
+    """
+    return Profile(_depth=2, _random_margin=0)
+
+
+class CheckedAI(AI):
+    """每次决策都与新建的 AI 比较的 AI 类。"""
+    decisions = []      # [(增量同步的落子点, 新建 AI 的落子点, 变化点列表)]。
+
+    def make_decision(self, _board, _pos, _changes=None):
+        """AI 落子方法，并记录新建的 AI 在同一局面的落子点。
+
+        Args:
+            _board: 棋盘数组
+            _pos: 玩家落子的坐标
+            _changes: 上一次决策后棋盘上其他可能有变化的点的坐标列表
+
+        Returns:
+            (x, y)——决定落子的坐标。
+        """
+        fresh = AI((PEOPLE, MACHINE), len(_board), _profile=get_profile())
+        expected = fresh.make_decision(_board, _pos)
+        move = super().make_decision(_board, _pos, _changes)
+        CheckedAI.decisions.append((move, expected, _changes))
+        return move
+
+
+class RandomPlayer(object):
+    """通过 Interactive 随机落子、悔棋与重做的玩家类。"""
+
+    def __init__(self, _seed):
+        """初始化玩家与游戏方法。
+
+        Args:
+            _seed: 随机操作的种子
+        """
+        self.__rand = random.Random(_seed)
+        self.__game = Interactive.Interactive(SIZE)
+        # 点击首页的开始按钮进入游戏界面。
+        self.__click((TITLE_X, TITLE_Y + TITLE_HEIGHT + BUTTON_HEIGHT // 2))
+
+    def step(self):
+        """进行一次随机操作方法。
+
+        已分出胜负时悔棋，否则以 1/5 的概率悔棋、1/10 的概率重做，\n
+        其余时候在棋盘中央附近的空点落子，之后由 AI 应对。
+        """
+        action = self.__rand.random()
+        if self.__private('winner') is not None or action < 0.2:
+            self.__press(pygame.K_LEFT)
+        elif action < 0.3:
+            self.__press(pygame.K_RIGHT)
+        else:
+            board = self.__private('board')
+            center = SIZE // 2
+            empties = [(x, y) for x in range(center - 4, center + 5)
+                       for y in range(center - 4, center + 5)
+                       if board[x][y] == PlayerEnum.NO_PLAYER]
+            x, y = self.__rand.choice(empties)
+            rec_size = BOARD_WIDTH // SIZE
+            self.__click((x * rec_size + rec_size // 2,
+                          y * rec_size + rec_size // 2))
+        self.__game.play()
+
+    def __private(self, _name):
+        """读取 Interactive 的私有属性方法。
+
+        Args:
+            _name: 属性名，不含类名前缀
+
+        Returns:
+            属性值。
+        """
+        return getattr(self.__game, '_Interactive__' + _name)
+
+    def __click(self, _mouse_pos):
+        """在某处点击方法。
+
+        dummy 显示驱动不提供鼠标位置，直接调用点击处理。
+
+        Args:
+            _mouse_pos: 点击的坐标
+        """
+        self.__private('click')(_mouse_pos)
+
+    @staticmethod
+    def __press(_key):
+        """按下某个键方法，按键在下一次 play 时处理。
+
+        Args:
+            _key: 按键编号
+        """
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=_key))
+
+
+class IncrementalSyncTest(unittest.TestCase):
+    """增量同步棋盘测试类。"""
+
+    @classmethod
+    def setUpClass(cls):
+        """初始化无窗口的显示模块方法。"""
+        pygame.display.init()
+        pygame.font.init()
+
+    @classmethod
+    def tearDownClass(cls):
+        """关闭显示模块方法。"""
+        pygame.quit()
+
+    def setUp(self):
+        """替换 Interactive 所用的 AI、难度配置与棋谱保存方法。"""
+        CheckedAI.decisions = []
+        for name, value in (('AI', CheckedAI), ('get_profile', get_profile),
+                            ('save_record', mock.Mock())):
+            patcher = mock.patch.object(Interactive, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_engine(self):
+        """直接调用 AI 时，增量同步与新建 AI 的落子点相同。
+
+        悔棋与重做只把涉及的点放入变化点列表，不新建 AI。
+        """
+        rand = random.Random(2)
+        board = [[PlayerEnum.NO_PLAYER] * SIZE for _ in range(SIZE)]
+        ai = CheckedAI((PEOPLE, MACHINE), SIZE, _profile=get_profile())
+        steps, undone, changes = [], [], []
+        won = False     # AI 获胜后先悔棋再继续。
+        center = SIZE // 2
+        cells = [(x, y) for x in range(center - 4, center + 5)
+                 for y in range(center - 4, center + 5)]
+        for _ in range(ACTION_NUM):
+            action = rand.random()
+            if won or action < 0.2 and len(steps) >= 2:
+                for _ in range(2):
+                    (x, y), player = steps.pop()
+                    board[x][y] = PlayerEnum.NO_PLAYER
+                    undone.append(((x, y), player))
+                    changes.append((x, y))
+                won = False
+                continue
+            if action < 0.3 and len(undone) >= 2:
+                for _ in range(2):
+                    (x, y), player = undone.pop()
+                    board[x][y] = player
+                    steps.append(((x, y), player))
+                    changes.append((x, y))
+                won = ai.game_over(board, (x, y), (MACHINE, PEOPLE))
+                continue
+            pos = rand.choice([(x, y) for x, y in cells
+                               if board[x][y] == PlayerEnum.NO_PLAYER])
+            board[pos[0]][pos[1]] = PEOPLE
+            if ai.game_over(board, pos, (PEOPLE, MACHINE)):
+                board[pos[0]][pos[1]] = PlayerEnum.NO_PLAYER
+                continue
+            move = ai.make_decision(board, pos, changes)
+            board[move[0]][move[1]] = MACHINE
+            steps += [(pos, PEOPLE), (move, MACHINE)]
+            undone, changes = [], []
+            won = ai.game_over(board, move, (MACHINE, PEOPLE))
+        self.check_decisions()
+
+    def test_interactive(self):
+        """通过 Interactive 随机落子、悔棋与重做时，AI 的落子点与新建 AI 相同。
+
+        第一次决策之后，Interactive 必须每次都给出变化点列表。
+        """
+        for seed in SEEDS:
+            player = RandomPlayer(seed)
+            for _ in range(ACTION_NUM):
+                player.step()
+        self.check_decisions()
+
+    def check_decisions(self):
+        """检查记录的每次决策方法。"""
+        self.assertGreater(len(CheckedAI.decisions), 10)
+        for num, (move, expected, changes) in enumerate(
+                CheckedAI.decisions):
+            self.assertEqual(move, expected, (num, changes))
+            self.assertIsNotNone(changes, num)
+
+
+if __name__ == '__main__':
+    unittest.main()
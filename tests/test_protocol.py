@@ -0,0 +1,153 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    test_protocol.py
+时间:
+    2026/10/20 00:40
+
+Gomocup 协议前端的测试。\n
+以脚本化的输入逐条检查回复，包括错误的命令与坐标，\n
+以及过小的 max_memory 被提高到 AI 可以运行的最小预算：
+
+    python -m pytest tests
+"""
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AI import AI
+from Profile import Profile
+from Protocol import ABOUT
+from Protocol import Protocol
+from Settings import PROTOCOL_MEMORY_SHARE
+from Settings import PROTOCOL_SEARCH_DEPTH
+
+SIZE = 15
+
+
+def run_protocol(_lines):
+    """以若干行命令运行协议方法。
+
+    Args:
+        _lines: 命令列表
+
+    Returns:
+        回复行的列表。
+    """
+    output = io.StringIO()
+    Protocol(io.StringIO(''.join(line + '\n' for line in _lines)),
+             output).run()
+    return output.getvalue().splitlines()
+
+
+def parse_move(_reply):
+    """解析落子回复方法。
+
+    Args:
+        _reply: 形如 x,y 的回复
+
+    Returns:
+        (x, y)。
+    """
+    x, y = (int(value) for value in _reply.split(','))
+    return x, y
+
+
+class ProtocolTest(unittest.TestCase):
+    """协议测试类。"""
+
+    def test_errors(self):
+        """未开始、坐标越界、已有棋子与未知命令都回复错误并继续运行。"""
+        replies = run_protocol([
+            'TURN 1,1',
+            'START 4',
+            'RECTSTART 15,20',
+            'START {}'.format(SIZE),
+            'ABOUT',
+            'INFO timeout_turn 100',
+            'TURN 20,3',
+            'TURN 7,x',
+            'FOO',
+            'TURN 7,7',
+            'TURN 7,7',
+            'END',
+            'ABOUT',
+        ])
+        self.assertEqual(replies[:8], [
+            'ERROR START has not been received',
+            'ERROR unsupported board size 4',
+            'ERROR rectangular boards are not supported',
+            'OK',
+            ABOUT,
+            'ERROR coordinate 20,3 is outside the board',
+            "ERROR invalid literal for int() with base 10: 'x'",
+            'UNKNOWN command FOO',
+        ])
+        x, y = parse_move(replies[8])
+        self.assertNotEqual((x, y), (7, 7))
+        self.assertTrue(0 <= x < SIZE and 0 <= y < SIZE)
+        # 重复落子报错，END 之后的 ABOUT 不再处理。
+        self.assertEqual(replies[9:], ['ERROR square 7,7 is occupied'])
+
+    def test_board(self):
+        """BOARD 给出的局面中己方可直接成五时落在成五点，之后可撤销。"""
+        replies = run_protocol([
+            'START {}'.format(SIZE),
+            'INFO timeout_turn 100',
+            'BOARD',
+            '5,5,1', '5,6,1', '5,7,1', '5,8,1', '5,4,2',
+            '9,9,2', '9,10,2', '9,11,2',
+            'DONE',
+            'TAKEBACK 5,9',
+            'TURN 5,9',
+            'END',
+        ])
+        self.assertEqual(replies[:3], ['OK', '5,9', 'OK'])
+        # 撤销后对手可以落在该点。
+        self.assertEqual(len(replies), 4)
+        self.assertNotIn(parse_move(replies[3]), [(5, 9), (5, 4)])
+
+    def test_small_memory(self):
+        """max_memory 过小时以 MESSAGE 说明并使用最小预算，仍然正常落子。"""
+        replies = run_protocol([
+            'START {}'.format(SIZE),
+            'INFO max_memory 1000',
+            'INFO timeout_turn 100',
+            'BEGIN',
+            'TURN 7,8',
+            'END',
+        ])
+        min_budget = AI.get_min_memory(
+            SIZE, Profile(_depth=PROTOCOL_SEARCH_DEPTH))
+        self.assertEqual(replies[:3], [
+            'OK',
+            'MESSAGE memory budget of {} bytes is too small, using {} '
+            'bytes'.format(int(1000 * PROTOCOL_MEMORY_SHARE), min_budget),
+            '{},{}'.format(SIZE // 2, SIZE // 2),
+        ])
+        self.assertEqual(len(replies), 4)
+        self.assertNotIn(parse_move(replies[3]), [(7, 7), (7, 8)])
+
+    def test_enough_memory(self):
+        """max_memory 足够时不发送 MESSAGE。"""
+        replies = run_protocol([
+            'START {}'.format(SIZE),
+            'INFO max_memory 70000000',
+            'INFO timeout_turn 100',
+            'BEGIN',
+            'END',
+        ])
+        self.assertEqual(replies, ['OK', '{},{}'.format(SIZE // 2,
+                                                        SIZE // 2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
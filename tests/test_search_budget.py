@@ -0,0 +1,96 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    test_search_budget.py
+时间:
+    2026/10/19 23:50
+
+有预算限制时搜索结果的测试。\n
+以下局面中落子方有多个可成四的点，证明数搜索会先运行但无法证明必胜。\n
+即使预算在证明数搜索中就已用尽，迭代加深的第一轮也必须完整搜索：
+
+    python -m pytest tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AI import AI
+from Constant import PlayerEnum
+from Profile import Profile
+
+SIZE = 15
+PLAYER = PlayerEnum.PLAYER_ONE, PlayerEnum.PLAYER_TWO
+
+# 各局面的 [(x 坐标, y 坐标, 落子者)]，均轮到玩家 1 落子。
+POSITIONS = (
+    [(4, 5, 0), (4, 7, 0), (4, 9, 0), (5, 11, 0), (7, 3, 0), (7, 4, 1),
+     (7, 5, 1), (7, 9, 0), (8, 7, 1), (9, 5, 1), (10, 9, 1), (10, 10, 0),
+     (11, 6, 1), (11, 9, 1)],
+    [(3, 3, 0), (3, 5, 0), (3, 7, 0), (3, 11, 1), (4, 5, 1), (5, 10, 1),
+     (7, 3, 0), (7, 4, 0), (7, 10, 1), (8, 11, 1), (9, 6, 0), (9, 10, 0),
+     (10, 5, 1), (10, 9, 1)],
+    [(3, 3, 0), (3, 9, 1), (3, 10, 1), (4, 5, 0), (6, 3, 0), (6, 4, 0),
+     (6, 6, 1), (7, 3, 1), (8, 6, 0), (8, 8, 0), (9, 9, 1), (10, 7, 1),
+     (10, 8, 0), (10, 9, 1)],
+)
+
+
+def make_board(_stones):
+    """由棋子列表生成棋盘方法。
+
+    Args:
+        _stones: [(x 坐标, y 坐标, 落子者)] 列表
+
+    Returns:
+        棋盘数组。
+    """
+    board = [[PlayerEnum.NO_PLAYER] * SIZE for _ in range(SIZE)]
+    for x, y, player in _stones:
+        board[x][y] = PlayerEnum(player)
+    return board
+
+
+class SearchBudgetTest(unittest.TestCase):
+    """预算限制测试类。"""
+
+    def check_budget(self, _profile):
+        """检查有预算时的结果与不限预算的 2 层搜索相同方法。
+
+        Args:
+            _profile: 预算很小的 4 层搜索难度配置
+        """
+        for stones in POSITIONS:
+            board = make_board(stones)
+            without_solver = AI(PLAYER, SIZE, _profile=Profile(
+                _depth=2, _random_margin=0, _solver_node_num=0))
+            solver = AI(PLAYER, SIZE, _profile=Profile(
+                _depth=2, _random_margin=0))
+            budget = AI(PLAYER, SIZE, _profile=_profile)
+            expected = without_solver.analyse(board, PLAYER)
+            self.assertEqual(solver.analyse(board, PLAYER), expected)
+            # 证明数搜索确实运行过。
+            self.assertGreater(solver.node_num, without_solver.node_num)
+            self.assertEqual(budget.analyse(board, PLAYER), expected)
+            self.assertEqual(budget.reached_depth, 2)
+
+    def test_node_budget(self):
+        """节点数预算在证明数搜索中用尽时，仍完成第一轮 2 层搜索。"""
+        self.check_budget(Profile(_depth=4, _random_margin=0,
+                                  _node_budget=20))
+
+    def test_time_budget(self):
+        """时间预算在证明数搜索中用尽时，仍完成第一轮 2 层搜索。"""
+        self.check_budget(Profile(_depth=4, _random_margin=0,
+                                  _time_budget=1e-6))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    test_shape_backends.py
+时间:
+    2026/10/19 22:40
+
+棋形模块的差分测试。\n
+FastShape（未编译时跳过）与 NumpyShape（缺少 NumPy 时跳过）\n
+在每种一行棋子、随机棋盘以及棋盘边缘与角落的点上，\n
+结果必须与纯 Python 实现 Shape 完全一致：
+
+    python -m pytest tests
+"""
+import itertools
+import os
+import random
+import sys
+import unittest
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Shape
+from BoardTable import get_board_table
+from Constant import PlayerEnum
+from Settings import CHESS_TYPE_NUM
+
+NO_PLAYER = int(PlayerEnum.NO_PLAYER)
+SIZES = (15, 19)        # 测试的棋盘尺寸。
+BOARD_NUM = 30          # 每种尺寸的随机棋盘数量。
+BORDER = 4              # 距棋盘边缘不超过该距离的点视为边缘点。
+
+
+def new_count():
+    """创建棋形数量数组方法。
+
+    Returns:
+        全为 0 的棋形数量数组。
+    """
+    return array('i', [0]) * CHESS_TYPE_NUM
+
+
+def random_boards(_size, _num, _seed):
+    """生成随机一维棋盘方法。
+
+    棋子密度在各棋盘间变化，从只有几个棋子到约一半的格子有棋子。
+
+    Args:
+        _size: 棋盘每行每列格子数量
+        _num: 棋盘数量
+        _seed: 随机数种子
+
+    Returns:
+        一维棋盘（含哨兵格）的列表。
+    """
+    rand = random.Random(_seed)
+    area = _size * _size
+    boards = []
+    for _ in range(_num):
+        chess = bytearray([NO_PLAYER]) * (area + 1)
+        for index in rand.sample(range(area), rand.randint(1, area // 2)):
+            chess[index] = rand.randint(0, 1)
+        boards.append(chess)
+    return boards
+
+
+def border_indices(_size):
+    """获取靠近棋盘边缘与角落的点方法。
+
+    Args:
+        _size: 棋盘每行每列格子数量
+
+    Returns:
+        距某条边不超过 BORDER 的点的一维下标列表。
+    """
+    return [x * _size + y for x in range(_size) for y in range(_size)
+            if min(x, y, _size - 1 - x, _size - 1 - y) <= BORDER]
+
+
+def load_backend(_name):
+    """加载需要测试的棋形模块方法。
+
+    Args:
+        _name: 模块名
+
+    Returns:
+        模块，不可用时为 None。
+    """
+    try:
+        return __import__(_name)
+    except ImportError:
+        return None
+
+
+class ShapeBackendTest(object):
+    """各棋形模块共用的差分测试，子类以 backend 指定被测模块。"""
+    backend = None
+
+    def setUp(self):
+        """跳过不可用的模块方法。"""
+        if self.backend is None:
+            self.skipTest('backend is not available')
+
+    def test_window_shape(self):
+        """每种一行 9 个棋子对双方的棋形与已统计标记一致。"""
+        line = tuple(range(9))
+        for chess_list in itertools.product((0, 1, 2), repeat=9):
+            for player in (0, 1), (1, 0):
+                results = []
+                for module in Shape, self.backend:
+                    count, visited = new_count(), bytearray(9)
+                    module.get_one_chess_shape(chess_list, player, count,
+                                               line, visited)
+                    results.append((count, visited))
+                self.assertEqual(results[0], results[1],
+                                 (chess_list, player))
+
+    def test_board_shape(self):
+        """随机棋盘上双方的整体棋形与已统计标记一致。
+
+        NumpyShape 的 get_board_shape 由 count_board_shape 逐点统计。
+        """
+        for size in SIZES:
+            table = get_board_table(size)
+            for chess in random_boards(size, BOARD_NUM, size):
+                stones = [i for i in range(table.area)
+                          if chess[i] != NO_PLAYER]
+                results = []
+                for module in Shape, self.backend:
+                    counts = new_count(), new_count()
+                    visited = bytearray(4 * table.area)
+                    module.get_board_shape(table, chess, stones, counts,
+                                           visited)
+                    results.append((counts, visited))
+                self.assertEqual(results[0], results[1], bytes(chess))
+
+    def test_points_score(self):
+        """随机棋盘上所有空点的分值与最高棋形一致。"""
+        for size in SIZES:
+            table = get_board_table(size)
+            for chess in random_boards(size, BOARD_NUM, size + 1):
+                empties = [i for i in range(table.area)
+                           if chess[i] == NO_PLAYER]
+                self.assertEqual(
+                    Shape.get_points_score(table, chess, empties),
+                    self.backend.get_points_score(table, chess, empties),
+                    bytes(chess))
+                self.assertEqual(chess[table.area], NO_PLAYER)
+
+    def test_border_points(self):
+        """边缘与角落的点上，含棋盘外格子的各行棋形一致。"""
+        for size in SIZES:
+            table = get_board_table(size)
+            indices = border_indices(size)
+            for chess in random_boards(size, BOARD_NUM, size + 2):
+                for index in indices:
+                    for player in 0, 1:
+                        self.assertEqual(
+                            Shape.get_point_shape(table, chess, index,
+                                                  player, new_count()),
+                            self.backend.get_point_shape(
+                                table, chess, index, player, new_count()),
+                            (bytes(chess), index, player))
+                self.assertEqual(
+                    Shape.get_points_score(table, chess, indices),
+                    self.backend.get_points_score(table, chess, indices))
+
+    def test_point_score(self):
+        """由棋形数量得到的分值与最高棋形一致。"""
+        for counts in itertools.product(range(3), repeat=CHESS_TYPE_NUM):
+            count = array('i', counts)
+            self.assertEqual(
+                (Shape.get_point_score(count),
+                 Shape.get_top_chess_type(count)),
+                (self.backend.get_point_score(count),
+                 self.backend.get_top_chess_type(count)), counts)
+
+
+class FastShapeTest(ShapeBackendTest, unittest.TestCase):
+    """编译后的 FastShape 模块。"""
+    backend = load_backend('FastShape')
+
+
+class NumpyShapeTest(ShapeBackendTest, unittest.TestCase):
+    """NumPy 实现的 NumpyShape 模块。"""
+    backend = load_backend('NumpyShape')
+
+
+if __name__ == '__main__':
+    unittest.main()
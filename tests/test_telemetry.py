@@ -0,0 +1,124 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    test_telemetry.py
+时间:
+    2026/10/20 01:10
+
+遥测统计的测试。\n
+检查对数线性直方图的分位数误差，以及 AI 决策记录的根节点落子数：
+
+    python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import AI
+from Constant import PlayerEnum
+from Profile import Profile
+from Settings import AI_CLOSE_MOVE_NUM
+from Telemetry import Histogram
+from Telemetry import SUB_BUCKET_NUM
+from Telemetry import Telemetry
+
+MAX_ERROR = 1 / 64  # 分位数允许的最大相对误差。
+
+
+def get_values():
+    """获取测试用的记录值方法。
+
+    Returns:
+        0 到 SUB_BUCKET_NUM 附近的每个值，以及 2 的各次幂及其前后的值。
+    """
+    values = set(range(2 * SUB_BUCKET_NUM + 2))
+    for bits in range(8, 40):
+        power = 1 << bits
+        values.update((power - 1, power, power + 1, power + power // 3))
+    return sorted(values)
+
+
+class HistogramTest(unittest.TestCase):
+    """直方图测试类。"""
+
+    def check_quantile(self, _histogram, _quantile, _expected):
+        """检查分位数不小于准确值且相对误差不超过 MAX_ERROR 方法。
+
+        Args:
+            _histogram: 直方图
+            _quantile: 分位
+            _expected: 准确的分位数
+        """
+        value = _histogram.get_quantile(_quantile)
+        self.assertGreaterEqual(value, _expected, (_quantile, _expected))
+        self.assertLessEqual(value - _expected, _expected * MAX_ERROR,
+                             (_quantile, _expected, value))
+
+    def test_single_value(self):
+        """只记录一个值时，分位数误差不超过 1/64，分位为 1 时是该值本身。"""
+        for value in get_values():
+            histogram = Histogram()
+            histogram.record(value)
+            self.check_quantile(histogram, 0.5, value)
+            self.assertEqual(histogram.get_quantile(1.0), value)
+
+    def test_quantiles(self):
+        """记录多个值时，分位数与排序后对应位置的值相比误差不超过 1/64。"""
+        values = get_values()
+        histogram = Histogram()
+        for value in reversed(values):
+            histogram.record(value)
+        self.assertEqual(histogram.count, len(values))
+        self.assertEqual(histogram.sum, sum(values))
+        for quantile in 0.01, 0.25, 0.5, 0.9, 0.99, 0.999:
+            rank = max(1, int(quantile * len(values) + 0.5))
+            self.check_quantile(histogram, quantile, values[rank - 1])
+        self.assertEqual(histogram.get_quantile(1.0), values[-1])
+
+    def test_empty(self):
+        """没有记录时分位数为 0。"""
+        self.assertEqual(Histogram().get_quantile(0.5), 0)
+        self.assertEqual(Histogram().get_quantile(1.0), 0)
+
+
+class DecisionTelemetryTest(unittest.TestCase):
+    """AI 决策遥测测试类。"""
+
+    def test_root_moves(self):
+        """记录的根节点落子数为最后一次搜索中根节点实际搜索完的落子数。"""
+        board = [[PlayerEnum.NO_PLAYER] * 15 for _ in range(15)]
+        for x, y, player in ((7, 7, 0), (7, 8, 1), (8, 8, 0), (6, 6, 1)):
+            board[x][y] = PlayerEnum(player)
+        profile = Profile(_depth=2)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'gobang.prom')
+            telemetry = Telemetry(path, _interval=3600)
+            with mock.patch.object(AI, 'get_telemetry',
+                                   return_value=telemetry):
+                ai = AI.AI((PlayerEnum.PLAYER_ONE, PlayerEnum.PLAYER_TWO),
+                           15, _profile=profile)
+            ai.make_decision(board, (6, 6), ())
+            histogram = telemetry.get_histogram('root_moves', 'opening')
+            self.assertEqual(histogram.count, 1)
+            self.assertEqual(histogram.get_quantile(1.0), ai.root_move_num)
+            self.assertGreater(ai.root_move_num, 0)
+            self.assertLessEqual(ai.root_move_num,
+                                 profile.root_move_num + AI_CLOSE_MOVE_NUM)
+            telemetry.export()
+            with open(path) as f:
+                text = f.read()
+        self.assertIn('gobang_ai_root_moves{{phase="opening",quantile="1.0"}}'
+                      ' {}\n'.format(float(ai.root_move_num)), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+作者:
+    杨贇
+版权:
+    GPL (C) Copyright 2021, 杨贇.
+联系方式:
+    smally@stu.ecnu.edu.cn
+文件:
+    test_transposition_table.py
+时间:
+    2026/10/20 00:10
+
+共享置换表的测试。\n
+检查写入与读取、写入到一半或键不符的项被忽略、同一局面深度优先的\n
+替换规则，以及搜索参数不同的 AI 共用一个表时互不影响：
+
+    python -m pytest tests
+"""
+import os
+import sys
+import unittest
+from multiprocessing import shared_memory
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AI import AI
+from Cache import TranspositionTable
+from Constant import PlayerEnum
+from Profile import Profile
+
+CAPACITY = 64
+KEY = 0x0123456789ABCDEF
+PLAYER = PlayerEnum.PLAYER_ONE, PlayerEnum.PLAYER_TWO
+
+
+class TranspositionTableTest(unittest.TestCase):
+    """置换表测试类。"""
+
+    def setUp(self):
+        """创建共享内存中的置换表，并另外连接同一块共享内存方法。"""
+        name = 'gobang-test-{}'.format(os.getpid())
+        self.table = TranspositionTable(CAPACITY, name, True)
+        self.addCleanup(self.table.close)
+        self.memory = shared_memory.SharedMemory(name)
+        self.words = self.memory.buf.cast('Q')
+
+        def close():
+            """断开另外连接的共享内存方法。"""
+            self.words.release()
+            self.memory.close()
+        self.addCleanup(close)
+
+    def test_round_trip(self):
+        """写入的各字段能原样读出，其他进程连接后也能读出。"""
+        entries = ((-1000, 0, TranspositionTable.EXACT, -1),
+                   (123456, 63, TranspositionTable.LOWER, 224),
+                   (-(1 << 19), 7, TranspositionTable.UPPER, 360))
+        for i, entry in enumerate(entries):
+            self.table.store(KEY + i, *entry)
+        other = TranspositionTable(_name=self.table.name)
+        self.addCleanup(other.close)
+        for i, entry in enumerate(entries):
+            self.assertEqual(self.table.lookup(KEY + i), entry)
+            self.assertEqual(other.lookup(KEY + i), entry)
+        self.assertIsNone(self.table.lookup(KEY + len(entries)))
+
+    def test_rejected_entries(self):
+        """键不符、写入到一半与空的项都视为未命中。"""
+        self.table.store(KEY, 50, 4, TranspositionTable.EXACT, 10)
+        slot = 2 * (KEY % CAPACITY)
+        # 映射到同一项的另一个键。
+        self.assertIsNone(self.table.lookup(KEY + CAPACITY))
+
+        # 另一个进程只写完了第二个字：数据已更新，校验字仍是旧的。
+        check, data = self.words[slot], self.words[slot + 1]
+        self.words[slot + 1] = data ^ (1 << 28)
+        self.assertIsNone(self.table.lookup(KEY))
+        # 只写完了第一个字。
+        self.words[slot], self.words[slot + 1] = check ^ (1 << 28), data
+        self.assertIsNone(self.table.lookup(KEY))
+        self.words[slot] = check
+        self.assertEqual(self.table.lookup(KEY),
+                         (50, 4, TranspositionTable.EXACT, 10))
+
+        # 数据为 0 的项为空项，即使校验字恰好等于键。
+        self.words[slot], self.words[slot + 1] = KEY, 0
+        self.assertIsNone(self.table.lookup(KEY))
+
+    def test_replacement(self):
+        """同一局面只被深度不低于已有结果的项替换，不同局面直接替换。"""
+        self.table.store(KEY, 10, 5, TranspositionTable.EXACT, 1)
+        self.table.store(KEY, 20, 3, TranspositionTable.LOWER, 2)
+        self.assertEqual(self.table.lookup(KEY),
+                         (10, 5, TranspositionTable.EXACT, 1))
+        self.table.store(KEY, 30, 5, TranspositionTable.UPPER, 3)
+        self.assertEqual(self.table.lookup(KEY),
+                         (30, 5, TranspositionTable.UPPER, 3))
+        self.table.store(KEY, 40, 6, TranspositionTable.EXACT, 4)
+        self.assertEqual(self.table.lookup(KEY),
+                         (40, 6, TranspositionTable.EXACT, 4))
+
+        self.table.store(KEY + CAPACITY, 50, 0, TranspositionTable.EXACT)
+        self.assertIsNone(self.table.lookup(KEY))
+        self.assertEqual(self.table.lookup(KEY + CAPACITY),
+                         (50, 0, TranspositionTable.EXACT, -1))
+
+    def test_search_key(self):
+        """其他搜索参数的 AI 写入的结果不影响本 AI 的搜索。"""
+        board = [[PlayerEnum.NO_PLAYER] * 15 for _ in range(15)]
+        for x, y, player in ((7, 7, 0), (7, 8, 1), (8, 8, 0), (6, 6, 1),
+                             (8, 6, 0), (9, 9, 1)):
+            board[x][y] = PlayerEnum(player)
+        shallow = Profile(_depth=2, _random_margin=0)
+        deep = Profile(_depth=4, _random_margin=0)
+
+        def analyse(_profile, _name):
+            """以某难度配置与共享置换表分析局面方法。"""
+            ai = AI(PLAYER, 15, _profile=_profile, _shared_table=_name)
+            return ai.analyse(board, PLAYER)
+
+        name = 'gobang-test-{}-clean'.format(os.getpid())
+        clean = TranspositionTable(1 << 16, name, True)
+        self.addCleanup(clean.close)
+        expected = analyse(shallow, name)
+        name = 'gobang-test-{}-used'.format(os.getpid())
+        used = TranspositionTable(1 << 16, name, True)
+        self.addCleanup(used.close)
+        analyse(deep, name)
+        self.assertEqual(analyse(shallow, name), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()